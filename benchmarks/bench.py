@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""End-to-end wcsync benchmarks over the synthetic corpus.
+
+Every (stage, image) job runs in a fresh child process with a temporary HOME,
+so Color Material and state files never touch the real config and peak RSS
+is attributable to one stage at one resolution. Quartz, desktoppr, and the
+reloaders are stubbed; everything else is the real pipeline.
+
+Usage:
+    python3 benchmarks/bench.py [--quick] [--iterations N] [--stages a,b]
+                                [--resolutions 1080p,4k] [--output results.json]
+                                [--save-baseline benchmarks/baseline.json]
+                                [--compare benchmarks/baseline.json] [--threshold 0.15]
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+WCSYNC_ROOT = os.path.join(os.path.dirname(BENCH_DIR), "configs", "wallpaper-colors")
+STAGES = ("decode", "extract", "scheme", "write_all", "run_sync")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def _maxrss_bytes():
+    # Linux carries ru_maxrss across fork+exec (it would report the parent's
+    # peak); VmHWM belongs to the new address space, so prefer it there.
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # Linux reports KiB
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# --- Child side -------------------------------------------------------------
+
+
+def _import_wcsync():
+    sys.path.insert(0, WCSYNC_ROOT)
+    try:
+        import Quartz  # noqa: F401
+    except ImportError:
+        import types
+
+        sys.modules["Quartz"] = types.SimpleNamespace()
+
+
+def run_job(stage, image_path, iterations):
+    """Time *stage* on one image inside the current process. HOME must already be isolated."""
+    _import_wcsync()
+    from unittest.mock import patch
+
+    from PIL import Image
+
+    from wcsync import target_writing
+    from wcsync.capture import load_wallpaper_from_file
+    from wcsync.colors import WORKING_SIZE, build_scheme, extract_palette
+    from wcsync.config import Config
+    from wcsync.sync_run import SyncRunOptions, run_sync
+    from wcsync.target_writing import write_all
+
+    # Cold path on every iteration: no palette cache hits, no manifest skips.
+    config = Config(palette_cache_entries=0)
+
+    def fresh_manifest():
+        try:
+            os.unlink(target_writing.MANIFEST_FILE)
+        except OSError:
+            pass
+
+    if stage == "decode":
+        op = lambda: load_wallpaper_from_file(image_path)  # noqa: E731
+    else:
+        img = load_wallpaper_from_file(image_path)
+        small = img.resize(WORKING_SIZE, Image.Resampling.LANCZOS)
+        extraction = {
+            "n_colors": config.n_colors,
+            "extractor": config.extractor,
+            "histogram_bits": config.histogram_bits,
+        }
+        palette = extract_palette(small, **extraction)
+        scheme = build_scheme(palette, config)
+        if stage == "extract":
+            op = lambda: extract_palette(  # noqa: E731
+                img.resize(WORKING_SIZE, Image.Resampling.LANCZOS), **extraction
+            )
+        elif stage == "scheme":
+            op = lambda: build_scheme(palette, config)  # noqa: E731
+        elif stage == "write_all":
+
+            def op():
+                fresh_manifest()
+                write_all(scheme, config)
+
+        elif stage == "run_sync":
+
+            def op():
+                fresh_manifest()
+                run_sync(SyncRunOptions(force=True), config=config)
+
+        else:
+            raise ValueError(f"unknown stage: {stage}")
+
+    stubs = (
+        patch("wcsync.sync_run.get_wallpaper_path", return_value=image_path),
+        patch("wcsync.sync_run.subprocess.run"),
+        patch("wcsync.sync_run.reload_all"),
+        patch("wcsync.sync_run.ReloadPipeline"),
+        patch("wcsync.utils.print", create=True),  # silence log()
+    )
+    for stub in stubs:
+        stub.start()
+    rss_before = _maxrss_bytes()
+    try:
+        op()  # warm-up: lazy Pillow plugin loading, first-write mkdirs
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            op()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        for stub in stubs:
+            stub.stop()
+
+    peak = _maxrss_bytes()
+    return {
+        "samples_ms": samples,
+        "peak_rss_mb": round(peak / 2**20, 2),
+        "stage_rss_mb": round((peak - rss_before) / 2**20, 2),
+    }
+
+
+def _child_main(job_json, output_path):
+    job = json.loads(job_json)
+    result = run_job(job["stage"], job["image"], job["iterations"])
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# --- Parent side ------------------------------------------------------------
+
+
+def spawn_job(stage, image_path, iterations):
+    """Run one job in a fresh interpreter with a throwaway HOME."""
+    home = tempfile.mkdtemp(prefix="wcsync-bench-")
+    try:
+        output_path = os.path.join(home, "result.json")
+        env = dict(os.environ, HOME=home)
+        job = json.dumps({"stage": stage, "image": image_path, "iterations": iterations})
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", job, output_path],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{stage} on {os.path.basename(image_path)} failed:\n{proc.stderr}")
+        with open(output_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def summarize(jobs):
+    """Aggregate job results per ``stage/resolution``."""
+    grouped = {}
+    for job in jobs:
+        key = f"{job['stage']}/{job['resolution']}"
+        entry = grouped.setdefault(key, {"samples": [], "peak_rss_mb": 0.0, "stage_rss_mb": 0.0})
+        entry["samples"].extend(job["samples_ms"])
+        entry["peak_rss_mb"] = max(entry["peak_rss_mb"], job["peak_rss_mb"])
+        entry["stage_rss_mb"] = max(entry["stage_rss_mb"], job["stage_rss_mb"])
+
+    summary = {}
+    for key, entry in grouped.items():
+        samples = entry["samples"]
+        summary[key] = {
+            "median_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "peak_rss_mb": entry["peak_rss_mb"],
+            "stage_rss_mb": entry["stage_rss_mb"],
+            "n": len(samples),
+        }
+    return summary
+
+
+def compare(current, baseline, threshold=0.15):
+    """Return regression messages for metrics worse than baseline by more than *threshold*."""
+    regressions = []
+    for key, metrics in sorted(current.items()):
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in ("median_ms", "p95_ms", "peak_rss_mb"):
+            old, new = base.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append(f"{key} {metric}: {old:.2f} -> {new:.2f} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def format_table(summary, baseline=None):
+    lines = [f"{'stage/resolution':<22} {'median ms':>10} {'p95 ms':>10} {'peak MB':>9} {'stage MB':>9}"]
+    for key in sorted(summary, key=lambda k: (STAGES.index(k.split("/")[0]), k)):
+        m = summary[key]
+        line = (
+            f"{key:<22} {m['median_ms']:>10.2f} {m['p95_ms']:>10.2f} "
+            f"{m['peak_rss_mb']:>9.1f} {m['stage_rss_mb']:>9.1f}"
+        )
+        base = (baseline or {}).get(key)
+        if base and base.get("median_ms"):
+            line += f"  ({(m['median_ms'] / base['median_ms'] - 1) * 100:+.0f}% median)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _csv(value, allowed):
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [v for v in items if v not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)}")
+    return items
+
+
+def main(argv=None):
+    from corpus import FORMATS, KINDS, RESOLUTIONS, generate
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--stages", type=lambda v: _csv(v, STAGES), default=list(STAGES))
+    parser.add_argument("--resolutions", type=lambda v: _csv(v, RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument("--kinds", type=lambda v: _csv(v, KINDS), default=list(KINDS))
+    parser.add_argument("--formats", type=lambda v: _csv(v, FORMATS), default=list(FORMATS))
+    parser.add_argument("--quick", action="store_true", help="1080p + 4k, 3 iterations")
+    parser.add_argument("--corpus", help="corpus directory (default: benchmarks/.corpus)")
+    parser.add_argument("--output", help="write full results JSON here")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.resolutions = [r for r in args.resolutions if r in ("1080p", "4k")]
+        args.iterations = min(args.iterations, 3)
+
+    images = generate(args.corpus, args.resolutions, args.kinds, args.formats)
+    jobs = []
+    for image in images:
+        for stage in args.stages:
+            result = spawn_job(stage, image["path"], args.iterations)
+            jobs.append({**image, "stage": stage, **result})
+            print(f"  {stage:<10} {os.path.basename(image['path']):<22} "
+                  f"median {statistics.median(result['samples_ms']):8.2f} ms", file=sys.stderr)
+
+    summary = summarize(jobs)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["summary"]
+    print(format_table(summary, baseline))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "summary": summary,
+        "jobs": jobs,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": report["meta"], "summary": summary}, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(summary, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child_main(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    sys.path.insert(0, BENCH_DIR)
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Deterministic synthetic wallpaper corpus.
+
+Generates the same images on every machine from fixed seeds using Pillow only
+(no network, no bundled binaries): smooth gradients, full-resolution noise,
+photographic-like tiles (upsampled color fields with grain), and
+near-monochrome frames, at 1080p/4K/5K/6K in JPEG and PNG.
+"""
+
+import hashlib
+import json
+import os
+import random
+
+from PIL import Image, ImageOps
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+    "5k": (5120, 2880),
+    "6k": (6016, 3384),
+}
+KINDS = ("gradient", "noise", "photo", "mono")
+FORMATS = ("jpeg", "png")
+CORPUS_VERSION = 1
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".corpus")
+
+
+def _seed(kind, resolution):
+    digest = hashlib.sha256(f"{CORPUS_VERSION}:{kind}:{resolution}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _noise(rng, size):
+    return Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3))
+
+
+def _random_color(rng):
+    return tuple(rng.randrange(256) for _ in range(3))
+
+
+def render(kind, size, seed):
+    """Return one synthetic RGB image."""
+    rng = random.Random(seed)
+    if kind == "gradient":
+        ramp = Image.linear_gradient("L").rotate(rng.choice((0, 45, 90, 135)), expand=False)
+        ramp = ramp.resize(size, Image.Resampling.BILINEAR)
+        return ImageOps.colorize(ramp, _random_color(rng), _random_color(rng), _random_color(rng))
+    if kind == "noise":
+        return _noise(rng, size)
+    if kind == "photo":
+        # Low-frequency color field upsampled smoothly, plus film-like grain.
+        field = _noise(rng, (24, 14)).resize(size, Image.Resampling.BICUBIC)
+        return Image.blend(field, _noise(rng, size), 0.08)
+    if kind == "mono":
+        base = Image.new("RGB", size, _random_color(rng))
+        return Image.blend(base, _noise(rng, size), 0.03)
+    raise ValueError(f"unknown corpus kind: {kind}")
+
+
+def corpus_entries(resolutions=None, kinds=None, formats=None):
+    """Yield (name, kind, resolution, format) for the requested slice of the corpus."""
+    for resolution in resolutions or RESOLUTIONS:
+        for kind in kinds or KINDS:
+            for fmt in formats or FORMATS:
+                ext = "jpg" if fmt == "jpeg" else "png"
+                yield f"{kind}-{resolution}.{ext}", kind, resolution, fmt
+
+
+def generate(corpus_dir=None, resolutions=None, kinds=None, formats=None):
+    """Materialize the corpus under *corpus_dir*, reusing files already generated.
+
+    Returns a list of dicts with path, kind, resolution, and format.
+    """
+    corpus_dir = corpus_dir or DEFAULT_DIR
+    os.makedirs(corpus_dir, exist_ok=True)
+    manifest_path = os.path.join(corpus_dir, "manifest.json")
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("version") != CORPUS_VERSION:
+        manifest = {"version": CORPUS_VERSION, "files": {}}
+
+    images = []
+    for name, kind, resolution, fmt in corpus_entries(resolutions, kinds, formats):
+        path = os.path.join(corpus_dir, name)
+        if name not in manifest["files"] or not os.path.isfile(path):
+            img = render(kind, RESOLUTIONS[resolution], _seed(kind, resolution))
+            if fmt == "jpeg":
+                img.save(path, "JPEG", quality=90)
+            else:
+                img.save(path, "PNG", compress_level=1)
+            manifest["files"][name] = {"kind": kind, "resolution": resolution, "format": fmt}
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+        images.append({"path": path, "kind": kind, "resolution": resolution, "format": fmt})
+    return images
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Compare palette-extraction engines on the synthetic corpus.
+
+Reports per-engine extraction latency at the working size, with and without
+histogram pre-aggregation, and how far each palette lands from raw-pixel
+median-cut, as the population-weighted mean RGB distance from each color to its
+nearest counterpart in the other palette, averaged over both directions.
+
+Usage:
+    python3 benchmarks/extractors.py [--iterations N] [--resolutions 1080p,4k]
+                                     [--kinds photo,noise] [--n-colors 8]
+                                     [--histogram-bits 0,5,6] [--working-size 200]
+"""
+
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _nearest_distance(weighted, other):
+    total = sum(count for _, count in weighted) or 1
+    return sum(count * min(math.dist(color, o) for o, _ in other) for color, count in weighted) / total
+
+
+def palette_distance(a, b):
+    """Symmetric population-weighted nearest-color RGB distance between two weighted palettes."""
+    return (_nearest_distance(a, b) + _nearest_distance(b, a)) / 2
+
+
+def main(argv=None):
+    from bench import _import_wcsync, _csv, percentile
+    from corpus import FORMATS, KINDS, RESOLUTIONS, generate
+
+    _import_wcsync()
+    from PIL import Image
+
+    from wcsync.capture import load_wallpaper_from_file
+    from wcsync.colors import EXTRACTORS, WORKING_SIZE, extract_weighted_palette
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--resolutions", type=lambda v: _csv(v, RESOLUTIONS), default=["1080p", "4k"])
+    parser.add_argument("--kinds", type=lambda v: _csv(v, KINDS), default=list(KINDS))
+    parser.add_argument("--formats", type=lambda v: _csv(v, FORMATS), default=["jpeg"])
+    parser.add_argument("--n-colors", type=int, default=8)
+    parser.add_argument("--histogram-bits", type=lambda v: [int(b) for b in _csv(v, ("0", "5", "6"))], default=[0, 5])
+    parser.add_argument("--working-size", type=int, default=WORKING_SIZE[0], help="square working size in px")
+    parser.add_argument("--corpus", help="corpus directory (default: benchmarks/.corpus)")
+    args = parser.parse_args(argv)
+
+    variants = [(name, bits) for name in EXTRACTORS for bits in args.histogram_bits]
+    samples = {variant: [] for variant in variants}
+    distances = {variant: [] for variant in variants}
+    size = (args.working_size, args.working_size)
+    for image in generate(args.corpus, args.resolutions, args.kinds, args.formats):
+        small = load_wallpaper_from_file(image["path"]).resize(size, Image.Resampling.LANCZOS)
+        reference = extract_weighted_palette(small, args.n_colors, "mediancut")
+        for name, bits in variants:
+            weighted = extract_weighted_palette(small, args.n_colors, name, bits)  # warm-up
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                weighted = extract_weighted_palette(small, args.n_colors, name, bits)
+                samples[name, bits].append((time.perf_counter() - start) * 1000)
+            distances[name, bits].append(palette_distance(weighted, reference))
+
+    print(f"{'extractor':<12} {'bits':>4} {'median ms':>10} {'p95 ms':>10} {'mean dist':>10} {'max dist':>10}")
+    for variant in variants:
+        print(
+            f"{variant[0]:<12} {variant[1] or '-':>4} {statistics.median(samples[variant]):>10.3f} "
+            f"{percentile(samples[variant], 95):>10.3f} {statistics.mean(distances[variant]):>10.2f} "
+            f"{max(distances[variant]):>10.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, BENCH_DIR)
+    sys.exit(main())
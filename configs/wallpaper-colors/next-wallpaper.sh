@@ -10,7 +10,11 @@ set -euo pipefail
 # @raycast.icon 🖼️
 # @raycast.packageName Wallpaper
 
-# Cycle to next wallpaper, then force a full color sync.
+# Cycle to next wallpaper, then sync colors (via the resident sync daemon when
+# it is running). The cycler pre-renders each upcoming wallpaper, so this sync
+# normally just publishes staged Color Material and reloads; otherwise the
+# progressive run recolors borders, SketchyBar, and Kitty from a quick 32x32
+# pass before the full extraction.
 # Works standalone or as a Raycast Script Command.
 
 SCRIPT_DIR="$HOME/.config/wallpaper-colors"
@@ -43,5 +47,7 @@ if [[ -z "$PYTHON" ]]; then
 fi
 
 bash "$SCRIPT_DIR/wallpaper_cycle.sh"
-sleep 0.5
-"$PYTHON" "$SCRIPT_DIR/wallpaper_colors.py" --force
+# Hand the sync the wallpaper the cycler just set: desktoppr may still report
+# the previous one, which would match its fingerprint and skip the sync.
+CURRENT="$(cat "$SCRIPT_DIR/.current_wallpaper" 2>/dev/null || true)"
+"$PYTHON" "$SCRIPT_DIR/wallpaper_ctl.py" progressive ${CURRENT:+"$CURRENT"}
@@ -2,14 +2,18 @@
 set -uo pipefail
 # theme_watcher.sh — Poll macOS appearance and trigger wallpaper switch when
 # dark/light mode changes. Runs as a persistent launchd daemon.
-# Poll interval 15s to limit wakeups; on change we run cycle then one sync.
+# Poll interval 15s to limit wakeups; on change we first sync (with
+# [general] appearance = "auto" that publishes the pre-rendered other
+# variant of the current wallpaper), then cycle and sync once more.
+# Set WALLPAPER_CYCLE_ON_THEME_CHANGE=0 to keep the wallpaper on a flip.
 # Note: -e is intentionally omitted so the daemon loop survives individual
 # cycle or sync failures without exiting.
 
 STATE_DIR="$HOME/.config/wallpaper-colors"
 THEME_FILE="$STATE_DIR/.last_theme"
 CYCLE_SCRIPT="$HOME/.config/wallpaper-colors/wallpaper_cycle.sh"
-COLORS_SCRIPT="$HOME/.config/wallpaper-colors/wallpaper_colors.py"
+CTL_SCRIPT="$HOME/.config/wallpaper-colors/wallpaper_ctl.py"
+CYCLE_ON_THEME_CHANGE="${WALLPAPER_CYCLE_ON_THEME_CHANGE:-1}"
 
 resolve_python_bin() {
     local raw="${WALLPAPER_PYTHON:-}"
@@ -76,7 +80,7 @@ run_color_sync() {
     sleep 1
     if [[ -z "$PYTHON" ]]; then
         echo "[$(date +%H:%M:%S)] WARN: python3 not found, skipping color sync" >&2
-    elif ! "$PYTHON" "$COLORS_SCRIPT" --force; then
+    elif ! "$PYTHON" "$CTL_SCRIPT" force; then
         echo "[$(date +%H:%M:%S)] WARN: color sync failed" >&2
     fi
 }
@@ -90,10 +94,16 @@ while true; do
         echo "$CURRENT" > "$THEME_FILE"
         LAST="$CURRENT"
 
-        if ! bash "$CYCLE_SCRIPT"; then
-            echo "[$(date +%H:%M:%S)] WARN: wallpaper cycle failed" >&2
+        # Instant variant flip: publish + reload of staged Color Material.
+        if [[ -n "$PYTHON" ]] && ! "$PYTHON" "$CTL_SCRIPT" sync >/dev/null; then
+            echo "[$(date +%H:%M:%S)] WARN: appearance sync failed" >&2
+        fi
+        if [[ "$CYCLE_ON_THEME_CHANGE" != "0" ]]; then
+            if ! bash "$CYCLE_SCRIPT"; then
+                echo "[$(date +%H:%M:%S)] WARN: wallpaper cycle failed" >&2
+            fi
+            run_color_sync
         fi
-        run_color_sync
     fi
 
     # 2) Display count change → re-apply current wallpaper + sync colors.
@@ -12,24 +12,61 @@ Extracts dominant colors from the macOS wallpaper and updates:
 - Starship prompt palette
 
 Usage:
-    python3 wallpaper_colors.py [-v|--verbose] [-f|--force]
+    python3 wallpaper_colors.py [-v|--verbose] [-f|--force] [--timings] [--progressive]
+                                [--appearance dark|light]
+    python3 wallpaper_colors.py serve    # resident daemon (see wallpaper_ctl.py)
+    python3 wallpaper_colors.py index [--workers N] [DIR]   # pre-index library
+    python3 wallpaper_colors.py prerender PATH   # stage Color Material for PATH
 """
 
 import sys
 
-from wcsync.sync_run import SyncRunError, SyncRunOptions, run_sync
+from wcsync.sync_run import SyncRunError, SyncRunOptions, prerender, run_sync
+
+
+def _flag_value(argv, flag, choices):
+    if flag not in argv:
+        return None
+    i = argv.index(flag)
+    if i + 1 >= len(argv) or (choices is not None and argv[i + 1] not in choices):
+        return None
+    return argv[i + 1]
 
 
 def options_from_argv(argv):
     return SyncRunOptions(
         verbose="--verbose" in argv or "-v" in argv,
         force="--force" in argv or "-f" in argv,
+        timings="--timings" in argv,
+        progressive="--progressive" in argv,
+        appearance=_flag_value(argv, "--appearance", ("dark", "light")),
+        wallpaper_path=_flag_value(argv, "--wallpaper", None) or "",
     )
 
 
 def main():
+    argv = sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        from wcsync.daemon import serve
+
+        return serve()
+    if argv[:1] == ["index"]:
+        from wcsync.library import index_main
+
+        return index_main(argv[1:])
+    if argv[:1] == ["prerender"]:
+        if len(argv) != 2:
+            print("usage: wallpaper_colors.py prerender PATH", file=sys.stderr)
+            return 2
+        try:
+            prerender(argv[1])
+        except SyncRunError as e:
+            print(f"prerender failed: {e}", file=sys.stderr)
+            return 1
+        return 0
+
     try:
-        run_sync(options_from_argv(sys.argv[1:]))
+        run_sync(options_from_argv(argv))
     except SyncRunError:
         return 1
     return 0
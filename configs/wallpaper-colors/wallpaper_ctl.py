@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Thin client for the resident Wallpaper Color Sync daemon.
+
+Sends one command over the daemon's Unix socket without importing Pillow,
+Quartz, or the Target App adapters. When no daemon is listening, ``sync``,
+``progressive``, and ``force`` fall back to a full in-process run of
+wallpaper_colors.py. Those three take an optional path of the wallpaper the
+caller just set, so the Sync Run does not ask desktoppr for it.
+
+Usage:
+    python3 wallpaper_ctl.py [sync|progressive|force|status|reload-config] [WALLPAPER]
+"""
+
+import json
+import os
+import sys
+
+from wcsync.control import COMMANDS, ControlError, send_command
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FALLBACK_FLAGS = {"sync": [], "progressive": ["--progressive"], "force": ["--force"]}
+
+
+def fallback(command, wallpaper_path=None):
+    """Replace this process with a one-shot Sync Run."""
+    script = os.path.join(SCRIPT_DIR, "wallpaper_colors.py")
+    args = [sys.executable, script, *FALLBACK_FLAGS[command]]
+    if wallpaper_path:
+        args += ["--wallpaper", wallpaper_path]
+    os.execv(sys.executable, args)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "sync"
+    wallpaper_path = argv[1] if len(argv) > 1 else None
+    if command not in COMMANDS or len(argv) > 2 or (wallpaper_path and command not in FALLBACK_FLAGS):
+        print(f"usage: wallpaper_ctl.py [{'|'.join(COMMANDS)}] [WALLPAPER]", file=sys.stderr)
+        return 2
+
+    try:
+        response = send_command(command, wallpaper_path=wallpaper_path)
+    except OSError as e:
+        if command in FALLBACK_FLAGS:
+            fallback(command, wallpaper_path)
+        print(f"sync daemon not reachable: {e}", file=sys.stderr)
+        return 1
+    except ControlError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    print(json.dumps(response, indent=2, sort_keys=True))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
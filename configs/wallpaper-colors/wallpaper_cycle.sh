@@ -30,6 +30,27 @@ else
     exit 1
 fi
 
+resolve_python_bin() {
+    local raw="${WALLPAPER_PYTHON:-}"
+    local candidate=""
+
+    if [[ -n "$raw" ]]; then
+        if [[ "$raw" == */* ]]; then
+            candidate="$raw"
+        elif command -v "$raw" >/dev/null 2>&1; then
+            candidate="$(command -v "$raw")"
+        fi
+
+        if [[ -n "$candidate" && -x "$candidate" && "$(basename "$candidate")" == python* ]]; then
+            printf '%s\n' "$candidate"
+            return
+        fi
+        echo "[$(date +%H:%M:%S)] WARN: ignoring invalid WALLPAPER_PYTHON=$raw" >&2
+    fi
+
+    command -v python3 || true
+}
+
 # Detect system appearance
 if defaults read -g AppleInterfaceStyle &>/dev/null; then
     THEME="dark"
@@ -146,3 +167,14 @@ atomic_write "$STATE_DIR/.current_wallpaper" "$NEXT_WP"
 
 BASENAME=$(basename "$NEXT_WP")
 echo "[$(date +%H:%M:%S)] $THEME: $BASENAME ($(( POS + 1 ))/$COUNT)"
+
+# Pre-render the upcoming wallpaper's Color Material in the background so the
+# next switch is only publish + reload. A reshuffle at the end of the order
+# has no known successor; that switch takes the normal Sync Run path.
+UPCOMING_POS=$(( POS + 1 ))
+PYTHON="$(resolve_python_bin)"
+if [[ -n "$PYTHON" && $UPCOMING_POS -lt ${#ORDER[@]} ]]; then
+    UPCOMING="${ALL_FILES[${ORDER[$UPCOMING_POS]}]}"
+    nohup "$PYTHON" "$STATE_DIR/wallpaper_colors.py" prerender "$UPCOMING" \
+        >>"$STATE_DIR/prerender.log" 2>&1 </dev/null &
+fi
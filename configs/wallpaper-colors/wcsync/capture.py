@@ -4,7 +4,10 @@ Supports file-based capture via desktoppr (preferred) and CGWindowListCreateImag
 fallback for dynamic/system wallpapers. Multi-monitor aware.
 """
 
+import hashlib
+import mmap
 import os
+import stat
 import subprocess
 import time
 import shutil
@@ -17,6 +20,10 @@ from .utils import log
 
 DESKTOPPR = shutil.which("desktoppr") or "/usr/local/bin/desktoppr"
 
+# Smallest decode worth keeping: the 200x200 working image and the 16x16 hash
+# thumbnail are both cut from it, so leave them at least a 2x supersample.
+DECODE_MIN_SIZE = (400, 400)
+
 # Window name patterns to search for wallpaper windows.
 # macOS has used different names across versions.
 _WALLPAPER_PREFIXES = ("Wallpaper-", "Desktop Picture")
@@ -41,6 +48,36 @@ def get_wallpaper_path(display=1):
         return ""
 
 
+def get_wallpaper_paths():
+    """Get every display's wallpaper path with one desktoppr call.
+
+    Returns:
+        List of path strings, index 0 = display 1 (empty on failure).
+    """
+    try:
+        result = subprocess.run([DESKTOPPR], capture_output=True, text=True, timeout=5)
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as e:
+        log(f"desktoppr failed: {e}")
+        return []
+    return [line.strip() for line in result.stdout.splitlines()]
+
+
+def system_appearance():
+    """Return "dark" or "light" from the macOS AppleInterfaceStyle default."""
+    try:
+        result = subprocess.run(
+            ["defaults", "read", "-g", "AppleInterfaceStyle"],
+            capture_output=True,
+            text=True,
+            timeout=2,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as e:
+        log(f"Appearance lookup failed: {e}; assuming dark")
+        return "dark"
+    # The key is absent (non-zero exit) in light mode.
+    return "dark" if result.returncode == 0 and "Dark" in result.stdout else "light"
+
+
 def get_display_count():
     """Return the number of connected displays via Quartz."""
     err, display_ids, count = Quartz.CGGetActiveDisplayList(16, None, None)
@@ -154,7 +191,7 @@ def capture_wallpaper(display=1, retries=3, retry_delay=0.5):
         provider = Quartz.CGImageGetDataProvider(cg_image)
         raw = Quartz.CGDataProviderCopyData(provider)
         img = Image.frombytes("RGBA", (w, h), bytes(raw), "raw", "BGRA")
-        result = img.convert("RGB")
+        result = reduce_for_extraction(img).convert("RGB")
 
         # Validate: reject all-black images (likely capture before render)
         thumb = result.resize((4, 4), Image.Resampling.NEAREST)
@@ -174,21 +211,70 @@ def capture_wallpaper(display=1, retries=3, retry_delay=0.5):
     return None
 
 
-def load_wallpaper_from_file(wp_path):
-    """Load wallpaper image from file path (avoids Dock render race)."""
+def wallpaper_fingerprint(wp_path, content_digest=False):
+    """Fingerprint a wallpaper file without decoding it.
+
+    Keyed on resolved path, inode, size, and mtime. With *content_digest*, a
+    digest of the mmap'd file bytes is folded in as well, which still costs
+    far less than an image decode.
+
+    Returns:
+        Hex digest string, or None when *wp_path* is not a regular file.
+    """
+    if not wp_path:
+        return None
+    try:
+        st = os.stat(wp_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+
+    parts = [os.path.realpath(wp_path), str(st.st_ino), str(st.st_size), str(st.st_mtime_ns)]
+    if content_digest and st.st_size:
+        try:
+            with open(wp_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                parts.append(hashlib.blake2b(m, digest_size=16).hexdigest())
+        except (OSError, ValueError) as e:
+            log(f"Content digest failed for {wp_path}: {e}")
+            return None
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def reduce_for_extraction(img, min_size=DECODE_MIN_SIZE):
+    """Box-reduce *img* by the largest integer factor that keeps it >= *min_size*."""
+    factor = min(img.width // min_size[0], img.height // min_size[1])
+    if factor < 2:
+        return img
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGB")
+    return img.reduce(factor)
+
+
+def load_wallpaper_from_file(wp_path, min_size=DECODE_MIN_SIZE):
+    """Load wallpaper image from file path (avoids Dock render race).
+
+    Decodes at reduced scale: JPEGs use DCT draft scaling (1/2, 1/4, 1/8), and
+    anything still larger than needed is box-reduced right after load, so
+    palette extraction and hashing never touch a full 5K/6K frame.
+    """
     if wp_path and os.path.isfile(wp_path):
         try:
-            return Image.open(wp_path).convert("RGB")
+            with Image.open(wp_path) as img:
+                if img.format == "JPEG":
+                    img.draft("RGB", min_size)
+                return reduce_for_extraction(img, min_size).convert("RGB")
         except Exception as e:
             log(f"Failed to load wallpaper from {wp_path}: {e}")
     return None
 
 
-def load_wallpaper(config=None):
+def load_wallpaper(config=None, wp_path=None):
     """High-level: load wallpaper image using the best available method.
 
     Prefers file-based loading via desktoppr (instant, no race condition),
     falls back to CGWindowListCreateImage (handles dynamic/system wallpapers).
+    Pass *wp_path* when the caller already looked it up.
 
     Returns:
         (PIL Image in RGB, wallpaper_path_or_None)
@@ -196,7 +282,8 @@ def load_wallpaper(config=None):
     if config is None:
         config = Config()
 
-    wp_path = get_wallpaper_path(display=config.display)
+    if wp_path is None:
+        wp_path = get_wallpaper_path(display=config.display)
     img = load_wallpaper_from_file(wp_path)
 
     if img is None:
@@ -2,13 +2,22 @@
 
 import colorsys
 import hashlib
-from collections import Counter
+import math
 
 from PIL import Image
 
 from .config import Config
 from .utils import clamp
 
+# NumPy backend, imported on the first large batch (False until tried, None if
+# NumPy is missing); the scalar code below is the reference.
+_colors_numpy = False
+
+# Working resolution for palette extraction and the dedup hash thumbnail.
+WORKING_SIZE = (200, 200)
+HASH_SIZE = (16, 16)
+# 9x8 grayscale thumbnail -> 8 horizontal gradients per row -> 64-bit dHash.
+PHASH_SIZE = (9, 8)
 
 # --- Color Math ---
 
@@ -64,39 +73,254 @@ def harmonize(target_deg, accent_deg, factor=0.25):
     return (target_deg + diff * factor) % 360
 
 
+def _linear(channel):
+    c = channel / 255
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def oklab(rgb):
+    """sRGB (0-255) -> OKLab (L, a, b); Euclidean distance there tracks perceived difference."""
+    r, g, b = (_linear(c) for c in rgb)
+    l_ = (0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b) ** (1 / 3)
+    m_ = (0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b) ** (1 / 3)
+    s_ = (0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b) ** (1 / 3)
+    return (
+        0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+        1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+        0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_,
+    )
+
+
+def scheme_delta(a, b):
+    """Largest OKLab distance between matching roles of two schemes (~0.02 is just noticeable)."""
+    return max(
+        (math.dist(oklab(a[role]), oklab(b[role])) for role in a.keys() & b.keys()),
+        default=0.0,
+    )
+
+
 # --- Extraction ---
 
 
 def image_hash(img):
     """Quick perceptual hash from any PIL Image."""
-    thumb = img.resize((16, 16), Image.Resampling.NEAREST)
+    thumb = img.resize(HASH_SIZE, Image.Resampling.NEAREST)
     return hashlib.sha256(thumb.tobytes()).hexdigest()
 
 
-def extract_palette(img, n_colors=8):
-    """Extract dominant colors using Pillow quantize (median-cut).
+def perceptual_hash(img):
+    """64-bit difference hash (dHash) of a box-filtered grayscale thumbnail, as 16 hex digits.
 
-    Expects a pre-resized image (200x200) for performance.
+    Recompression, capture dithering, and sub-pixel shifts leave most
+    neighbor-gradient bits alone, unlike image_hash.
     """
-    quantized = img.quantize(colors=n_colors, method=Image.Quantize.MEDIANCUT)
+    width, height = PHASH_SIZE
+    px = img.convert("L").resize(PHASH_SIZE, Image.Resampling.BOX).tobytes()
+    bits = 0
+    for row in range(height):
+        for col in range(width - 1):
+            i = row * width + col
+            bits = (bits << 1) | (px[i] < px[i + 1])
+    return f"{bits:016x}"
+
+
+def hamming(a, b):
+    """Number of differing bits between two hex perceptual hashes."""
+    return (int(a, 16) ^ int(b, 16)).bit_count()
+
+
+def mean_color(img):
+    """Average RGB of the whole image."""
+    return img.convert("RGB").resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+
+
+def _weighted_from_quantized(quantized, n_colors):
+    """Palette entries of a P-mode image with their pixel counts, most frequent first."""
     raw_palette = quantized.getpalette()
     if raw_palette is None:
-        return [(128, 128, 128)] * n_colors
+        return [((128, 128, 128), 0)] * n_colors
     palette_data = raw_palette[: n_colors * 3]
+    # P-mode histogram(): 256 per-index pixel counts, computed in C.
+    counts = quantized.histogram()
 
-    colors = []
+    indexed = []
     for i in range(0, len(palette_data), 3):
-        colors.append((palette_data[i], palette_data[i + 1], palette_data[i + 2]))
+        color = (palette_data[i], palette_data[i + 1], palette_data[i + 2])
+        indexed.append((color, counts[i // 3]))
+    indexed.sort(key=lambda x: x[1], reverse=True)
+    return indexed
+
+
+def _extract_mediancut(img, n_colors):
+    return _weighted_from_quantized(
+        img.quantize(colors=n_colors, method=Image.Quantize.MEDIANCUT), n_colors
+    )
+
+
+def _extract_fastoctree(img, n_colors):
+    return _weighted_from_quantized(
+        img.quantize(colors=n_colors, method=Image.Quantize.FASTOCTREE), n_colors
+    )
+
+
+KMEANS_ITERATIONS = 8
+
 
+def _lloyd_numpy(np, weighted, seeds):
+    """Population-weighted Lloyd iterations; returns ((r, g, b), count) per centroid."""
+    weights = np.array([count for _, count in weighted], dtype=np.float64)
+    points = np.array([rgb for rgb, _ in weighted], dtype=np.float64)
+    centroids = np.array(seeds, dtype=np.float64)
+
+    for _ in range(KMEANS_ITERATIONS):
+        dist = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        labels = dist.argmin(axis=1)
+        totals = np.bincount(labels, weights=weights, minlength=len(centroids))
+        moved = centroids.copy()
+        for channel in range(3):
+            sums = np.bincount(labels, weights=weights * points[:, channel], minlength=len(centroids))
+            nonempty = totals > 0
+            moved[nonempty, channel] = sums[nonempty] / totals[nonempty]
+        if np.allclose(moved, centroids, atol=0.5):
+            centroids = moved
+            break
+        centroids = moved
+
+    dist = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+    totals = np.bincount(dist.argmin(axis=1), weights=weights, minlength=len(centroids))
+    return [
+        (tuple(clamp(round(c)) for c in centroid), int(total))
+        for centroid, total in zip(centroids.tolist(), totals.tolist())
+    ]
+
+
+def _sorted_by_count(weighted):
+    return sorted(weighted, key=lambda x: x[1], reverse=True)
+
+
+def _extract_kmeans(img, n_colors):
+    """Population-weighted k-means seeded from the median-cut palette.
+
+    Runs Lloyd iterations over the image's distinct colors (histogram bins
+    after bin_colors) with NumPy; without NumPy, falls back to Pillow's
+    built-in k-means refinement of the median-cut palette.
+    """
     try:
-        pixel_data = quantized.get_flattened_data()
-    except AttributeError:
-        pixel_data = list(quantized.getdata())
+        import numpy as np
+    except ImportError:
+        return _weighted_from_quantized(
+            img.quantize(colors=n_colors, method=Image.Quantize.MEDIANCUT, kmeans=KMEANS_ITERATIONS),
+            n_colors,
+        )
 
-    counts = Counter(pixel_data)
-    indexed = [(colors[i], counts.get(i, 0)) for i in range(len(colors))]
-    indexed.sort(key=lambda x: x[1], reverse=True)
-    return [c for c, _ in indexed]
+    seeds = _extract_mediancut(img, n_colors)
+    colors = img.convert("RGB").getcolors(maxcolors=img.width * img.height)
+    if not colors:
+        return seeds
+    weighted = [(rgb, count) for count, rgb in colors]
+    return _sorted_by_count(_lloyd_numpy(np, weighted, [rgb for rgb, _ in seeds]))
+
+
+# --- Histogram pre-aggregation ---
+
+
+def bin_colors(img, bits=5):
+    """Fold *img* into a *bits*-per-channel color histogram in one C-level pass.
+
+    Each channel snaps to the center of its bin, so the result has at most
+    2**(3*bits) distinct colors; ``getcolors()`` on it is the weighted
+    histogram, and quantizers work on bins rather than raw pixel colors.
+    """
+    mask = (0xFF << (8 - bits)) & 0xFF
+    half = 1 << (7 - bits)
+    lut = [(v & mask) | half for v in range(256)]
+    return img.convert("RGB").point(lut * 3)
+
+
+# Palette-extraction engines, selected with ``[general] extractor``.
+EXTRACTORS = {
+    "mediancut": _extract_mediancut,
+    "fastoctree": _extract_fastoctree,
+    "kmeans": _extract_kmeans,
+}
+
+
+def extract_weighted_palette(img, n_colors=8, extractor="mediancut", histogram_bits=0):
+    """Extract dominant colors with their pixel populations.
+
+    Expects a pre-resized image (200x200) for performance. With
+    *histogram_bits* (5 or 6), pixels are first folded by bin_colors, so
+    the engine sees a few thousand weighted bins instead of tens of thousands
+    of distinct colors.
+
+    Returns:
+        List of ((r, g, b), count) sorted by count, most frequent first.
+    """
+    if histogram_bits:
+        img = bin_colors(img, histogram_bits)
+    return EXTRACTORS[extractor](img, n_colors)
+
+
+def extract_palette(img, n_colors=8, extractor="mediancut", histogram_bits=0):
+    """Extract dominant colors, most frequent first.
+
+    Expects a pre-resized image (200x200) for performance.
+    """
+    return [c for c, _ in extract_weighted_palette(img, n_colors, extractor, histogram_bits)]
+
+
+# --- Regions ---
+
+# Blended population share below which a color is left out of a region palette.
+REGION_MIN_SHARE = 0.04
+# A region's scheme roles are stored in the scheme as "<region>/<role>".
+REGION_SEP = "/"
+
+
+def _region_box(box, size):
+    width, height = size
+    left, top, right, bottom = box
+    x0, y0 = int(left * width), int(top * height)
+    return x0, y0, max(x0 + 1, round(right * width)), max(y0 + 1, round(bottom * height))
+
+
+def region_palettes(img, weighted, regions):
+    """Re-weight the whole-image palette for each region of the working image.
+
+    Pixels are mapped onto the palette once (a C-level remap, no second
+    quantization) and each region only histograms its crops of the index
+    image. A color's share is the region weight times its share inside the
+    region plus the remainder times its share of the whole image; colors under
+    REGION_MIN_SHARE are dropped.
+
+    Returns:
+        {region name: [((r, g, b), count), ...]} sorted by count, most frequent first.
+    """
+    colors = [c for c, _ in weighted]
+    if not colors:
+        return {name: [] for name in regions}
+    palette_img = Image.new("P", (1, 1))
+    palette_img.putpalette([v for c in colors for v in c])
+    indexed = img.convert("RGB").quantize(palette=palette_img, dither=Image.Dither.NONE)
+    overall = indexed.histogram()[: len(colors)]
+    total = sum(overall) or 1
+
+    result = {}
+    for name, spec in regions.items():
+        counts = [0] * len(colors)
+        for box in spec["boxes"]:
+            hist = indexed.crop(_region_box(box, img.size)).histogram()
+            counts = [a + b for a, b in zip(counts, hist)]
+        area = sum(counts) or 1
+        weight = spec["weight"]
+        shares = [weight * c / area + (1 - weight) * o / total for c, o in zip(counts, overall)]
+        kept = [
+            (color, round(share * total))
+            for color, share in zip(colors, shares)
+            if share >= REGION_MIN_SHARE
+        ]
+        result[name] = _sorted_by_count(kept) or list(weighted)
+    return result
 
 
 # --- Scheme Generation ---
@@ -212,3 +436,153 @@ def build_scheme(palette, config=None):
         "orange": color_at_hue(harmonize(25, accent_deg, hf), scheme_sat, scheme_val),
         "pink": color_at_hue(harmonize(340, accent_deg, 0.20), scheme_sat * 0.85, scheme_val),
     }
+
+
+# Below this many palettes NumPy's per-call overhead outweighs vectorizing.
+BATCH_MIN = 32
+
+
+def _numpy_backend():
+    """The NumPy backend module, or None when NumPy is not installed."""
+    global _colors_numpy
+    if _colors_numpy is False:
+        try:
+            from . import colors_numpy
+        except ImportError:
+            colors_numpy = None
+        _colors_numpy = colors_numpy
+    return _colors_numpy
+
+
+def build_schemes(palettes, config=None):
+    """build_scheme for many palettes at once.
+
+    Uses the NumPy backend when it is installed and the batch is large enough,
+    grouping palettes by length; output is identical to mapping build_scheme.
+    """
+    palettes = [list(p) for p in palettes]
+    backend = _numpy_backend() if len(palettes) >= BATCH_MIN else None
+    if backend is None:
+        return [build_scheme(p, config) for p in palettes]
+
+    schemes = [None] * len(palettes)
+    by_length = {}
+    for i, palette in enumerate(palettes):
+        by_length.setdefault(len(palette), []).append(i)
+    for length, indexes in by_length.items():
+        if not length:
+            continue
+        batch = backend.build_schemes([palettes[i] for i in indexes], config)
+        for i, scheme in zip(indexes, batch):
+            schemes[i] = scheme
+    return schemes
+
+
+def with_region_schemes(scheme, palettes_by_region, config=None):
+    """Add each region's scheme to *scheme* under "<region>/<role>" keys."""
+    names = list(palettes_by_region)
+    palettes = [[c for c, _ in palettes_by_region[name]] for name in names]
+    merged = dict(scheme)
+    for name, region_scheme in zip(names, build_schemes(palettes, config)):
+        merged.update({f"{name}{REGION_SEP}{role}": rgb for role, rgb in region_scheme.items()})
+    return merged
+
+
+def scheme_for_region(scheme, region=None):
+    """The plain role -> color scheme for *region*.
+
+    Roles the region does not define (or every role, when *region* is None or
+    was not extracted) come from the whole-image scheme.
+    """
+    if not any(REGION_SEP in key for key in scheme):
+        return scheme
+    base = {key: rgb for key, rgb in scheme.items() if REGION_SEP not in key}
+    if region:
+        prefix = f"{region}{REGION_SEP}"
+        base.update({key[len(prefix) :]: rgb for key, rgb in scheme.items() if key.startswith(prefix)})
+    return base
+
+
+def app_scheme(scheme, app_name, config=None):
+    """The scheme a Target App renders: its bound display's or region's roles, if any."""
+    if config is None:
+        return scheme_for_region(scheme)
+    display = config.display_bindings.get(app_name)
+    if display is not None:
+        return scheme_for_region(scheme, display_region(display))
+    return scheme_for_region(scheme, config.bindings.get(app_name))
+
+
+# --- Displays ---
+
+# Per-display (and blended) scheme roles are region roles named "display:<n>"
+# and "display:blend"; region names cannot contain ":".
+DISPLAY_PREFIX = "display:"
+
+
+def display_region(display):
+    return f"{DISPLAY_PREFIX}{display}"
+
+
+def blend_palettes(weighted_palettes, n_colors=8):
+    """Merge weighted palettes from several displays, each display weighing the same."""
+    merged = {}
+    for weighted in weighted_palettes:
+        total = sum(count for _, count in weighted) or 1
+        for color, count in weighted:
+            merged[color] = merged.get(color, 0.0) + count / total
+    top = sorted(merged.items(), key=lambda x: x[1], reverse=True)[:n_colors]
+    return [(color, round(share * WORKING_SIZE[0] * WORKING_SIZE[1])) for color, share in top]
+
+
+# --- Appearance variants ---
+
+# Light variants cap accent-like colors at this HSV value for contrast on light surfaces.
+LIGHT_MAX_VALUE = 0.62
+
+
+def _deepen(rgb, max_val=LIGHT_MAX_VALUE):
+    h, s, v = colorsys.rgb_to_hsv(rgb[0] / 255, rgb[1] / 255, rgb[2] / 255)
+    r, g, b = colorsys.hsv_to_rgb(h, s, min(v, max_val))
+    return (clamp(r * 255), clamp(g * 255), clamp(b * 255))
+
+
+def _light_roles(scheme):
+    background = scheme["light"]
+    if lum(*background) < 225:
+        background = lighten(background, 0.6)
+    foreground = scheme["dark"]
+    if lum(*foreground) > 40:
+        foreground = darken(foreground, 0.5)
+    surfaces = {
+        "dark": background,
+        "light": foreground,
+        "bar_bg": background,
+        "item_bg": darken(background, 0.92),
+        "grey": lighten(foreground, 0.45),
+    }
+    if "border_inactive" in scheme:
+        surfaces["border_inactive"] = lighten(scheme["border_inactive"], 0.5)
+    variant = {role: _deepen(rgb) for role, rgb in scheme.items()}
+    variant.update({role: rgb for role, rgb in surfaces.items() if role in scheme})
+    return variant
+
+
+def scheme_variant(scheme, appearance="dark"):
+    """The *appearance* variant of a scheme from build_scheme.
+
+    build_scheme is dark-biased and is returned as-is for "dark". The light
+    variant swaps the background and foreground surfaces and deepens the
+    accent and named colors for contrast, keeping every hue. Region roles are
+    converted per region.
+    """
+    if appearance != "light":
+        return scheme
+    variant = _light_roles(scheme_for_region(scheme))
+    regions = {key.split(REGION_SEP, 1)[0] for key in scheme if REGION_SEP in key}
+    for region in sorted(regions):
+        prefix = f"{region}{REGION_SEP}"
+        for role, rgb in _light_roles(scheme_for_region(scheme, region)).items():
+            if f"{prefix}{role}" in scheme:
+                variant[f"{prefix}{role}"] = rgb
+    return variant
@@ -0,0 +1,188 @@
+"""Vectorized NumPy backend for wcsync.colors.
+
+Array versions of the scalar color math, operating on (..., 3) arrays of 8-bit
+RGB. Every operation mirrors the scalar code (and ``colorsys``) step for step
+in float64, so results are bit-identical; tests compare the two. Importing
+this module raises ImportError when NumPy is not installed.
+"""
+
+import numpy as np
+
+from .config import Config
+
+
+def _channels(rgb):
+    rgb = np.asarray(rgb)
+    return rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+
+def clamp(v, lo=0, hi=255):
+    return np.clip(np.trunc(v), lo, hi).astype(np.int64)
+
+
+def _stack(r, g, b):
+    return np.stack([clamp(r), clamp(g), clamp(b)], axis=-1)
+
+
+def rgb_to_hsv(rgb):
+    """8-bit RGB -> (h, s, v) arrays in [0, 1], as colorsys.rgb_to_hsv(r / 255, ...)."""
+    r, g, b = (c / 255 for c in _channels(rgb))
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    rangec = maxc - minc
+    grey = minc == maxc
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = rangec / maxc
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.remainder(h / 6.0, 1.0)
+    return np.where(grey, 0.0, h), np.where(grey, 0.0, s), maxc
+
+
+def hsv_to_rgb(h, s, v):
+    """(h, s, v) in [0, 1] -> (r, g, b) float arrays in [0, 1], as colorsys.hsv_to_rgb."""
+    h, s, v = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (h, s, v)))
+    i = np.trunc(h * 6.0)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = np.remainder(i, 6).astype(np.int64)
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    grey = s == 0.0
+    return np.where(grey, v, r), np.where(grey, v, g), np.where(grey, v, b)
+
+
+def lum(rgb):
+    r, g, b = _channels(rgb)
+    return 0.299 * r + 0.587 * g + 0.114 * b
+
+
+def sat(rgb):
+    return rgb_to_hsv(rgb)[1]
+
+
+def darken(rgb, factor=0.5):
+    return clamp(np.asarray(rgb) * factor)
+
+
+def lighten(rgb, factor=0.5):
+    rgb = np.asarray(rgb)
+    return clamp(rgb + (255 - rgb) * factor)
+
+
+def color_at_hue(hue_deg, s, v):
+    r, g, b = hsv_to_rgb(np.asarray(hue_deg) / 360, s, v)
+    return _stack(r * 255, g * 255, b * 255)
+
+
+def vivify(rgb, min_sat=0.75, min_val=0.85):
+    h, s, v = rgb_to_hsv(rgb)
+    r, g, b = hsv_to_rgb(h, np.maximum(s, min_sat), np.maximum(v, min_val))
+    return _stack(r * 255, g * 255, b * 255)
+
+
+def mute(rgb, sat_factor=0.28, val_factor=0.60, min_val=0.24):
+    h, s, v = rgb_to_hsv(rgb)
+    s = np.maximum(0.08, np.minimum(1.0, s * sat_factor))
+    v = np.maximum(min_val, np.minimum(1.0, v * val_factor))
+    r, g, b = hsv_to_rgb(h, s, v)
+    return _stack(r * 255, g * 255, b * 255)
+
+
+def harmonize(target_deg, accent_deg, factor=0.25):
+    diff = np.asarray(accent_deg) - target_deg
+    diff = np.where(diff > 180, diff - 360, np.where(diff < -180, diff + 360, diff))
+    return np.remainder(target_deg + diff * factor, 360)
+
+
+def accent_scores(palettes):
+    """Accent score of every color: saturation weighted toward brighter colors."""
+    return sat(palettes) * (0.3 + 0.7 * (lum(palettes) / 255))
+
+
+def _pick_secondary(palettes, accent):
+    ah = rgb_to_hsv(accent)[0][:, None]
+    ch, cs, cv = rgb_to_hsv(palettes)
+    hue_dist = np.minimum(np.abs(ch - ah), 1.0 - np.abs(ch - ah))
+    lum_norm = lum(palettes) / 255
+    score = hue_dist * 2.0 + (cs * cv) * 1.0 + np.where((0.15 < lum_norm) & (lum_norm < 0.85), 0.3, 0.0)
+    score = np.where((palettes == accent[:, None, :]).all(axis=-1), -np.inf, score)
+
+    rows = np.arange(len(palettes))
+    best_idx = score.argmax(axis=1)
+    best = palettes[rows, best_idx]
+    fallback = ~(score[rows, best_idx] >= 0.15)
+
+    h, s, v = rgb_to_hsv(best)
+    r, g, b = hsv_to_rgb(h, np.maximum(s, 0.35), np.maximum(v, 0.45))
+    picked = _stack(r * 255, g * 255, b * 255)
+    return np.where(fallback[:, None], lighten(accent, 0.35), picked)
+
+
+def build_schemes(palettes, config=None):
+    """build_scheme for an (N, K, 3) array of N equal-length palettes."""
+    config = config or Config()
+    palettes = np.asarray(palettes, dtype=np.int64)
+    rows = np.arange(len(palettes))
+
+    if config.accent_override:
+        h = config.accent_override.lstrip("#")
+        override = [int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)]
+        accent = np.tile(np.array(override, dtype=np.int64), (len(palettes), 1))
+    else:
+        accent = palettes[rows, accent_scores(palettes).argmax(axis=1)]
+
+    accent_hue, accent_sat, accent_val = rgb_to_hsv(accent)
+    accent_sat = np.maximum(accent_sat, config.min_saturation)
+    accent_val = np.maximum(accent_val, config.min_value)
+
+    # sorted(..., key=lum) is stable: dark is the first minimum, light the last maximum.
+    lums = lum(palettes)
+    dark = palettes[rows, lums.argmin(axis=1)]
+    light = palettes[rows, lums.shape[1] - 1 - lums[:, ::-1].argmax(axis=1)]
+
+    dark = np.where((lum(dark) > 50)[:, None], darken(dark, 0.3), dark)
+    light = np.where((lum(light) < 160)[:, None], lighten(light, 0.4), light)
+    light = np.where((lum(light) < 160)[:, None], np.array([201, 209, 217]), light)
+
+    scheme_sat = np.minimum(accent_sat + 0.1, 1.0)
+    scheme_val = np.minimum(accent_val + 0.05, 1.0)
+
+    border_accent = vivify(
+        accent,
+        min_sat=max(config.border_vivify_sat, 0.65),
+        min_val=max(config.border_vivify_val, 0.85),
+    )
+    accent_deg = accent_hue * 360
+    hf = config.harmonize_factor
+
+    def wheel(target, factor=hf, s=scheme_sat):
+        return color_at_hue(harmonize(target, accent_deg, factor), s, scheme_val)
+
+    roles = {
+        "accent": color_at_hue(accent_deg, accent_sat, accent_val),
+        "secondary": _pick_secondary(palettes, accent),
+        "border_accent": border_accent,
+        "border_inactive": mute(border_accent),
+        "dark": dark,
+        "light": light,
+        "bar_bg": dark,
+        "item_bg": lighten(dark, 0.08),
+        "grey": darken(light, 0.55),
+        "red": wheel(0),
+        "green": wheel(120),
+        "yellow": wheel(50),
+        "cyan": wheel(185),
+        "purple": wheel(270),
+        "orange": wheel(25),
+        "pink": wheel(340, factor=0.20, s=scheme_sat * 0.85),
+    }
+    as_lists = {role: values.tolist() for role, values in roles.items()}
+    return [
+        {role: tuple(values[n]) for role, values in as_lists.items()} for n in range(len(palettes))
+    ]
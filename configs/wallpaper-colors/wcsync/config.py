@@ -9,6 +9,28 @@ from .target_apps import target_defaults
 from .utils import log
 
 CONFIG_PATH = os.path.expanduser("~/.config/wallpaper-colors/config.toml")
+# Palette-extraction engines (see colors.EXTRACTORS).
+EXTRACTORS = ("mediancut", "fastoctree", "kmeans")
+# Bits per channel for histogram pre-aggregation (0 quantizes raw pixels).
+HISTOGRAM_BITS = (0, 5, 6)
+# Scheme variants; "auto" follows the macOS appearance.
+APPEARANCES = ("dark", "light", "auto")
+# Default wallpaper regions Target Apps can bind to. Boxes are
+# [left, top, right, bottom] fractions of the image; weight blends the
+# region's color populations (1.0) with the whole image's (0.0).
+DEFAULT_REGIONS = {
+    "top": {"boxes": [[0.0, 0.0, 1.0, 0.05]], "weight": 0.75},  # menu-bar strip
+    "center": {"boxes": [[0.2, 0.2, 0.8, 0.8]], "weight": 0.75},
+    "edges": {
+        "boxes": [
+            [0.0, 0.0, 1.0, 0.1],
+            [0.0, 0.9, 1.0, 1.0],
+            [0.0, 0.1, 0.1, 0.9],
+            [0.9, 0.1, 1.0, 0.9],
+        ],
+        "weight": 0.75,
+    },
+}
 
 
 def _as_int(value, default, min_value=None, max_value=None):
@@ -37,6 +59,73 @@ def _as_float(value, default, min_value=None, max_value=None):
     return parsed
 
 
+def _as_bool(value, default):
+    return value if isinstance(value, bool) else default
+
+
+def _as_choice(value, default, choices):
+    return value if value in choices else default
+
+
+def _as_box(value):
+    if not isinstance(value, (list, tuple)) or len(value) != 4:
+        return None
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+        return None
+    left, top, right, bottom = (float(v) for v in value)
+    if not (0.0 <= left < right <= 1.0 and 0.0 <= top < bottom <= 1.0):
+        return None
+    return [left, top, right, bottom]
+
+
+def default_regions():
+    return {
+        name: {"boxes": [list(box) for box in spec["boxes"]], "weight": spec["weight"]}
+        for name, spec in DEFAULT_REGIONS.items()
+    }
+
+
+def _as_regions(raw):
+    regions = default_regions()
+    for name, spec in raw.items():
+        if not isinstance(spec, dict) or not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+            log(f"Ignoring region {name!r}: expected a table named [A-Za-z0-9_-]+")
+            continue
+        raw_boxes = spec.get("boxes", [])
+        boxes = [_as_box(b) for b in raw_boxes] if isinstance(raw_boxes, list) else []
+        if not boxes or None in boxes:
+            log(f"Ignoring region {name!r}: boxes must be [left, top, right, bottom] fractions")
+            continue
+        weight = _as_float(spec.get("weight", 0.75), 0.75, min_value=0.0, max_value=1.0)
+        regions[name] = {"boxes": boxes, "weight": weight}
+    return regions
+
+
+def _as_bindings(raw, regions):
+    apps = target_defaults()
+    bindings = {}
+    for app, region in raw.items():
+        if app not in apps or region not in regions:
+            log(f"Ignoring binding {app} = {region!r}: unknown Target App or region")
+            continue
+        bindings[app] = region
+    return bindings
+
+
+def _as_display_bindings(raw):
+    apps = target_defaults()
+    bindings = {}
+    for app, display in raw.items():
+        valid = display == "blend" or (
+            isinstance(display, int) and not isinstance(display, bool) and display >= 1
+        )
+        if app not in apps or not valid:
+            log(f"Ignoring display binding {app} = {display!r}: expected a display number or \"blend\"")
+            continue
+        bindings[app] = display
+    return bindings
+
+
 def _as_hex_color(value):
     if not isinstance(value, str):
         return None
@@ -55,6 +144,15 @@ class Config:
     # General
     display: int = 1
     n_colors: int = 8
+    extractor: str = "mediancut"  # one of EXTRACTORS
+    histogram_bits: int = 5  # one of HISTOGRAM_BITS
+    appearance: str = "dark"  # one of APPEARANCES
+    fingerprint_content: bool = False  # also digest file bytes for the skip fast path
+    phash_threshold: int = -1  # max dHash Hamming distance counted as unchanged (-1 disables)
+    progressive_threshold: float = 0.02  # OKLab delta that triggers a refined republish
+    scheme_hysteresis: float = 0.01  # OKLab delta to the published scheme kept as-is (0 disables)
+    reload_timeout: float = 5.0  # seconds the whole hot-reload phase may take
+    timings_log: bool = False  # append per-stage Sync Run timings to timings.jsonl
 
     # Scheme generation
     min_saturation: float = 0.45
@@ -68,9 +166,23 @@ class Config:
     border_opacity: int = 0xB3
     border_inactive_opacity: int = 0x66
 
+    # Palette/scheme cache (0 entries disables it)
+    palette_cache_entries: int = 256
+    palette_cache_max_age_days: int = 90
+
     # Target toggles
     targets: dict = field(default_factory=target_defaults)
 
+    # Wallpaper regions (name -> {"boxes", "weight"}) and Target App -> region bindings
+    regions: dict = field(default_factory=default_regions)
+    bindings: dict = field(default_factory=dict)
+    # Target App -> display number or "blend" (multi-display Sync Runs)
+    display_bindings: dict = field(default_factory=dict)
+
+    def bound_regions(self):
+        """Regions some Target App is bound to, by name."""
+        return {name: self.regions[name] for name in sorted(set(self.bindings.values()))}
+
     @classmethod
     def load(cls, path=None):
         """Load config from TOML file, falling back to defaults for missing keys."""
@@ -95,7 +207,11 @@ class Config:
         general = data.get("general", {})
         scheme = data.get("scheme", {})
         borders = data.get("borders", {})
+        cache = data.get("cache", {})
         targets_raw = data.get("targets", {})
+        regions_raw = data.get("regions", {})
+        bindings_raw = data.get("bindings", {})
+        displays_raw = data.get("displays", {})
 
         if not isinstance(general, dict):
             general = {}
@@ -103,8 +219,17 @@ class Config:
             scheme = {}
         if not isinstance(borders, dict):
             borders = {}
+        if not isinstance(cache, dict):
+            cache = {}
         if not isinstance(targets_raw, dict):
             targets_raw = {}
+        if not isinstance(regions_raw, dict):
+            regions_raw = {}
+        if not isinstance(bindings_raw, dict):
+            bindings_raw = {}
+        if not isinstance(displays_raw, dict):
+            displays_raw = {}
+        regions = _as_regions(regions_raw)
 
         targets = target_defaults()
         for key in targets:
@@ -128,6 +253,23 @@ class Config:
         return cls(
             display=_as_int(general.get("display", 1), 1, min_value=1),
             n_colors=_as_int(general.get("n_colors", 8), 8, min_value=1, max_value=256),
+            extractor=_as_choice(general.get("extractor"), "mediancut", EXTRACTORS),
+            histogram_bits=_as_choice(general.get("histogram_bits"), 5, HISTOGRAM_BITS),
+            appearance=_as_choice(general.get("appearance"), "dark", APPEARANCES),
+            fingerprint_content=_as_bool(general.get("fingerprint_content"), False),
+            phash_threshold=_as_int(
+                general.get("phash_threshold", -1), -1, min_value=-1, max_value=64
+            ),
+            timings_log=_as_bool(general.get("timings_log"), False),
+            progressive_threshold=_as_float(
+                general.get("progressive_threshold", 0.02), 0.02, min_value=0.0, max_value=1.0
+            ),
+            scheme_hysteresis=_as_float(
+                general.get("scheme_hysteresis", 0.01), 0.01, min_value=0.0, max_value=1.0
+            ),
+            reload_timeout=_as_float(
+                general.get("reload_timeout", 5.0), 5.0, min_value=0.1, max_value=60.0
+            ),
             min_saturation=_as_float(
                 scheme.get("min_saturation", 0.45), 0.45, min_value=0.0, max_value=1.0
             ),
@@ -144,5 +286,10 @@ class Config:
             ),
             border_opacity=_as_int(opacity, 0xB3, min_value=0, max_value=255),
             border_inactive_opacity=_as_int(inactive_opacity, 0x66, min_value=0, max_value=255),
+            palette_cache_entries=_as_int(cache.get("max_entries", 256), 256, min_value=0),
+            palette_cache_max_age_days=_as_int(cache.get("max_age_days", 90), 90, min_value=0),
             targets=targets,
+            regions=regions,
+            bindings=_as_bindings(bindings_raw, regions),
+            display_bindings=_as_display_bindings(displays_raw),
         )
@@ -0,0 +1,59 @@
+"""Sync daemon control socket.
+
+Shared by the resident sync daemon and thin clients. Deliberately stdlib-only
+so a client can talk to the daemon without importing Pillow or Quartz.
+"""
+
+import json
+import os
+import socket
+
+SOCKET_PATH = os.path.expanduser("~/.config/wallpaper-colors/.sync.sock")
+COMMANDS = ("sync", "progressive", "force", "status", "reload-config")
+# Commands that take an optional wallpaper path ("progressive /path/to/wall.jpg").
+SYNC_COMMANDS = ("sync", "progressive", "force")
+
+
+class ControlError(RuntimeError):
+    """Raised when the daemon answers with a malformed or failed response."""
+
+
+def encode_response(payload):
+    return (json.dumps(payload, sort_keys=True) + "\n").encode("utf-8")
+
+
+def send_command(command, socket_path=None, timeout=60.0, wallpaper_path=None):
+    """Send one command to the sync daemon and return its decoded response.
+
+    *wallpaper_path* (sync commands only) is the wallpaper the caller just
+    set, so the Sync Run does not ask desktoppr. Raises OSError when no
+    daemon is listening so callers can fall back to an in-process Sync Run.
+    """
+    if command not in COMMANDS:
+        raise ValueError(f"unknown command: {command}")
+    if wallpaper_path:
+        if command not in SYNC_COMMANDS or "\n" in wallpaper_path:
+            raise ValueError(f"cannot send a wallpaper path with {command}")
+        command = f"{command} {wallpaper_path}"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or SOCKET_PATH)
+        sock.sendall(f"{command}\n".encode("utf-8"))
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+
+    raw = b"".join(chunks).decode("utf-8").strip()
+    try:
+        response = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ControlError(f"invalid daemon response: {raw!r}") from e
+    if not isinstance(response, dict):
+        raise ControlError(f"invalid daemon response: {raw!r}")
+    return response
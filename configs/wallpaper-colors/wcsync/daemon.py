@@ -0,0 +1,246 @@
+"""Resident sync daemon.
+
+Keeps wcsync (Pillow, Quartz, Target App adapters) imported and config parsed
+between Sync Runs, watches the wallpaper Store directory itself, and accepts
+control commands over a local Unix socket (see ``control.py``).
+"""
+
+import importlib
+import os
+import select
+import socket
+import threading
+import time
+from dataclasses import asdict
+
+from .config import CONFIG_PATH, Config
+from .control import COMMANDS, SOCKET_PATH, SYNC_COMMANDS, encode_response
+from .sync_run import SyncRunError, SyncRunOptions, run_sync
+from .target_apps import all_target_apps
+from .utils import log
+
+WALLPAPER_STORE = os.path.expanduser("~/Library/Application Support/com.apple.wallpaper/Store")
+
+# Store writes arrive in bursts; wait for this much quiet before syncing.
+WATCH_DEBOUNCE = 0.3
+# Poll interval when kqueue is unavailable (non-macOS development hosts).
+WATCH_POLL_INTERVAL = 2.0
+
+
+def warm_imports():
+    """Import every Target App adapter and the reloaders up front."""
+    for app in all_target_apps():
+        importlib.import_module(f"{__package__}.writers.{app.writer_module}")
+    importlib.import_module(f"{__package__}.reloaders")
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def watch_directory(path, on_change, stop_event):
+    """Call *on_change* after bursts of changes to *path* until *stop_event* is set.
+
+    Uses kqueue vnode events on macOS and falls back to mtime polling.
+    """
+    if hasattr(select, "kqueue") and os.path.isdir(path):
+        _watch_kqueue(path, on_change, stop_event)
+    else:
+        _watch_poll(path, on_change, stop_event)
+
+
+def _watch_kqueue(path, on_change, stop_event):
+    fd = os.open(path, os.O_RDONLY)
+    kq = select.kqueue()
+    try:
+        event = select.kevent(
+            fd,
+            filter=select.KQ_FILTER_VNODE,
+            flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+            fflags=select.KQ_NOTE_WRITE | select.KQ_NOTE_EXTEND | select.KQ_NOTE_ATTRIB,
+        )
+        kq.control([event], 0, 0)
+        while not stop_event.is_set():
+            if not kq.control(None, 1, 1.0):
+                continue
+            # Drain the burst before triggering a single Sync Run.
+            while kq.control(None, 8, WATCH_DEBOUNCE):
+                pass
+            on_change()
+    finally:
+        kq.close()
+        os.close(fd)
+
+
+def _watch_poll(path, on_change, stop_event):
+    last = _mtime(path)
+    while not stop_event.wait(WATCH_POLL_INTERVAL):
+        current = _mtime(path)
+        if current != last:
+            last = current
+            on_change()
+
+
+class SyncDaemon:
+    """Long-lived Sync Run host behind a Unix-socket control API."""
+
+    def __init__(self, socket_path=None, store_dir=None, config_path=None):
+        self.socket_path = socket_path or SOCKET_PATH
+        self.store_dir = store_dir or WALLPAPER_STORE
+        self.config_path = config_path or CONFIG_PATH
+        self.started = time.time()
+        self.runs = 0
+        self.last_result = None
+        self.last_error = None
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+        self.reload_config()
+
+    def reload_config(self):
+        self.config = Config.load(self.config_path)
+        self._config_mtime = _mtime(self.config_path)
+        return self.config
+
+    def _current_config(self):
+        if _mtime(self.config_path) != self._config_mtime:
+            log("Config changed on disk, reloading")
+            self.reload_config()
+        return self.config
+
+    def sync(self, force=False, progressive=False, wallpaper_path=""):
+        with self._sync_lock:
+            config = self._current_config()
+            options = SyncRunOptions(force=force, progressive=progressive, wallpaper_path=wallpaper_path)
+            try:
+                result = run_sync(options, config=config)
+            except SyncRunError as e:
+                self.last_error = str(e)
+                return {"ok": False, "error": str(e)}
+            except Exception as e:
+                log(f"ERROR: Sync Run crashed: {e}")
+                self.last_error = str(e)
+                return {"ok": False, "error": str(e)}
+            self.runs += 1
+            self.last_result = asdict(result)
+            self.last_error = None
+            return {"ok": True, **self.last_result}
+
+    def status(self):
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 3),
+            "runs": self.runs,
+            "syncing": self._sync_lock.locked(),
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "config_path": self.config_path,
+            "store_dir": self.store_dir,
+        }
+
+    def handle(self, command):
+        """Dispatch one control command and return a JSON-serialisable response."""
+        command, _, wallpaper_path = command.strip().partition(" ")
+        if wallpaper_path and command not in SYNC_COMMANDS:
+            return {"ok": False, "error": f"{command} takes no wallpaper path"}
+        if command == "sync":
+            return self.sync(force=False, wallpaper_path=wallpaper_path)
+        if command == "progressive":
+            return self.sync(progressive=True, wallpaper_path=wallpaper_path)
+        if command == "force":
+            return self.sync(force=True, wallpaper_path=wallpaper_path)
+        if command == "status":
+            return self.status()
+        if command == "reload-config":
+            self.reload_config()
+            return {"ok": True, "config_path": self.config_path}
+        return {"ok": False, "error": f"unknown command {command!r}; expected one of {', '.join(COMMANDS)}"}
+
+    def _serve_client(self, conn):
+        with conn:
+            try:
+                conn.settimeout(5.0)
+                data = b""
+                while not data.endswith(b"\n") and len(data) < 1024:
+                    chunk = conn.recv(1024)
+                    if not chunk:
+                        break
+                    data += chunk
+                response = self.handle(data.decode("utf-8", "replace"))
+                conn.settimeout(None)
+                conn.sendall(encode_response(response))
+            except OSError as e:
+                log(f"Control client error: {e}")
+
+    def _bind(self):
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"another sync daemon is listening on {self.socket_path}")
+            finally:
+                probe.close()
+
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        server.listen(8)
+        server.settimeout(1.0)
+        self._server = server
+
+    def _on_store_change(self):
+        log("Wallpaper Store changed")
+        self.sync(force=False)
+
+    def serve_forever(self, watch=True):
+        self._bind()
+        if watch:
+            threading.Thread(
+                target=watch_directory,
+                args=(self.store_dir, self._on_store_change, self._stop),
+                name="store-watcher",
+                daemon=True,
+            ).start()
+        log(f"Sync daemon listening on {self.socket_path}")
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._server.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    if self._stop.is_set():
+                        break
+                    raise
+                threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+        finally:
+            self._server.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self._stop.set()
+
+
+def serve():
+    """CLI entry point for ``wallpaper_colors.py serve``."""
+    warm_imports()
+    daemon = SyncDaemon()
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.shutdown()
+    except RuntimeError as e:
+        log(f"ERROR: {e}")
+        return 1
+    return 0
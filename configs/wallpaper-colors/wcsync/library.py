@@ -0,0 +1,233 @@
+"""Wallpaper library index.
+
+Walks the dark/ and light/ folders under ``WALLPAPER_DIR`` ahead of time and
+records per-image metadata (dimensions, perceptual hash, weighted palette,
+mean luminance, built scheme). Results also pre-warm the palette cache, so a
+Sync Run for an indexed wallpaper skips quantization and scheme building.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image, ImageStat
+
+from .capture import load_wallpaper_from_file
+from .colors import (
+    WORKING_SIZE,
+    build_scheme,
+    build_schemes,
+    extract_weighted_palette,
+    image_hash,
+    region_palettes,
+    with_region_schemes,
+)
+from .config import Config
+from .palette_cache import PALETTE_FIELDS, PaletteCache, extraction_key
+from .utils import atomic_write, log
+
+INDEX_FILE = os.path.expanduser("~/.config/wallpaper-colors/library_index.json")
+INDEX_VERSION = 1
+THEMES = ("dark", "light")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Flush the index to disk after this many newly analyzed images so an
+# interrupted run keeps its progress.
+SAVE_EVERY = 16
+
+
+def wallpaper_dir():
+    return os.path.expanduser(os.environ.get("WALLPAPER_DIR") or "~/Pictures/wallpaper")
+
+
+def list_wallpapers(root=None):
+    """Return sorted image paths in each theme folder (top level only, like wallpaper_cycle.sh)."""
+    root = root or wallpaper_dir()
+    paths = []
+    for theme in THEMES:
+        folder = os.path.join(root, theme)
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(folder, name)
+            if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path):
+                paths.append(path)
+    return sorted(paths)
+
+
+def analyze_wallpaper(path, config):
+    """Compute index metadata for one wallpaper. Runs in a worker process."""
+    with Image.open(path) as header:
+        width, height = header.size
+    img = load_wallpaper_from_file(path)
+    if img is None:
+        raise ValueError(f"could not decode {path}")
+
+    small = img.resize(WORKING_SIZE, Image.Resampling.LANCZOS)
+    weighted = extract_weighted_palette(
+        small,
+        n_colors=config.n_colors,
+        extractor=config.extractor,
+        histogram_bits=config.histogram_bits,
+    )
+    scheme = build_scheme([c for c, _ in weighted], config)
+    regions = region_palettes(small, weighted, config.bound_regions()) if config.bindings else {}
+    scheme = with_region_schemes(scheme, regions, config)
+    return {
+        "width": width,
+        "height": height,
+        "hash": image_hash(img),
+        "luminance": round(ImageStat.Stat(small.convert("L")).mean[0], 2),
+        "palette": [[*color, count] for color, count in weighted],
+        "regions": {name: [[*c, n] for c, n in palette] for name, palette in regions.items()},
+        "scheme": {role: list(rgb) for role, rgb in scheme.items()},
+    }
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_index(path=None):
+    path = path or INDEX_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log(f"Library index unreadable ({e}); rebuilding")
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    return data
+
+
+def _save_index(path, settings, palette_settings, entries):
+    payload = {
+        "version": INDEX_VERSION,
+        "settings": settings,
+        "palette_settings": palette_settings,
+        "entries": entries,
+    }
+    atomic_write(path, json.dumps(payload, sort_keys=True, separators=(",", ":")))
+
+
+def _prewarm(cache, config, meta):
+    weighted = [((c[0], c[1], c[2]), c[3]) for c in meta["palette"]]
+    scheme = {role: tuple(rgb) for role, rgb in meta["scheme"].items()}
+    cache.put(extraction_key(meta["hash"], config), weighted, scheme)
+
+
+def build_index(root=None, index_path=None, config=None, workers=None):
+    """Index the wallpaper library, re-analyzing only new or changed files.
+
+    Files are matched on mtime and size; an extraction-settings change
+    re-analyzes everything, while a scheme-only change rebuilds every scheme
+    from the indexed palettes in one batch. *workers* of 1 runs in-process.
+
+    Returns:
+        (entries dict keyed by path, number of files analyzed this run)
+    """
+    index_path = index_path or INDEX_FILE
+    config = config or Config.load()
+    settings = extraction_key("library", config)
+    palette_settings = extraction_key("library", config, PALETTE_FIELDS)
+
+    previous = load_index(index_path)
+    same_settings = previous.get("settings") == settings
+    same_palettes = same_settings or previous.get("palette_settings") == palette_settings
+    old_entries = previous.get("entries", {}) if same_palettes else {}
+
+    entries = {}
+    pending = []
+    rescheme = []
+    for path in list_wallpapers(root):
+        try:
+            mtime_ns, size = _stat_key(path)
+        except OSError:
+            continue
+        old = old_entries.get(path)
+        if isinstance(old, dict) and old.get("mtime_ns") == mtime_ns and old.get("size") == size:
+            entries[path] = old
+            if not same_settings:
+                rescheme.append(path)
+        else:
+            pending.append((path, mtime_ns, size))
+
+    if rescheme:
+        palettes = [[tuple(c[:3]) for c in entries[path]["palette"]] for path in rescheme]
+        for path, scheme in zip(rescheme, build_schemes(palettes, config)):
+            regions = {
+                name: [((c[0], c[1], c[2]), c[3]) for c in palette]
+                for name, palette in entries[path].get("regions", {}).items()
+            }
+            scheme = with_region_schemes(scheme, regions, config)
+            entries[path] = {**entries[path], "scheme": {role: list(rgb) for role, rgb in scheme.items()}}
+        log(f"Rebuilt {len(rescheme)} schemes from indexed palettes")
+
+    cache = PaletteCache.from_config(config)
+    analyzed = 0
+
+    def record(path, mtime_ns, size, meta):
+        nonlocal analyzed
+        entries[path] = {"mtime_ns": mtime_ns, "size": size, **meta}
+        _prewarm(cache, config, meta)
+        analyzed += 1
+        if analyzed % SAVE_EVERY == 0:
+            _save_index(index_path, settings, palette_settings, entries)
+
+    if workers == 1 or len(pending) <= 1:
+        for path, mtime_ns, size in pending:
+            try:
+                record(path, mtime_ns, size, analyze_wallpaper(path, config))
+            except Exception as e:
+                log(f"Index failed for {path}: {e}")
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(analyze_wallpaper, p, config): (p, m, s) for p, m, s in pending}
+            for future in as_completed(futures):
+                path, mtime_ns, size = futures[future]
+                try:
+                    record(path, mtime_ns, size, future.result())
+                except Exception as e:
+                    log(f"Index failed for {path}: {e}")
+
+    # Cached entries still count as recently seen so rotation wallpapers stay warm.
+    for meta in entries.values():
+        if cache.get(extraction_key(meta["hash"], config)) is None:
+            _prewarm(cache, config, meta)
+
+    if analyzed or entries.keys() != old_entries.keys() or previous.get("settings") != settings:
+        _save_index(index_path, settings, palette_settings, entries)
+    cache.save()
+    return entries, analyzed
+
+
+def index_main(argv):
+    """CLI entry point for ``wallpaper_colors.py index [--workers N] [DIR]``."""
+    workers = None
+    root = None
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg == "--workers" and args:
+            try:
+                workers = max(1, int(args.pop(0)))
+            except ValueError:
+                log("ERROR: --workers expects an integer")
+                return 2
+        else:
+            root = arg
+
+    started = time.monotonic()
+    entries, analyzed = build_index(root=root, workers=workers)
+    log(
+        f"Indexed {len(entries)} wallpapers ({analyzed} analyzed) "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+    return 0
@@ -0,0 +1,215 @@
+"""Minimal Neovim msgpack-RPC client.
+
+Talks to the Unix sockets Neovim listens on (``nvim --listen`` / the default
+``$TMPDIR/nvim.$USER`` servers) directly, so reloading N instances is N socket
+round trips on one event loop instead of N ``nvim --remote-expr`` launches.
+Deliberately stdlib-only: it carries just enough msgpack for RPC messages.
+"""
+
+import asyncio
+import struct
+
+CONNECT_TIMEOUT = 0.25  # seconds
+READ_TIMEOUT = 1.0  # seconds
+
+REQUEST = 0
+RESPONSE = 1
+
+
+class RpcError(RuntimeError):
+    """Raised when Neovim answers a request with an error."""
+
+
+class _Incomplete(Exception):
+    """The buffer ends before the msgpack object does."""
+
+
+def packb(obj):
+    """Encode nil, bools, ints, floats, str, bytes, lists/tuples, and dicts."""
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif obj >= 0:
+            out += struct.pack(">BQ", 0xCF, obj)
+        else:
+            out += struct.pack(">Bq", 0xD3, obj)
+    elif isinstance(obj, float):
+        out += struct.pack(">Bd", 0xCB, obj)
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        _pack_header(len(raw), out, fix=0xA0, fix_max=31, codes=(0xD9, 0xDA, 0xDB))
+        out += raw
+    elif isinstance(obj, (bytes, bytearray)):
+        _pack_header(len(obj), out, fix=None, fix_max=-1, codes=(0xC4, 0xC5, 0xC6))
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(len(obj), out, fix=0x90, fix_max=15, codes=(None, 0xDC, 0xDD))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        _pack_header(len(obj), out, fix=0x80, fix_max=15, codes=(None, 0xDE, 0xDF))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"cannot msgpack {type(obj).__name__}")
+
+
+def _pack_header(n, out, fix, fix_max, codes):
+    code8, code16, code32 = codes
+    if n <= fix_max:
+        out.append(fix | n)
+    elif code8 is not None and n < 0x100:
+        out += struct.pack(">BB", code8, n)
+    elif n < 0x10000:
+        out += struct.pack(">BH", code16, n)
+    else:
+        out += struct.pack(">BI", code32, n)
+
+
+_FIXED = {
+    0xCA: ">f", 0xCB: ">d",
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+}  # fmt: skip
+_SIZED = {  # code -> (length format, kind)
+    0xD9: (">B", "str"), 0xDA: (">H", "str"), 0xDB: (">I", "str"),
+    0xC4: (">B", "bin"), 0xC5: (">H", "bin"), 0xC6: (">I", "bin"),
+    0xDC: (">H", "array"), 0xDD: (">I", "array"),
+    0xDE: (">H", "map"), 0xDF: (">I", "map"),
+    0xC7: (">B", "ext"), 0xC8: (">H", "ext"), 0xC9: (">I", "ext"),
+}  # fmt: skip
+_FIXEXT = {0xD4: 1, 0xD5: 2, 0xD6: 4, 0xD7: 8, 0xD8: 16}
+
+
+def unpackb(data, offset=0):
+    """Decode one object from *data* at *offset*; returns (obj, next offset).
+
+    Raises _Incomplete when *data* ends mid-object. Ext types (Neovim's
+    Buffer/Window/Tabpage handles) decode to (type code, payload bytes).
+    """
+    code = _take(data, offset, 1)[0]
+    offset += 1
+    if code <= 0x7F:
+        return code, offset
+    if code >= 0xE0:
+        return code - 0x100, offset
+    if 0x80 <= code <= 0x8F:
+        return _unpack_map(data, offset, code & 0x0F)
+    if 0x90 <= code <= 0x9F:
+        return _unpack_array(data, offset, code & 0x0F)
+    if 0xA0 <= code <= 0xBF:
+        n = code & 0x1F
+        return bytes(_take(data, offset, n)).decode("utf-8", "replace"), offset + n
+    if code == 0xC0:
+        return None, offset
+    if code in (0xC2, 0xC3):
+        return code == 0xC3, offset
+    if code in _FIXED:
+        fmt = _FIXED[code]
+        size = struct.calcsize(fmt)
+        return struct.unpack(fmt, _take(data, offset, size))[0], offset + size
+    if code in _FIXEXT:
+        n = _FIXEXT[code]
+        raw = _take(data, offset, n + 1)
+        return (struct.unpack(">b", raw[:1])[0], bytes(raw[1:])), offset + n + 1
+    if code in _SIZED:
+        fmt, kind = _SIZED[code]
+        size = struct.calcsize(fmt)
+        n = struct.unpack(fmt, _take(data, offset, size))[0]
+        offset += size
+        if kind == "array":
+            return _unpack_array(data, offset, n)
+        if kind == "map":
+            return _unpack_map(data, offset, n)
+        if kind == "ext":
+            raw = _take(data, offset, n + 1)
+            return (struct.unpack(">b", raw[:1])[0], bytes(raw[1:])), offset + n + 1
+        raw = bytes(_take(data, offset, n))
+        return (raw.decode("utf-8", "replace") if kind == "str" else raw), offset + n
+    raise ValueError(f"unsupported msgpack type 0x{code:02x}")
+
+
+def _take(data, offset, n):
+    if offset + n > len(data):
+        raise _Incomplete
+    return memoryview(data)[offset : offset + n]
+
+
+def _unpack_array(data, offset, n):
+    items = []
+    for _ in range(n):
+        item, offset = unpackb(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(data, offset, n):
+    items = {}
+    for _ in range(n):
+        key, offset = unpackb(data, offset)
+        value, offset = unpackb(data, offset)
+        items[key if not isinstance(key, list) else tuple(key)] = value
+    return items, offset
+
+
+async def _read_response(reader, msgid):
+    buffer = bytearray()
+    while True:
+        offset = 0
+        try:
+            while offset < len(buffer):
+                message, offset = unpackb(buffer, offset)
+                # Skip notifications and requests Neovim sends on its own.
+                if isinstance(message, list) and message[:2] == [RESPONSE, msgid] and len(message) == 4:
+                    return message[2], message[3]
+        except _Incomplete:
+            pass
+        del buffer[:offset]
+        chunk = await reader.read(65536)
+        if not chunk:
+            raise ConnectionError("Neovim closed the connection")
+        buffer += chunk
+
+
+async def request(sock_path, method, *params, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+    """Send one RPC request over *sock_path* and return its result.
+
+    Raises RpcError when Neovim reports an error, OSError when the socket is
+    gone or refuses, and asyncio.TimeoutError when either timeout passes.
+    """
+    reader, writer = await asyncio.wait_for(asyncio.open_unix_connection(sock_path), connect_timeout)
+    try:
+        msgid = 1
+        writer.write(packb([REQUEST, msgid, method, list(params)]))
+        await writer.drain()
+        error, result = await asyncio.wait_for(_read_response(reader, msgid), read_timeout)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    if error is not None:
+        message = error[1] if isinstance(error, list) and len(error) > 1 else error
+        raise RpcError(str(message))
+    return result
+
+
+async def exec_lua(sock_path, code, args=(), **timeouts):
+    """nvim_exec_lua(code, args) on the instance listening at *sock_path*."""
+    return await request(sock_path, "nvim_exec_lua", code, list(args), **timeouts)
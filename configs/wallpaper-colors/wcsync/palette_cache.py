@@ -0,0 +1,178 @@
+"""Persistent per-wallpaper palette and scheme cache.
+
+Maps a wallpaper content hash plus the config fields that affect extraction
+and scheme building to the weighted palette and built scheme, so a wallpaper
+seen before in the rotation skips quantization entirely. Stored as a compact
+JSON index with LRU eviction by entry count and age. The daemon, background
+prerenders, and ``index`` share the file, so saves merge with the entries on
+disk under an exclusive lock instead of overwriting them.
+"""
+
+import fcntl
+import json
+import os
+import time
+from hashlib import sha256
+
+from .utils import atomic_write, log
+
+CACHE_FILE = os.path.expanduser("~/.config/wallpaper-colors/palette_cache.json")
+CACHE_VERSION = 1
+
+# Config fields that change the extracted palette (or its region palettes).
+PALETTE_FIELDS = ("n_colors", "extractor", "histogram_bits", "regions", "bindings")
+# Config fields that change the extracted palette or the built scheme.
+EXTRACTION_FIELDS = PALETTE_FIELDS + (
+    "min_saturation",
+    "min_value",
+    "harmonize_factor",
+    "accent_override",
+    "border_vivify_sat",
+    "border_vivify_val",
+)
+
+
+def extraction_key(content_hash, config, fields=EXTRACTION_FIELDS):
+    """Cache key for a wallpaper's palette/scheme under *config*."""
+    fields = {name: getattr(config, name) for name in fields}
+    raw = json.dumps({"hash": content_hash, "config": fields}, sort_keys=True, separators=(",", ":"))
+    return sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _encode_scheme(scheme):
+    return {role: list(rgb) for role, rgb in scheme.items()}
+
+
+def _decode_scheme(raw):
+    return {role: tuple(rgb) for role, rgb in raw.items()}
+
+
+class PaletteCache:
+    """LRU palette/scheme cache backed by one JSON file.
+
+    get and put are not locked. A Sync Run calls them from its display worker
+    threads, which is safe only because each thread uses its own keys, the
+    index is loaded before the threads start, and the main thread waits for
+    the workers before it evicts or saves.
+    """
+
+    def __init__(self, path=None, max_entries=256, max_age_days=90):
+        self.path = path or CACHE_FILE
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self._entries = None
+        self._dirty = False
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            CACHE_FILE,
+            max_entries=config.palette_cache_entries,
+            max_age_days=config.palette_cache_max_age_days,
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _read(self):
+        """Entries on disk, and whether malformed ones were dropped."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}, False
+        except (OSError, ValueError) as e:
+            log(f"Palette cache unreadable ({e}); starting empty")
+            return {}, False
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}, False
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return {}, False
+        # Drop hand-edited/corrupt entries so evict() can trust the shape.
+        valid = {
+            key: entry
+            for key, entry in entries.items()
+            if isinstance(entry, dict) and isinstance(entry.get("used", 0), (int, float))
+        }
+        return valid, len(valid) != len(entries)
+
+    def load(self):
+        """Read the index from disk if it is not loaded yet; returns the entries."""
+        if self._entries is None:
+            self._entries, dropped = self._read()
+            self._dirty = self._dirty or dropped
+        return self._entries
+
+    def get(self, key):
+        """Return (weighted_palette, scheme) for *key*, or None on a miss."""
+        if not self.enabled:
+            return None
+        entry = self.load().get(key)
+        if not isinstance(entry, dict):
+            return None
+        try:
+            weighted = [((c[0], c[1], c[2]), c[3]) for c in entry["palette"]]
+            scheme = _decode_scheme(entry["scheme"])
+        except (KeyError, IndexError, TypeError, AttributeError):
+            return None
+        entry["used"] = time.time()
+        self._dirty = True
+        return weighted, scheme
+
+    def put(self, key, weighted, scheme):
+        if not self.enabled:
+            return
+        now = time.time()
+        self.load()[key] = {
+            "palette": [[*color, count] for color, count in weighted],
+            "scheme": _encode_scheme(scheme),
+            "created": now,
+            "used": now,
+        }
+        self._dirty = True
+
+    def evict(self, now=None):
+        """Drop entries older than max_age, then least-recently-used past max_entries."""
+        entries = self.load()
+        now = time.time() if now is None else now
+        before = len(entries)
+        if self.max_age > 0:
+            for key in [k for k, e in entries.items() if now - e.get("used", 0) > self.max_age]:
+                del entries[key]
+        if len(entries) > self.max_entries:
+            by_use = sorted(entries, key=lambda k: entries[k].get("used", 0), reverse=True)
+            for key in by_use[self.max_entries :]:
+                del entries[key]
+        if len(entries) != before:
+            self._dirty = True
+
+    def save(self):
+        if not self.enabled or not self._dirty:
+            return
+        entries = self.load()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            lock = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                # Keep what other processes saved since we loaded; the more
+                # recently used copy of an entry wins.
+                merged, _ = self._read()
+                for key, entry in entries.items():
+                    if entry.get("used", 0) >= merged.get(key, {}).get("used", 0):
+                        merged[key] = entry
+                self._entries = merged
+                self.evict()
+                payload = {"version": CACHE_VERSION, "entries": merged}
+                atomic_write(self.path, json.dumps(payload, separators=(",", ":")))
+            finally:
+                os.close(lock)  # releases the flock
+        except OSError as e:
+            log(f"Palette cache write failed: {e}")
+            return
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.load())
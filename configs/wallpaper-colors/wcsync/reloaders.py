@@ -1,14 +1,63 @@
-"""Hot reload functions — push new colors to running Target Apps."""
+"""Hot reload functions — push new colors to running Target Apps.
 
-import glob
+Reload functions return the ReloadCommands to run; a ReloadPipeline starts
+each app's commands on an asyncio loop as soon as it is asked to (a Sync Run
+does so as each app's Color Material is written) and reload_all waits for
+them concurrently, so reloading takes about as long as the slowest reload.
+Neovim and Kitty are reloaded in-process over their own socket protocols
+rather than by one subprocess per instance.
+"""
+
+import asyncio
+import concurrent.futures
+import json
 import os
+import re
 import subprocess
 import shutil
 import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
 
+from . import kitty_rc, nvim_rpc
+from .colors import app_scheme
 from .config import Config
+from .socket_registry import live_sockets, probe
 from .target_apps import enabled_target_apps, target_path
-from .utils import hexc, log
+from .timings import StageTimer
+from .utils import atomic_write, hexc, log
+from .writers.kitty import kitty_colors
+from .writers.sketchybar import sketchybar_colors
+from .writers.tmux import tmux_options
+
+KILL_GRACE = 0.1  # seconds an overdue reload gets between SIGTERM and SIGKILL
+KITTY_SOCKETS = "/tmp/kitty-sock-*"
+# colors.sh values last applied to the running bar, for incremental recolors.
+SKETCHYBAR_STATE_FILE = os.path.expanduser("~/.config/wallpaper-colors/.sketchybar_colors.json")
+# tmux options last set on the running server (keyed by its socket inode).
+TMUX_STATE_FILE = os.path.expanduser("~/.config/wallpaper-colors/.tmux_options.json")
+NVIM_APPLY_LUA = "package.loaded['nvim_colors'] = nil; require('nvim_colors').apply()"
+
+
+@dataclass(frozen=True)
+class ReloadCommand:
+    """One reload step: a subprocess argv (output discarded), or a coroutine
+    function run on the reload loop that returns an exit status."""
+
+    argv: tuple = ()
+    call: Callable | None = None
+
+
+@dataclass(frozen=True)
+class ReloadResult:
+    app: str
+    latency: float  # seconds from the start of the app's reload until it finished
+    returncode: int | None  # first non-zero exit code, else 0; None if nothing ran
+    timed_out: bool = False
+    commands: int = 0
 
 
 def _find_bin(name):
@@ -20,123 +69,386 @@ def _find_bin(name):
         candidate = os.path.join(prefix, name)
         if os.path.isfile(candidate):
             return candidate
-    return name  # let subprocess raise a descriptive FileNotFoundError
+    return name  # let the spawn raise a descriptive FileNotFoundError
 
 
-def reload_sketchybar(scheme=None, config=None):
-    """Reload SketchyBar config. Returns Popen for parallel wait."""
-    return subprocess.Popen(
-        [_find_bin("sketchybar"), "--reload"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
+def _command(*argv):
+    return ReloadCommand(tuple(argv))
+
+
+def _tmux_socket():
+    tmpdir = os.environ.get("TMUX_TMPDIR") or "/tmp"
+    return os.path.join(tmpdir, f"tmux-{os.getuid()}", "default")
+
+
+def _read_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _load_recolor_map(path, colors):
+    """The SketchyBar recolor map at *path*, or None when absent or malformed.
+
+    ``bar`` and ``default`` map properties to colors.sh variables, ``items``
+    maps item names to the same, and ``events`` maps an event to trigger to a
+    regex of the items whose scripts set their own colors on it.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            recolor_map = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log(f"SketchyBar recolor map unreadable ({e}); using --reload")
+        return None
+    try:
+        props = [recolor_map.get("bar", {}), recolor_map.get("default", {})]
+        props += list(recolor_map.get("items", {}).values())
+        unknown = {var for p in props for var in p.values() if var not in colors}
+        patterns = [re.compile(rx) for rx in recolor_map.get("events", {}).values()]
+    except (AttributeError, TypeError, re.error) as e:
+        log(f"SketchyBar recolor map invalid ({e}); using --reload")
+        return None
+    if unknown:
+        log(f"SketchyBar recolor map uses unknown colors ({', '.join(sorted(unknown))}); using --reload")
+        return None
+    return {**recolor_map, "patterns": patterns}
+
+
+def recolor_args(recolor_map, colors, previous):
+    """One batched sketchybar argv tail for the colors that changed since *previous*."""
+    changed = {var for var, value in colors.items() if previous.get(var) != value}
+    args = []
+    for flag, props in (("--bar", recolor_map.get("bar", {})), ("--default", recolor_map.get("default", {}))):
+        pairs = [f"{prop}={colors[var]}" for prop, var in props.items() if var in changed]
+        if pairs:
+            args += [flag, *pairs]
+    for item, props in recolor_map.get("items", {}).items():
+        pairs = [f"{prop}={colors[var]}" for prop, var in props.items() if var in changed]
+        if pairs:
+            args += ["--set", item, *pairs]
+    if changed:
+        for event in recolor_map.get("events", {}):
+            args += ["--trigger", event]
+    return args
+
+
+def _covers(recolor_map, item):
+    return item in recolor_map.get("items", {}) or any(p.fullmatch(item) for p in recolor_map["patterns"])
+
+
+async def _output(*argv):
+    proc = await asyncio.create_subprocess_exec(
+        *argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
     )
+    try:
+        out, _ = await proc.communicate()
+    except asyncio.CancelledError:
+        if proc.returncode is None:
+            proc.kill()
+        raise
+    return proc.returncode, out
 
 
-def reload_kitty(scheme=None, config=None):
-    """Live-reload Kitty colors via remote control. Returns list of Popen."""
-    procs = []
-    colors_path = target_path("kitty")
-    for sock in glob.glob("/tmp/kitty-sock-*"):
-        procs.append(
-            subprocess.Popen(
-                [
-                    _find_bin("kitten"),
-                    "@",
-                    "--to",
-                    f"unix:{sock}",
-                    "set-colors",
-                    "-a",
-                    "-c",
-                    colors_path,
-                ],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        )
-    return procs
+async def _recolor_sketchybar(sketchybar, recolor_map, colors):
+    code, out = await _output(sketchybar, "--query", "bar")
+    try:
+        items = json.loads(out)["items"] if code == 0 else None
+    except (ValueError, KeyError, TypeError):
+        items = None
+    if items is None or not all(_covers(recolor_map, item) for item in items):
+        log("SketchyBar items not covered by the recolor map; using --reload")
+        code, _ = await _output(sketchybar, "--reload")
+    else:
+        args = recolor_args(recolor_map, colors, _read_state(SKETCHYBAR_STATE_FILE))
+        code = (await _output(sketchybar, *args))[0] if args else 0
+    if code == 0:
+        atomic_write(SKETCHYBAR_STATE_FILE, json.dumps(colors, sort_keys=True))
+    return code
+
+
+def reload_sketchybar(scheme=None, config=None):
+    """Recolor SketchyBar in place from the recolor map next to colors.sh.
+
+    Without a usable map (or a scheme), falls back to ``sketchybar --reload``,
+    which re-runs sketchybarrc and every plugin script.
+    """
+    sketchybar = _find_bin("sketchybar")
+    recolor_map = None
+    if scheme is not None:
+        colors = sketchybar_colors(scheme)
+        recolor_map = _load_recolor_map(target_path("sketchybar", "recolor"), colors)
+    if recolor_map is None:
+        return _command(sketchybar, "--reload")
+    return ReloadCommand(call=partial(_recolor_sketchybar, sketchybar, recolor_map, colors))
+
+
+async def _socket_call(label, request, sock, *args):
+    """Run one socket request; returns an exit status for the ReloadResult."""
+    try:
+        await request(sock, *args)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return 0  # instance exited since the socket registry probed it
+    except (OSError, asyncio.TimeoutError, nvim_rpc.RpcError, kitty_rc.KittyError) as e:
+        log(f"{label} reload via {sock} failed: {e or type(e).__name__}")
+        return 1
+    return 0
+
+
+def reload_kitty(scheme, config=None):
+    """Live-recolor every Kitty window over its remote-control socket.
+
+    Colors go inline from the scheme, so the theme file is not re-read.
+    """
+    colors = kitty_colors(scheme)
+    return [
+        ReloadCommand(call=partial(_socket_call, "Kitty", kitty_rc.set_colors, sock, colors))
+        for sock in live_sockets(KITTY_SOCKETS)
+    ]
 
 
 def reload_nvim(scheme=None, config=None):
-    """Live-reload Neovim colors in all running instances. Returns list of Popen."""
-    procs = []
+    """Live-reload Neovim colors in all running instances over their RPC sockets."""
     user = os.environ.get("USER", "")
     sock_dir = os.path.join(tempfile.gettempdir(), f"nvim.{user}")
-    lua_cmd = "lua package.loaded['nvim_colors'] = nil; require('nvim_colors').apply()"
-    for sock in glob.glob(os.path.join(sock_dir, "*/nvim.*.0")):
-        procs.append(
-            subprocess.Popen(
-                [
-                    _find_bin("nvim"),
-                    "--server",
-                    sock,
-                    "--remote-expr",
-                    f'execute("{lua_cmd}")',
-                ],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        )
-    return procs
+    return [
+        ReloadCommand(call=partial(_socket_call, "Neovim", nvim_rpc.exec_lua, sock, NVIM_APPLY_LUA))
+        for sock in live_sockets(os.path.join(sock_dir, "*/nvim.*.0"), prune_parent=True)
+    ]
+
+
+def tmux_set_args(options, previous):
+    """``set -g`` for each option that differs from *previous*, chained with ``;``."""
+    args = []
+    for option, value in options.items():
+        if previous.get(option) != value:
+            args += [";"] if args else []
+            args += ["set", "-g", option, value]
+    return args
+
+
+async def _set_tmux_options(tmux, options, server, conf_path):
+    state = _read_state(TMUX_STATE_FILE)
+    # A restarted server sourced the theme itself, but set everything anyway.
+    previous = state.get("options", {}) if state.get("server") == server else {}
+    args = tmux_set_args(options, previous)
+    code = (await _output(tmux, *args))[0] if args else 0
+    if code != 0:
+        log("tmux set-option chain failed; sourcing the theme file")
+        code = (await _output(tmux, "source-file", conf_path))[0]
+    if code == 0:
+        atomic_write(TMUX_STATE_FILE, json.dumps({"server": server, "options": options}))
+    return code
 
 
 def reload_tmux(scheme=None, config=None):
-    """Hot-reload tmux theme include when a tmux server is running."""
-    tmux_bin = _find_bin("tmux")
-    has_session = subprocess.run(
-        [tmux_bin, "list-sessions"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-    if has_session.returncode != 0:
-        return []
+    """Apply changed theme options to a running tmux server in one invocation.
 
-    return [
-        subprocess.Popen(
-            [tmux_bin, "source-file", target_path("tmux")],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-    ]
+    The server is found by probing its default socket, so no tmux process
+    runs when none is up. Without a scheme the theme file is sourced instead.
+    """
+    sock = _tmux_socket()
+    try:
+        server = os.stat(sock).st_ino
+    except OSError:
+        return []
+    if not probe(sock):
+        return []
+    tmux = _find_bin("tmux")
+    if scheme is None:
+        return [_command(tmux, "source-file", target_path("tmux"))]
+    options = tmux_options(scheme)
+    return [ReloadCommand(call=partial(_set_tmux_options, tmux, options, server, target_path("tmux")))]
 
 
 def reload_borders(scheme, config=None):
-    """Push new active_color to running borders via IPC. Returns Popen."""
+    """Push new active_color to running borders via IPC."""
     if config is None:
         config = Config()
 
     accent = hexc(*scheme["border_accent"], a=config.border_opacity)
     inactive_rgb = scheme.get("border_inactive") or scheme.get("grey", scheme["border_accent"])
     inactive = hexc(*inactive_rgb, a=config.border_inactive_opacity)
-    return subprocess.Popen(
-        [
-            _find_bin("borders"),
-            "width=3.0",
-            f"active_color={accent}",
-            f"inactive_color={inactive}",
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
+    return _command(
+        _find_bin("borders"),
+        "width=3.0",
+        f"active_color={accent}",
+        f"inactive_color={inactive}",
     )
 
 
-def reload_all(scheme, config=None):
-    """Hot-reload all enabled Target Apps in parallel.
+async def _stop(proc):
+    """Terminate an overdue reload process, killing it if it ignores SIGTERM."""
+    if proc.returncode is not None:
+        return
+    try:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), KILL_GRACE)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
 
-    Returns after all child processes have finished.
-    """
-    if config is None:
-        config = Config()
 
+def _call_status(name, task):
+    if task.cancelled():
+        return None
+    if task.exception() is not None:
+        log(f"Reload of {name} failed: {task.exception()}")
+        return 1
+    return task.result()
+
+
+async def _reload_app(name, commands, deadline, started):
     procs = []
-    for app in enabled_target_apps(config):
+    calls = []
+    for command in commands:
+        if command.call is not None:
+            calls.append(asyncio.ensure_future(command.call()))
+            continue
+        try:
+            procs.append(
+                await asyncio.create_subprocess_exec(
+                    *command.argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            )
+        except OSError as e:
+            log(f"Skipping {name} reload: {e}")
+
+    timed_out = False
+    try:
+        waits = [asyncio.ensure_future(p.wait()) for p in procs] + calls
+        if waits:
+            _, pending = await asyncio.wait(waits, timeout=deadline)
+            if pending:
+                timed_out = True
+                log(f"Reload of {name} exceeded {deadline:.1f}s, stopping it")
+                for task in calls:
+                    task.cancel()
+                await asyncio.gather(*(_stop(p) for p in procs), *calls, return_exceptions=True)
+    finally:
+        # Cancelled by the phase deadline: leave nothing running.
+        for p in procs:
+            if p.returncode is None:
+                p.kill()
+        for task in calls:
+            task.cancel()
+
+    codes = [p.returncode for p in procs] + [_call_status(name, task) for task in calls]
+    return ReloadResult(
+        app=name,
+        latency=time.perf_counter() - started,
+        returncode=next((c for c in codes if c), 0) if codes else None,
+        timed_out=timed_out,
+        commands=len(codes),
+    )
+
+
+class ReloadPipeline:
+    """Hot reloads started app by app, as each app's Color Material lands.
+
+    ``start(name)`` launches that Target App's reload right away on an event
+    loop in a background thread, so a Sync Run can reload the apps that are
+    already written while slower writers are still running. ``finish()``
+    waits for every started reload and returns their ReloadResults in start
+    order. Each app is bounded by its TargetApp.reload_deadline, and the
+    whole phase, from the first start, by config.reload_timeout.
+    """
+
+    def __init__(self, scheme, config=None, timer=None):
+        self.scheme = scheme
+        self.config = config or Config()
+        self.timer = timer or StageTimer()
+        self.apps = {app.name: app for app in enabled_target_apps(self.config)}
+        self.started = {}  # name -> (future or ReloadResult, start time)
+        self.phase_start = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, name):
+        app = self.apps.get(name)
+        if app is None or name in self.started:
+            return
         try:
-            procs.extend(app.reload(scheme, config))
+            commands = app.reload(app_scheme(self.scheme, name, self.config), self.config)
         except FileNotFoundError as e:
-            log(f"Skipping {app.name} reload: {e}")
+            log(f"Skipping {name} reload: {e}")
+            return
+        started = time.perf_counter()
+        if self.phase_start is None:
+            self.phase_start = started
+        if not commands:
+            self.started[name] = (ReloadResult(name, 0.0, None), started)
+            return
+        deadline = min(app.reload_deadline, self.phase_start + self.config.reload_timeout - started)
+        if deadline <= 0:
+            log(f"Reload phase exceeded {self.config.reload_timeout:.1f}s, not reloading {name}")
+            self.started[name] = (ReloadResult(name, 0.0, None, timed_out=True), started)
+            return
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="reload", daemon=True)
+                self._thread.start()
+            future = asyncio.run_coroutine_threadsafe(
+                _reload_app(name, commands, deadline, started), self._loop
+            )
+        self.started[name] = (future, started)
 
-    for p in procs:
+    def _result(self, name, future, started):
+        if isinstance(future, ReloadResult):
+            return future
+        # Per-app deadlines are capped by the phase deadline; this only catches
+        # a reload that hangs even after SIGKILL.
+        limit = self.phase_start + self.config.reload_timeout + 2 * KILL_GRACE
         try:
-            p.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            log(f"Reload process {p.args[0]} timed out, killing")
-            p.kill()
+            return future.result(timeout=max(0.0, limit - time.perf_counter()))
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            return ReloadResult(name, time.perf_counter() - started, None, timed_out=True)
+
+    def finish(self):
+        results = [self._result(name, future, started) for name, (future, started) in self.started.items()]
+        self.started = {}
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                # Reap anything a phase timeout cancelled so nothing keeps running.
+                pending = asyncio.all_tasks(self._loop)
+                if pending:
+                    for task in pending:
+                        task.cancel()
+                    self._loop.run_until_complete(asyncio.wait(pending))
+                self._loop.close()
+                self._loop = self._thread = None
+        self.phase_start = None
+        for result in results:
+            self.timer.add(f"reload.{result.app}", result.latency)
+            if result.returncode and not result.timed_out:
+                log(f"Reload of {result.app} exited with status {result.returncode}")
+        return results
+
+
+def reload_all(scheme, config=None, apps=None, timer=None, pipeline=None):
+    """Hot-reload enabled Target Apps concurrently.
+
+    *apps* limits the reload to those Target App names (e.g. the apps whose
+    Color Material actually changed). Every app's commands start at once; an
+    app still running at its TargetApp.reload_deadline is terminated, and
+    the whole phase is bounded by config.reload_timeout. Apps already started on
+    *pipeline* (a ReloadPipeline fed by write_all) are not started again; all
+    of its reloads are awaited. Each app's time until its reload finished is
+    recorded on *timer*. Returns a ReloadResult per app.
+    """
+    pipeline = pipeline or ReloadPipeline(scheme, config, timer)
+    for name in pipeline.apps:
+        if apps is None or name in apps:
+            pipeline.start(name)
+    return pipeline.finish()
@@ -0,0 +1,144 @@
+"""Registry of live Kitty/Neovim control sockets.
+
+Crashed instances leave their Unix socket files behind, and every Sync Run
+would otherwise try each of them. Candidates are probed with a non-blocking
+connect (microseconds; a listener accepts or is busy, a dead socket refuses).
+A refusal alone is not proof of death (a full listen backlog or a socket not
+yet listening refuses too), so a socket is only removed when it is ours and
+the PID in its name (``kitty-sock-PID``, ``nvim.PID.0``) is gone. Other dead
+sockets are remembered by (inode, mtime) so they are not probed again until
+the file is replaced.
+"""
+
+import errno
+import glob
+import json
+import os
+import re
+import socket
+import stat
+import threading
+
+from .utils import atomic_write, log
+
+DEAD_SOCKETS_FILE = os.path.expanduser("~/.config/wallpaper-colors/.dead_sockets.json")
+
+# connect() errors that mean nothing we can reach is listening on the file.
+_DEAD_ERRNOS = (errno.ECONNREFUSED, errno.ENOENT, errno.ENOTSOCK, errno.EACCES)
+# Owner PID in kitty-sock-PID / nvim.PID.0 socket names.
+_PID_SUFFIX = re.compile(r"[.-](\d+)(?:\.\d+)?$")
+
+
+def probe(path):
+    """True when a process is listening on the Unix socket at *path*."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.setblocking(False)
+        return sock.connect_ex(path) not in _DEAD_ERRNOS
+
+
+def owner_alive(path):
+    """Whether the process named in the socket's file name is running (None: no PID)."""
+    match = _PID_SUFFIX.search(os.path.basename(path))
+    if not match or int(match.group(1)) <= 0:
+        return None
+    try:
+        os.kill(int(match.group(1)), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except (OverflowError, OSError):
+        return None
+    return True
+
+
+def _prune(path, parent=False):
+    """Remove a dead socket file we own, and with *parent* its directory if empty."""
+    try:
+        os.unlink(path)
+    except OSError:
+        return False
+    if parent:
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+    return True
+
+
+class SocketRegistry:
+    """Live sockets matching a glob pattern, with dead ones remembered."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._dead = None
+        self._lock = threading.Lock()
+
+    def _file(self):
+        return self.path or DEAD_SOCKETS_FILE
+
+    def _load(self):
+        if self._dead is None:
+            self._dead = {}
+            try:
+                with open(self._file(), "r", encoding="utf-8") as f:
+                    self._dead = {p: tuple(key) for p, key in json.load(f).items()}
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, AttributeError, TypeError) as e:
+                log(f"Dead socket registry unreadable ({e}); starting empty")
+        return self._dead
+
+    def _save(self):
+        # Forget files that are gone; a new instance gets a new inode anyway.
+        self._dead = {p: key for p, key in self._dead.items() if os.path.lexists(p)}
+        try:
+            atomic_write(self._file(), json.dumps(self._dead, sort_keys=True))
+        except OSError as e:
+            log(f"Could not save dead socket registry: {e}")
+
+    def live(self, pattern, prune_parent=False):
+        """Socket files matching *pattern* with a listener, in glob order.
+
+        *prune_parent* also removes the emptied per-instance directory of a
+        pruned socket (Neovim's ``nvim.$USER/XXXXXX/nvim.PID.0`` layout).
+        """
+        with self._lock:
+            dead = self._load()
+            changed = False
+            live = []
+            for path in glob.glob(pattern):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if not stat.S_ISSOCK(st.st_mode):
+                    continue
+                key = (st.st_ino, st.st_mtime_ns)
+                if dead.get(path) == key:
+                    continue
+                if probe(path):
+                    live.append(path)
+                    if dead.pop(path, None) is not None:
+                        changed = True
+                    continue
+                owner = owner_alive(path)
+                if owner:
+                    # Refused by a running instance (backlog full, not yet
+                    # listening): skip it this run, probe it again next run.
+                    continue
+                if owner is False and st.st_uid == os.getuid() and _prune(path, prune_parent):
+                    changed = dead.pop(path, None) is not None or changed
+                else:
+                    dead[path] = key
+                    changed = True
+            if changed:
+                self._save()
+            return live
+
+
+REGISTRY = SocketRegistry()
+
+
+def live_sockets(pattern, prune_parent=False):
+    return REGISTRY.live(pattern, prune_parent)
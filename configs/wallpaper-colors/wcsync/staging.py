@@ -0,0 +1,107 @@
+"""Pre-rendered Color Material staging.
+
+The wallpaper cycler knows the next wallpaper in its shuffled order, so the
+Sync Run work for it (decode, extraction, scheme, rendering) can happen ahead
+of time. A staged bundle is keyed by the same file fingerprint + config
+signature the Sync Run fast path uses; when that wallpaper is set, the Sync
+Run publishes the bundle and reloads without rendering anything.
+"""
+
+import json
+import os
+from hashlib import sha256
+
+from .target_writing import ColorMaterial
+from .utils import atomic_write, log
+
+STAGING_DIR = os.path.expanduser("~/.config/wallpaper-colors/staging")
+STAGING_VERSION = 1
+
+# Bundles kept on disk; the cycler only ever needs the next one or two.
+MAX_STAGED = 4
+
+
+def _bundle_path(key, staging_dir=None):
+    name = sha256(key.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(staging_dir or STAGING_DIR, f"{name}.json")
+
+
+def _encode_material(material):
+    return {
+        "content": material.content,
+        "destination_key": material.destination_key,
+        "fallback_key": material.fallback_key,
+        "owned_marker": material.owned_marker,
+    }
+
+
+def stage(key, wallpaper_path, cache_key, scheme, materials, staging_dir=None):
+    """Persist a staged bundle. *materials* maps Target App names to Color Material lists."""
+    payload = {
+        "version": STAGING_VERSION,
+        "key": key,
+        "wallpaper_path": wallpaper_path,
+        "cache_key": cache_key,
+        "scheme": {role: list(rgb) for role, rgb in scheme.items()},
+        "materials": {
+            name: [_encode_material(m) for m in app_materials]
+            for name, app_materials in materials.items()
+        },
+    }
+    path = _bundle_path(key, staging_dir)
+    atomic_write(path, json.dumps(payload, separators=(",", ":")))
+    prune(staging_dir, keep=path)
+    return path
+
+
+def has_staged(key, staging_dir=None):
+    return os.path.isfile(_bundle_path(key, staging_dir))
+
+
+def load_staged(key, staging_dir=None):
+    """Return (cache_key, scheme, materials) for *key*, or None when nothing usable is staged."""
+    path = _bundle_path(key, staging_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log(f"Staged Color Material unreadable ({e}); ignoring")
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != STAGING_VERSION or data.get("key") != key:
+        return None
+    try:
+        scheme = {role: tuple(rgb) for role, rgb in data["scheme"].items()}
+        materials = {
+            name: [ColorMaterial(**m) for m in app_materials]
+            for name, app_materials in data["materials"].items()
+        }
+    except (KeyError, TypeError, AttributeError):
+        return None
+    return data.get("cache_key"), scheme, materials
+
+
+def discard(key, staging_dir=None):
+    try:
+        os.unlink(_bundle_path(key, staging_dir))
+    except OSError:
+        pass
+
+
+def prune(staging_dir=None, keep=None, max_staged=MAX_STAGED):
+    """Drop the oldest bundles beyond *max_staged*."""
+    staging_dir = staging_dir or STAGING_DIR
+    try:
+        names = [n for n in os.listdir(staging_dir) if n.endswith(".json")]
+    except OSError:
+        return
+    paths = [os.path.join(staging_dir, n) for n in names]
+    paths = [p for p in paths if p != keep]
+    paths.sort(key=lambda p: os.stat(p).st_mtime_ns if os.path.exists(p) else 0, reverse=True)
+    for path in paths[max(0, max_staged - (1 if keep else 0)) :]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
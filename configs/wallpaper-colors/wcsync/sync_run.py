@@ -9,27 +9,85 @@ from __future__ import annotations
 import json
 import os
 import subprocess
-from dataclasses import asdict, dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from functools import partial
 from hashlib import sha256
 
 from PIL import Image
 
-from .capture import DESKTOPPR, load_wallpaper
-from .colors import build_scheme, extract_palette, image_hash, lum, sat
+from .capture import (
+    DESKTOPPR,
+    get_wallpaper_path,
+    get_wallpaper_paths,
+    load_wallpaper,
+    load_wallpaper_from_file,
+    system_appearance,
+    wallpaper_fingerprint,
+)
+from .colors import (
+    WORKING_SIZE,
+    app_scheme,
+    blend_palettes,
+    build_scheme,
+    display_region,
+    extract_weighted_palette,
+    hamming,
+    image_hash,
+    lum,
+    mean_color,
+    perceptual_hash,
+    region_palettes,
+    sat,
+    scheme_delta,
+    scheme_variant,
+    with_region_schemes,
+)
 from .config import Config
-from .reloaders import reload_all
-from .target_writing import write_all
-from .target_apps import target_env_material
+from .palette_cache import PaletteCache, extraction_key
+from .reloaders import ReloadPipeline, reload_all
+from .staging import discard, has_staged, load_staged, stage
+from .target_writing import render_target_app, write_all
+from .target_apps import enabled_target_apps, target_env_material
+from .timings import StageTimer, append_timings_log, format_timings
 from .utils import atomic_write, hexc, log
 
 CACHE_FILE = os.path.expanduser("~/.config/wallpaper-colors/.last_hash")
 LAST_WP_FILE = os.path.expanduser("~/.config/wallpaper-colors/.last_wp_path")
+FINGERPRINT_FILE = os.path.expanduser("~/.config/wallpaper-colors/.last_fingerprint")
+PHASH_FILE = os.path.expanduser("~/.config/wallpaper-colors/.last_phash")
+SCHEME_FILE = os.path.expanduser("~/.config/wallpaper-colors/.last_scheme.json")
+
+# Progressive Sync Runs extract the provisional scheme from this downsample.
+PROGRESSIVE_SIZE = (32, 32)
+
+# Config fields that only steer how a Sync Run behaves (skip checks, timeouts,
+# logging, cache sizing), not the Color Material it produces; changing them
+# must not invalidate the cache key, staged bundles, or fingerprints.
+RUNTIME_FIELDS = (
+    "fingerprint_content",
+    "phash_threshold",
+    "progressive_threshold",
+    "scheme_hysteresis",
+    "reload_timeout",
+    "timings_log",
+    "palette_cache_entries",
+    "palette_cache_max_age_days",
+)
+
+# Max per-channel drift of the mean color for a perceptual-hash match; dHash
+# is grayscale, so this keeps hue-shifted variants of a wallpaper apart.
+PHASH_MEAN_TOLERANCE = 8
 
 
 @dataclass(frozen=True)
 class SyncRunOptions:
     verbose: bool = False
     force: bool = False
+    timings: bool = False
+    progressive: bool = False  # publish latency-critical apps from a 32x32 pass first
+    appearance: str | None = None  # "dark" or "light"; overrides [general] appearance
+    wallpaper_path: str = ""  # just set by the caller; used instead of asking desktoppr
 
 
 @dataclass(frozen=True)
@@ -37,6 +95,7 @@ class SyncRunResult:
     skipped: bool
     cache_key: str | None = None
     wallpaper_path: str = ""
+    timings: dict = field(default_factory=dict)  # stage -> milliseconds
 
 
 class SyncRunError(RuntimeError):
@@ -45,8 +104,11 @@ class SyncRunError(RuntimeError):
 
 def config_signature(config):
     """Hash config and Target App env overrides that affect generated files."""
+    fields = asdict(config)
+    for name in RUNTIME_FIELDS:
+        del fields[name]
     payload = {
-        "config": asdict(config),
+        "config": fields,
         "env": target_env_material(),
     }
     raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
@@ -57,6 +119,75 @@ def build_cache_key(wallpaper_hash, config):
     return f"{wallpaper_hash}:{config_signature(config)}"
 
 
+def resolve_appearance(config, override=None):
+    """Return (config with a concrete dark/light appearance, whether it was "auto").
+
+    The resolved appearance is part of the config signature, so every cache
+    and staging key distinguishes the two variants.
+    """
+    appearance = override or config.appearance
+    auto = appearance == "auto"
+    if auto:
+        appearance = system_appearance()
+    if appearance != config.appearance:
+        config = replace(config, appearance=appearance)
+    return config, auto
+
+
+def _read_state(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _perceptual_state(img, signature):
+    return {"phash": perceptual_hash(img), "mean": list(mean_color(img)), "config": signature}
+
+
+def _perceptual_distance(previous, current):
+    """dHash distance to the last synced wallpaper, or None when not comparable."""
+    try:
+        if previous["config"] != current["config"]:
+            return None
+        drift = max(abs(a - b) for a, b in zip(previous["mean"], current["mean"]))
+        if drift > PHASH_MEAN_TOLERANCE:
+            return None
+        return hamming(previous["phash"], current["phash"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _read_perceptual_state():
+    raw = _read_state(PHASH_FILE)
+    try:
+        return json.loads(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def _read_published_scheme():
+    raw = _read_state(SCHEME_FILE)
+    try:
+        return json.loads(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def _held_delta(published, scheme, cache_key, config):
+    """OKLab delta to the last published scheme when within scheme_hysteresis, else None."""
+    try:
+        if published["config"] != cache_key.split(":", 1)[1]:
+            return None
+        if published["scheme"].keys() != scheme.keys():
+            return None
+        delta = scheme_delta(published["scheme"], scheme)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+    return delta if delta <= config.scheme_hysteresis else None
+
+
 def _log_verbose_palette(palette, scheme):
     print("Palette:")
     for color in palette:
@@ -70,52 +201,418 @@ def _log_verbose_palette(palette, scheme):
     print(f"Light:     {hexc(*scheme['light'])}")
 
 
-def run_sync(options=None):
-    """Run one wallpaper color sync lifecycle."""
-    options = options or SyncRunOptions()
+def _scheme_for(img, wallpaper_hash, config, palette_cache, verbose=False, timer=None):
+    """Return (weighted_palette, scheme), reusing the palette cache when possible."""
+    timer = timer or StageTimer()
+    palette_key = extraction_key(wallpaper_hash, config)
+    with timer.stage("palette_cache"):
+        cached = palette_cache.get(palette_key)
+    if cached is not None:
+        if verbose:
+            log("Palette cache hit")
+        return cached
 
-    config = Config.load()
-    log("Triggered")
+    with timer.stage("resize"):
+        small = img.resize(WORKING_SIZE, Image.Resampling.LANCZOS)
+    with timer.stage("quantize"):
+        weighted = extract_weighted_palette(
+            small,
+            n_colors=config.n_colors,
+            extractor=config.extractor,
+            histogram_bits=config.histogram_bits,
+        )
+    with timer.stage("scheme"):
+        scheme = build_scheme([c for c, _ in weighted], config)
+    if config.bindings:
+        # Region palettes come from the same working image: no second decode or quantize.
+        with timer.stage("regions"):
+            regions = region_palettes(small, weighted, config.bound_regions())
+            scheme = with_region_schemes(scheme, regions, config)
+    palette_cache.put(palette_key, weighted, scheme)
+    return weighted, scheme
+
+
+def _extra_displays(config, display_count):
+    """Displays besides config.display whose wallpapers the Sync Run extracts."""
+    bound = set(config.display_bindings.values())
+    displays = {d for d in bound if d != "blend"}
+    if "blend" in bound:
+        displays.update(range(1, display_count + 1))
+    displays.discard(config.display)
+    return sorted(displays)
+
+
+def _path_for(paths, display):
+    return paths[display - 1] if 0 < display <= len(paths) else ""
+
+
+def _combined_fingerprint(fingerprint, extra_paths, config):
+    parts = [fingerprint]
+    parts += [wallpaper_fingerprint(p, config.fingerprint_content) for p in extra_paths.values()]
+    if None in parts:
+        return None
+    return sha256("\0".join(parts).encode("utf-8")).hexdigest()
 
-    img, wp_path = load_wallpaper(config)
+
+def _display_palette(display, wp_path, config, palette_cache):
+    """Decode and extract one extra display's wallpaper. Runs in a worker thread.
+
+    No window-capture fallback: it cannot reliably tell displays apart, so an
+    unreadable file means the display's apps use config.display instead.
+    """
+    img = load_wallpaper_from_file(wp_path)
     if img is None:
-        log("ERROR: Could not load wallpaper")
-        raise SyncRunError("Could not load wallpaper")
-    if options.verbose:
-        log(f"Loaded wallpaper: {img.size[0]}x{img.size[1]} ({wp_path or 'capture'})")
+        raise SyncRunError(f"could not load wallpaper for display {display}")
+    wallpaper_hash = image_hash(img)
+    weighted, _ = _scheme_for(img, wallpaper_hash, config, palette_cache)
+    return wallpaper_hash, weighted
+
+
+def _join_displays(futures, config):
+    displays = {}
+    for display, future in futures.items():
+        try:
+            displays[display] = future.result()
+        except Exception as e:
+            log(f"Display {display} skipped ({e}); its apps use display {config.display}")
+    return displays
+
+
+def _displays_digest(displays):
+    raw = ":".join(f"{d}={displays[d][0]}" for d in sorted(displays))
+    return sha256(raw.encode("utf-8")).hexdigest()
+
 
+def _with_display_schemes(scheme, weighted, displays, config):
+    """Add per-display and blended roles for the displays Target Apps are bound to."""
+    bound = set(config.display_bindings.values())
+    palettes = {display_region(d): w for d, (_, w) in displays.items() if d in bound}
+    if "blend" in bound:
+        every = [weighted, *(w for _, w in displays.values())]
+        palettes[display_region("blend")] = blend_palettes(every, config.n_colors)
+    return with_region_schemes(scheme, palettes, config)
+
+
+def _publish_provisional(img, config, hold=None):
+    """Extract a scheme from a tiny downsample and publish + reload latency-critical apps.
+
+    Returns (provisional scheme, names of apps published from it, a callable
+    that awaits their reloads), or None when *hold* says the published scheme
+    is already close enough. The reloads keep running while the caller does
+    the full-resolution extraction.
+    """
+    tiny = img.resize(PROGRESSIVE_SIZE, Image.Resampling.BOX)
+    weighted = extract_weighted_palette(
+        tiny,
+        n_colors=config.n_colors,
+        extractor=config.extractor,
+        histogram_bits=config.histogram_bits,
+    )
+    scheme = scheme_variant(build_scheme([c for c, _ in weighted], config), config.appearance)
+    if hold is not None and hold(scheme):
+        return None
+    critical = [app.name for app in enabled_target_apps(config) if app.latency_critical]
+    reloads = ReloadPipeline(scheme, config)
+    result = write_all(scheme, config, apps=critical, on_changed=reloads.start)
+    finish = reloads.finish
+    if result.changed:
+        finish = partial(reload_all, scheme, config, apps=result.changed, pipeline=reloads)
+    return scheme, [name for name in critical if name not in result.failed], finish
+
+
+def _render_materials(scheme, config):
+    materials = {}
+    for app in enabled_target_apps(config):
+        try:
+            app_materials = render_target_app(app, app_scheme(scheme, app.name, config), config)
+        except Exception as e:
+            # That app renders at publish time instead.
+            log(f"Pre-render {app.name} failed: {e}")
+            continue
+        if app_materials is not None:
+            materials[app.name] = app_materials
+    return materials
+
+
+def _stage_flip(config, wp_path, fingerprint, cache_key, palette_cache=None):
+    """Stage the other appearance's Color Material for the current wallpaper.
+
+    Keyed like the fingerprint fast path under the flipped appearance, so the
+    Sync Run after a dark/light switch publishes it without decoding.
+    """
+    other = replace(config, appearance="light" if config.appearance == "dark" else "dark")
+    key = f"{fingerprint}:{config_signature(other)}"
+    if has_staged(key):
+        return
+    wallpaper_hash = cache_key.split(":", 1)[0]
+    palette_cache = palette_cache or PaletteCache.from_config(config)
+    cached = palette_cache.get(extraction_key(wallpaper_hash, config))
+    if cached is None:
+        return
+    scheme = scheme_variant(cached[1], other.appearance)
+    stage(key, wp_path, build_cache_key(wallpaper_hash, other), scheme, _render_materials(scheme, other))
+    log(f"Staged {other.appearance} Color Material for {os.path.basename(wp_path)}")
+
+
+def prerender(wp_path, config=None):
+    """Stage Color Material for *wp_path* before it becomes the wallpaper.
+
+    Returns the staging key, which matches the fingerprint key run_sync
+    computes once *wp_path* is set.
+    """
+    config, _ = resolve_appearance(config or Config.load())
+    fingerprint = wallpaper_fingerprint(wp_path, config.fingerprint_content)
+    if not fingerprint:
+        raise SyncRunError(f"Not a wallpaper file: {wp_path}")
+    key = f"{fingerprint}:{config_signature(config)}"
+    if has_staged(key):
+        log(f"Already staged: {wp_path}")
+        return key
+
+    img = load_wallpaper_from_file(wp_path)
+    if img is None:
+        raise SyncRunError(f"Could not load wallpaper: {wp_path}")
     current_hash = image_hash(img)
-    current_cache_key = build_cache_key(current_hash, config)
-    if not options.force and os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r") as f:
-            if f.read().strip() == current_cache_key:
-                log("Unchanged, skipping")
-                return SyncRunResult(skipped=True, cache_key=current_cache_key, wallpaper_path=wp_path)
+    palette_cache = PaletteCache.from_config(config)
+    _, scheme = _scheme_for(img, current_hash, config, palette_cache)
+    scheme = scheme_variant(scheme, config.appearance)
+    materials = _render_materials(scheme, config)
+
+    stage(key, wp_path, build_cache_key(current_hash, config), scheme, materials)
+    palette_cache.save()
+    log(f"Staged Color Material for {os.path.basename(wp_path)} ({len(materials)} apps)")
+    return key
 
-    small = img.resize((200, 200), Image.Resampling.LANCZOS)
 
+def run_sync(options=None, config=None):
+    """Run one wallpaper color sync lifecycle.
+
+    *config* lets a resident caller (the sync daemon) reuse an already-parsed
+    Config; otherwise it is loaded from disk. Per-stage timings (ms) are
+    returned on the result.
+    """
+    options = options or SyncRunOptions()
+    timer = StageTimer()
+
+    if config is None:
+        with timer.stage("config"):
+            config = Config.load()
+    log("Triggered")
+    config, auto = resolve_appearance(config, options.appearance)
+
+    result = _run_stages(options, config, timer, stage_flip=auto)
+    result = replace(result, timings=timer.as_dict())
+    if options.timings:
+        print("Timings:")
+        print(format_timings(result.timings))
+    if config.timings_log:
+        append_timings_log(result.timings, result.skipped)
+    return result
+
+
+def _record_state(cache_key, palette_cache, wp_path, fingerprint_key, perceptual, staged):
+    atomic_write(CACHE_FILE, cache_key)
+    if palette_cache is not None:
+        palette_cache.save()
     if wp_path:
-        subprocess.run([DESKTOPPR, wp_path], capture_output=True)
+        atomic_write(LAST_WP_FILE, wp_path)
+        if fingerprint_key:
+            atomic_write(FINGERPRINT_FILE, fingerprint_key)
+    if perceptual is not None:
+        atomic_write(PHASH_FILE, json.dumps(perceptual))
+    else:
+        # Staged publish: no decode, so the previous wallpaper's hash is stale.
+        try:
+            os.unlink(PHASH_FILE)
+        except OSError:
+            pass
+    if staged is not None:
+        discard(fingerprint_key)
+
+
+def _run_stages(options, config, timer, stage_flip=False):
+    # Fast path: an unchanged wallpaper file + config skips before any decode.
+    with timer.stage("wallpaper_path"):
+        extra_paths = {}
+        if config.display_bindings:
+            # Every display's wallpaper from one desktoppr call.
+            paths = get_wallpaper_paths()
+            wp_path = options.wallpaper_path or _path_for(paths, config.display)
+            # Bound displays that are not connected have no path; their apps
+            # use config.display and must not defeat the fingerprint fast path.
+            extra_paths = {
+                d: path for d in _extra_displays(config, len(paths)) if (path := _path_for(paths, d))
+            }
+        elif options.wallpaper_path:
+            # desktoppr can still report the previous wallpaper right after a switch.
+            wp_path = options.wallpaper_path
+        else:
+            wp_path = get_wallpaper_path(display=config.display)
+    with timer.stage("fingerprint"):
+        fingerprint = wallpaper_fingerprint(wp_path, config.fingerprint_content)
+        if fingerprint and extra_paths:
+            fingerprint = _combined_fingerprint(fingerprint, extra_paths, config)
+        fingerprint_key = f"{fingerprint}:{config_signature(config)}" if fingerprint else None
+        unchanged = fingerprint_key and _read_state(FINGERPRINT_FILE) == fingerprint_key
+    if not options.force and unchanged:
+        log("Unchanged (file fingerprint), skipping")
+        return SyncRunResult(skipped=True, wallpaper_path=wp_path)
+
+    # Pre-rendered by the cycler: publish + reload, no decode or rendering.
+    with timer.stage("staged"):
+        staged = load_staged(fingerprint_key) if fingerprint_key and not options.force else None
+    palette_cache = None
+    perceptual = None
+    provisional = None
+    last_published = None
+    if not options.force and config.scheme_hysteresis > 0:
+        last_published = _read_published_scheme()
+    if staged is not None:
+        current_cache_key, scheme, materials = staged
+        log("Publishing staged Color Material")
+    else:
+        materials = None
+        palette_cache = PaletteCache.from_config(config)
+        # Other displays decode and extract in worker threads (Pillow releases
+        # the GIL) while this thread handles config.display.
+        pool = None
+        if extra_paths:
+            palette_cache.load()  # before worker threads share the index
+            pool = ThreadPoolExecutor(max_workers=len(extra_paths))
+            futures = {
+                d: pool.submit(_display_palette, d, path, config, palette_cache)
+                for d, path in extra_paths.items()
+            }
+        with timer.stage("decode"):
+            img, wp_path = load_wallpaper(config, wp_path=wp_path)
+        if img is None:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            log("ERROR: Could not load wallpaper")
+            raise SyncRunError("Could not load wallpaper")
+        if options.verbose:
+            log(f"Loaded wallpaper: {img.size[0]}x{img.size[1]} ({wp_path or 'capture'})")
+
+        with timer.stage("hash"):
+            current_hash = image_hash(img)
+        displays = {}
+        if pool is not None:
+            with timer.stage("displays"):
+                displays = _join_displays(futures, config)
+                pool.shutdown()
+        signature = config_signature(config)
+        state_hash = current_hash
+        if displays:
+            # Every display's pixels are part of the unchanged check.
+            signature = f"{signature}:{_displays_digest(displays)}"
+            state_hash = sha256(f"{current_hash}:{_displays_digest(displays)}".encode("utf-8")).hexdigest()
+        current_cache_key = build_cache_key(state_hash, config)
+        if not options.force and os.path.exists(CACHE_FILE):
+            with open(CACHE_FILE, "r") as f:
+                if f.read().strip() == current_cache_key:
+                    log("Unchanged, skipping")
+                    # Same pixels behind a new stat fingerprint (e.g. touched file):
+                    # remember it so the next run takes the fast path.
+                    if wp_path and fingerprint_key:
+                        atomic_write(FINGERPRINT_FILE, fingerprint_key)
+                    return SyncRunResult(
+                        skipped=True, cache_key=current_cache_key, wallpaper_path=wp_path
+                    )
+
+        # Near-duplicate pixels (recompressed copy, capture dithering, tiny
+        # shifts) count as unchanged too.
+        with timer.stage("phash"):
+            perceptual = _perceptual_state(img, signature)
+            distance = None
+            if not options.force and config.phash_threshold >= 0:
+                distance = _perceptual_distance(_read_perceptual_state(), perceptual)
+        if distance is not None and distance <= config.phash_threshold:
+            log(f"Unchanged (perceptual hash, distance {distance}), skipping")
+            if wp_path and fingerprint_key:
+                atomic_write(FINGERPRINT_FILE, fingerprint_key)
+            return SyncRunResult(skipped=True, cache_key=current_cache_key, wallpaper_path=wp_path)
+
+        # Progressive: on a palette cache miss, show colors from a 32x32 pass
+        # in the latency-critical apps before the full-resolution extraction.
+        if options.progressive and palette_cache.get(extraction_key(current_hash, config)) is None:
+            with timer.stage("provisional"):
+                provisional = _publish_provisional(
+                    img, config, hold=lambda s: _held_delta(last_published, s, current_cache_key, config) is not None
+                )
+        try:
+            weighted, scheme = _scheme_for(
+                img, current_hash, config, palette_cache, options.verbose, timer
+            )
+        finally:
+            if provisional is not None:
+                provisional[2]()
+        if displays:
+            scheme = _with_display_schemes(scheme, weighted, displays, config)
+        scheme = scheme_variant(scheme, config.appearance)
+        if options.verbose:
+            _log_verbose_palette([c for c, _ in weighted], scheme)
+
+    if wp_path:
+        with timer.stage("propagate"):
+            subprocess.run([DESKTOPPR, wp_path], capture_output=True)
         if options.verbose:
             log(f"Propagated wallpaper to all spaces: {wp_path}")
 
-    palette = extract_palette(small, n_colors=config.n_colors)
-    scheme = build_scheme(palette, config)
+    # Hysteresis: a scheme imperceptibly close to the published one is not
+    # worth a rewrite and reload. Skipped if a provisional pass already published.
+    held = _held_delta(last_published, scheme, current_cache_key, config) if provisional is None else None
+    if held is not None:
+        log(f"Scheme within {held:.3f} of the published one; keeping it")
+        with timer.stage("state"):
+            _record_state(current_cache_key, palette_cache, wp_path, fingerprint_key, perceptual, staged)
+        return SyncRunResult(skipped=True, cache_key=current_cache_key, wallpaper_path=wp_path)
 
-    if options.verbose:
-        _log_verbose_palette(palette, scheme)
+    apps = None
+    if provisional is not None:
+        provisional_scheme, published, _ = provisional
+        delta = scheme_delta(provisional_scheme, scheme)
+        if delta <= config.progressive_threshold:
+            # Close enough: the provisional publish stands for those apps, unless
+            # they are bound to a region the 32x32 pass did not extract.
+            published = [
+                name
+                for name in published
+                if name not in config.bindings and name not in config.display_bindings
+            ]
+            apps = [app.name for app in enabled_target_apps(config) if app.name not in published]
+            log(f"Refined scheme within {delta:.3f} of provisional; keeping it for {', '.join(published)}")
+        else:
+            log(f"Refined scheme moved {delta:.3f} from provisional; republishing")
 
-    failed_writers = write_all(scheme, config)
-    if failed_writers:
-        failures = ", ".join(sorted(failed_writers))
+    # Each app's reload starts as soon as its own material is published;
+    # the cache below is still only written once every writer succeeded.
+    reloads = ReloadPipeline(scheme, config, timer=timer)
+    with timer.stage("write"):
+        write_result = write_all(
+            scheme, config, staged=materials, timer=timer, apps=apps, on_changed=reloads.start
+        )
+    if write_result.failed:
+        reloads.finish()
+        failures = ", ".join(sorted(write_result.failed))
         log(f"ERROR: writer failures ({failures}); not caching")
         raise SyncRunError(f"writer failures: {failures}")
 
-    atomic_write(CACHE_FILE, current_cache_key)
-    if wp_path:
-        atomic_write(LAST_WP_FILE, wp_path)
+    try:
+        with timer.stage("state"):
+            _record_state(current_cache_key, palette_cache, wp_path, fingerprint_key, perceptual, staged)
+            signature = current_cache_key.split(":", 1)[1]
+            atomic_write(SCHEME_FILE, json.dumps({"config": signature, "scheme": scheme}))
+    finally:
+        # Reloads already in flight are awaited even if recording state fails.
+        if write_result.changed:
+            with timer.stage("reload"):
+                reload_all(scheme, config, apps=write_result.changed, timer=timer, pipeline=reloads)
 
-    reload_all(scheme, config)
+    # Following the system appearance: have the other variant ready so a
+    # dark/light flip is a publish + reload.
+    if stage_flip and wp_path and fingerprint and not extra_paths:
+        with timer.stage("flip"):
+            _stage_flip(config, wp_path, fingerprint, current_cache_key, palette_cache)
 
     ba = hexc(*scheme["border_accent"])
     bi_rgb = scheme.get("border_inactive") or scheme.get("grey", scheme["border_accent"])
@@ -66,6 +66,11 @@ class TargetApp:
     writer_module: str
     default_enabled: bool = True
     reload_function: str | None = None
+    # Seconds the app's reload may take before it is terminated (capped by
+    # [general] reload_timeout for the whole reload phase).
+    reload_deadline: float = 2.0
+    # Published first (from a provisional scheme) by progressive Sync Runs.
+    latency_critical: bool = False
     paths: dict[str, PathPolicy] = field(default_factory=dict)
     names: dict[str, NamePolicy] = field(default_factory=dict)
     bools: dict[str, BoolPolicy] = field(default_factory=dict)
@@ -109,17 +114,24 @@ TARGET_APPS: tuple[TargetApp, ...] = (
         "sketchybar",
         "sketchybar",
         reload_function="reload_sketchybar",
+        latency_critical=True,
         paths={
             "output": PathPolicy(
                 "~/.config/sketchybar/colors.sh",
                 "WALLPAPER_SKETCHYBAR_OUTPUT_PATH",
-            )
+            ),
+            # Which bar properties use which colors.sh variable (read-only).
+            "recolor": PathPolicy(
+                "~/.config/sketchybar/recolor.json",
+                "WALLPAPER_SKETCHYBAR_RECOLOR_PATH",
+            ),
         },
     ),
     TargetApp(
         "borders",
         "borders",
         reload_function="reload_borders",
+        latency_critical=True,
         paths={
             "output": PathPolicy(
                 "~/.config/wallpaper-colors/border_colors",
@@ -131,6 +143,7 @@ TARGET_APPS: tuple[TargetApp, ...] = (
         "kitty",
         "kitty",
         reload_function="reload_kitty",
+        latency_critical=True,
         paths={
             "output": PathPolicy(
                 "~/.config/kitty/themes/wallpaper.conf",
@@ -6,16 +6,24 @@ filesystem writes that publish it.
 
 from __future__ import annotations
 
+import hashlib
 import importlib
+import json
 import os
+import threading
 from collections.abc import Iterable
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from .colors import app_scheme
 from .config import Config
 from .target_apps import TargetApp, enabled_target_apps
+from .timings import StageTimer
 from .utils import atomic_write, log
 
+MANIFEST_FILE = os.path.expanduser("~/.config/wallpaper-colors/.publish_manifest.json")
+MANIFEST_VERSION = 1
+
 
 @dataclass(frozen=True)
 class ColorMaterial:
@@ -25,6 +33,76 @@ class ColorMaterial:
     owned_marker: str | None = None
 
 
+@dataclass(frozen=True)
+class WriteAllResult:
+    failed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+
+
+def _content_digest(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PublishManifest:
+    """Digest + stat of every path WalBridge last published.
+
+    A write is skipped when the new content's digest matches and the file on
+    disk still has the recorded size and mtime (so edits or deletions made
+    outside WalBridge are always overwritten).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or MANIFEST_FILE
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log(f"Publish manifest unreadable ({e}); rewriting all Color Material")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def unchanged(self, path, digest):
+        with self._lock:
+            entry = self._entries.get(path)
+        if not isinstance(entry, dict) or entry.get("digest") != digest:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns
+
+    def record(self, path, digest):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            self._entries[path] = {"digest": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": MANIFEST_VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+        try:
+            atomic_write(self.path, json.dumps(payload, sort_keys=True, separators=(",", ":")))
+        except OSError as e:
+            log(f"Publish manifest write failed: {e}")
+
+
 def _adapter_module(app: TargetApp):
     return importlib.import_module(f"{__package__}.writers.{app.writer_module}")
 
@@ -60,42 +138,107 @@ def _destination_path(app: TargetApp, material: ColorMaterial) -> str:
     return fallback
 
 
-def write_target_app(app: TargetApp, scheme, config=None) -> list[str]:
-    module = _adapter_module(app)
-    render = getattr(module, "render", None)
+def render_target_app(app: TargetApp, scheme, config=None) -> list[ColorMaterial] | None:
+    """Render an app's Color Material without touching the filesystem.
+
+    Returns None for legacy adapters that only expose ``write()``.
+    """
+    render = getattr(_adapter_module(app), "render", None)
     if render is None:
-        module.write(scheme, config)
-        return [app.name]
+        return None
+    return _normalize_materials(render(scheme, app, config))
+
+
+def publish_materials(app: TargetApp, materials, manifest=None) -> list[str]:
+    """Write *materials*, skipping paths whose content is unchanged per *manifest*.
 
+    Returns the paths actually written.
+    """
     written_paths = []
-    for material in _normalize_materials(render(scheme, app, config)):
+    for material in materials:
         path = _destination_path(app, material)
+        digest = _content_digest(material.content)
+        if manifest is not None and manifest.unchanged(path, digest):
+            continue
         atomic_write(path, material.content)
+        if manifest is not None:
+            manifest.record(path, digest)
         written_paths.append(path)
     return written_paths
 
 
-def write_all(scheme, config=None):
-    """Write Color Material for all enabled Target Apps."""
+def write_target_app(app: TargetApp, scheme, config=None, materials=None, manifest=None) -> list[str]:
+    """Write an app's Color Material, publishing pre-rendered *materials* when given.
+
+    Returns the written paths; empty when nothing changed. Legacy ``write()``
+    adapters always count as written.
+    """
+    if materials is None:
+        materials = render_target_app(app, scheme, config)
+    if materials is None:
+        _adapter_module(app).write(scheme, config)
+        return [app.name]
+    return publish_materials(app, materials, manifest)
+
+
+def _timed_write(timer, app, *args):
+    with timer.stage(f"write.{app.name}"):
+        return write_target_app(app, *args)
+
+
+def write_all(scheme, config=None, staged=None, manifest=None, timer=None, apps=None, on_changed=None):
+    """Write Color Material for all enabled Target Apps.
+
+    *staged* maps Target App names to pre-rendered Color Material (see
+    ``staging.py``); those apps are published without rendering. Unchanged
+    material is not rewritten, and only apps with written files are reported
+    as changed. *apps* limits the write to those Target App names. Apps bound
+    to a wallpaper region get that region's roles. Per-app render/write time
+    is recorded on *timer*. *on_changed* is called with each changed app's
+    name as soon as that app's files are published, while other writers may
+    still be running (a ReloadPipeline's ``start``).
+    """
     if config is None:
         config = Config()
-
-    enabled = enabled_target_apps(config)
-    written = []
+    staged = staged or {}
+    if manifest is None:
+        manifest = PublishManifest()
+    if timer is None:
+        timer = StageTimer()
+
+    enabled = [app for app in enabled_target_apps(config) if apps is None or app.name in apps]
+    changed = []
+    unchanged = []
     failed = []
 
     if enabled:
         with ThreadPoolExecutor(max_workers=min(8, len(enabled))) as pool:
-            futures = {pool.submit(write_target_app, app, scheme, config): app for app in enabled}
+            futures = {
+                pool.submit(
+                    _timed_write,
+                    timer,
+                    app,
+                    app_scheme(scheme, app.name, config),
+                    config,
+                    staged.get(app.name),
+                    manifest,
+                ): app
+                for app in enabled
+            }
             for fut in as_completed(futures):
                 app = futures[fut]
                 try:
-                    fut.result()
+                    written = fut.result()
                 except Exception as e:
                     log(f"Writer {app.name} failed: {e}")
                     failed.append(app.name)
                     continue
-                written.append(app.name)
-
-    log(f"Wrote configs for: {', '.join(sorted(written))}")
-    return failed
+                (changed if written else unchanged).append(app.name)
+                if written and on_changed is not None:
+                    on_changed(app.name)
+
+    manifest.save()
+    log(f"Wrote configs for: {', '.join(sorted(changed)) or 'none'}")
+    if unchanged:
+        log(f"Unchanged: {', '.join(sorted(unchanged))}")
+    return WriteAllResult(failed=failed, changed=changed)
@@ -0,0 +1,61 @@
+"""Per-stage Sync Run timing.
+
+A StageTimer accumulates wall-clock milliseconds per named stage. Writer and
+reload stages are recorded from worker threads, so recording is locked.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .utils import log
+
+TIMINGS_LOG = os.path.expanduser("~/.config/wallpaper-colors/timings.jsonl")
+
+
+class StageTimer:
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def as_dict(self):
+        """Stage name -> milliseconds, in recording order, plus ``total``."""
+        with self._lock:
+            stages = {name: round(seconds * 1000, 3) for name, seconds in self._stages.items()}
+        stages["total"] = round(self.elapsed() * 1000, 3)
+        return stages
+
+
+def format_timings(timings):
+    width = max((len(name) for name in timings), default=0)
+    return "\n".join(f"  {name:<{width}}  {ms:9.2f} ms" for name, ms in timings.items())
+
+
+def append_timings_log(timings, skipped, path=None):
+    """Append one JSON line per Sync Run to the timings log."""
+    path = path or TIMINGS_LOG
+    record = {"ts": round(time.time(), 3), "skipped": skipped, "timings": timings}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    except OSError as e:
+        log(f"Timings log write failed: {e}")
@@ -5,45 +5,77 @@ from ..target_writing import ColorMaterial
 from ..utils import hex6
 
 
-def render(scheme, app, config=None):
+def kitty_colors(scheme):
+    """Kitty color name -> (r, g, b), shared by the theme file and the live reload."""
     bg = scheme["dark"]
     fg = scheme["light"]
     accent = scheme["accent"]
     sel_bg = scheme["item_bg"]
+    return {
+        "background": bg,
+        "foreground": fg,
+        "cursor": accent,
+        "selection_background": sel_bg,
+        "selection_foreground": bg,
+        "color0": bg,
+        "color1": scheme["red"],
+        "color2": scheme["green"],
+        "color3": scheme["yellow"],
+        "color4": accent,
+        "color5": scheme["purple"],
+        "color6": scheme["cyan"],
+        "color7": fg,
+        "color8": scheme["grey"],
+        "color9": lighten(scheme["red"], 0.2),
+        "color10": lighten(scheme["green"], 0.2),
+        "color11": lighten(scheme["yellow"], 0.2),
+        "color12": lighten(accent, 0.2),
+        "color13": lighten(scheme["purple"], 0.2),
+        "color14": lighten(scheme["cyan"], 0.2),
+        "color15": (255, 255, 255),
+        "active_tab_foreground": fg,
+        "active_tab_background": sel_bg,
+        "inactive_tab_foreground": scheme["grey"],
+        "inactive_tab_background": darken(bg, 0.7),
+    }
+
+
+def render(scheme, app, config=None):
+    c = {name: hex6(*rgb) for name, rgb in kitty_colors(scheme).items()}
 
     content = f"""# Auto-generated from wallpaper — do not edit manually
 # Regenerate: python3 ~/.config/wallpaper-colors/wallpaper_colors.py
 
-background {hex6(*bg)}
-foreground {hex6(*fg)}
-cursor {hex6(*accent)}
-selection_background {hex6(*sel_bg)}
-selection_foreground {hex6(*bg)}
+background {c["background"]}
+foreground {c["foreground"]}
+cursor {c["cursor"]}
+selection_background {c["selection_background"]}
+selection_foreground {c["selection_foreground"]}
 
 # Normal colors
-color0 {hex6(*bg)}
-color1 {hex6(*scheme["red"])}
-color2 {hex6(*scheme["green"])}
-color3 {hex6(*scheme["yellow"])}
-color4 {hex6(*accent)}
-color5 {hex6(*scheme["purple"])}
-color6 {hex6(*scheme["cyan"])}
-color7 {hex6(*fg)}
+color0 {c["color0"]}
+color1 {c["color1"]}
+color2 {c["color2"]}
+color3 {c["color3"]}
+color4 {c["color4"]}
+color5 {c["color5"]}
+color6 {c["color6"]}
+color7 {c["color7"]}
 
 # Bright colors
-color8 {hex6(*scheme["grey"])}
-color9 {hex6(*lighten(scheme["red"], 0.2))}
-color10 {hex6(*lighten(scheme["green"], 0.2))}
-color11 {hex6(*lighten(scheme["yellow"], 0.2))}
-color12 {hex6(*lighten(accent, 0.2))}
-color13 {hex6(*lighten(scheme["purple"], 0.2))}
-color14 {hex6(*lighten(scheme["cyan"], 0.2))}
-color15 #ffffff
+color8 {c["color8"]}
+color9 {c["color9"]}
+color10 {c["color10"]}
+color11 {c["color11"]}
+color12 {c["color12"]}
+color13 {c["color13"]}
+color14 {c["color14"]}
+color15 {c["color15"]}
 
 # Tab bar
-active_tab_foreground   {hex6(*fg)}
-active_tab_background   {hex6(*sel_bg)}
-inactive_tab_foreground {hex6(*scheme["grey"])}
-inactive_tab_background {hex6(*darken(bg, 0.7))}
+active_tab_foreground   {c["active_tab_foreground"]}
+active_tab_background   {c["active_tab_background"]}
+inactive_tab_foreground {c["inactive_tab_foreground"]}
+inactive_tab_background {c["inactive_tab_background"]}
 """
     return ColorMaterial(content)
@@ -1,25 +1,21 @@
 """Neovim highlight overrides + lualine theme writer."""
 
 from ..colors import darken, lighten, vivify
-from ..target_apps import target_path
-from ..utils import atomic_write, hex6
+from ..target_apps import target_app
+from ..target_writing import ColorMaterial, write_target_app
+from ..utils import hex6
 
 
-def _nvim_colors_path():
-    return target_path("neovim", "nvim_colors")
-
-
-def _lualine_path():
-    return target_path("neovim", "lualine")
+def render(scheme, app, config=None):
+    return [_render_nvim_colors(scheme), _render_lualine_theme(scheme)]
 
 
 def write(scheme, config=None):
-    _write_nvim_colors(scheme)
-    _write_lualine_theme(scheme)
+    write_target_app(target_app("neovim"), scheme, config)
 
 
-def _write_nvim_colors(scheme):
-    """Write Neovim highlight overrides synced to wallpaper.
+def _render_nvim_colors(scheme):
+    """Render Neovim highlight overrides synced to wallpaper.
 
     Syntax colors get a gentle brightness floor (min value 0.65) so they
     stay readable on transparent dark backgrounds without going neon.
@@ -334,11 +330,11 @@ end
 
 return M
 """
-    atomic_write(_nvim_colors_path(), content)
+    return ColorMaterial(content, "nvim_colors")
 
 
-def _write_lualine_theme(scheme):
-    """Write lualine statusline theme synced to wallpaper."""
+def _render_lualine_theme(scheme):
+    """Render lualine statusline theme synced to wallpaper."""
     fg = hex6(*scheme["light"])
     accent = hex6(*scheme["accent"])
     green = hex6(*scheme["green"])
@@ -382,4 +378,4 @@ return {{
   }},
 }}
 """
-    atomic_write(_lualine_path(), content)
+    return ColorMaterial(content, "lualine")
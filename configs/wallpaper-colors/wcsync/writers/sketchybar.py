@@ -4,29 +4,54 @@ from ..target_writing import ColorMaterial
 from ..utils import hexc
 
 
+def sketchybar_colors(scheme):
+    """colors.sh variable -> 0xAARRGGBB value, shared with the incremental recolor."""
+    blue = hexc(*scheme["accent"])
+    return {
+        "BLACK": hexc(*scheme["dark"]),
+        "WHITE": hexc(*scheme["light"]),
+        "BLUE": blue,
+        "CYAN": hexc(*scheme["cyan"]),
+        "PURPLE": hexc(*scheme["purple"]),
+        "GREEN": hexc(*scheme["green"]),
+        "RED": hexc(*scheme["red"]),
+        "YELLOW": hexc(*scheme["yellow"]),
+        "ORANGE": hexc(*scheme["orange"]),
+        "PINK": hexc(*scheme["pink"]),
+        "GREY": hexc(*scheme["grey"]),
+        "TRANSPARENT": "0x00000000",
+        "BAR_COLOR": hexc(*scheme["bar_bg"], a=0xE6),
+        "ITEM_BG_COLOR": hexc(*scheme["item_bg"]),
+        "ACCENT_COLOR": blue,
+        "ACTIVE_COLOR": blue,
+        "BLUE_VIVID": hexc(*scheme["border_accent"]),
+    }
+
+
 def render(scheme, app, config=None):
+    c = sketchybar_colors(scheme)
     content = f"""#!/bin/bash
 # Auto-generated from wallpaper — do not edit manually
 # Regenerate: python3 ~/.config/wallpaper-colors/wallpaper_colors.py
 
-export BLACK={hexc(*scheme["dark"])}
-export WHITE={hexc(*scheme["light"])}
-export BLUE={hexc(*scheme["accent"])}
-export CYAN={hexc(*scheme["cyan"])}
-export PURPLE={hexc(*scheme["purple"])}
-export GREEN={hexc(*scheme["green"])}
-export RED={hexc(*scheme["red"])}
-export YELLOW={hexc(*scheme["yellow"])}
-export ORANGE={hexc(*scheme["orange"])}
-export PINK={hexc(*scheme["pink"])}
-export GREY={hexc(*scheme["grey"])}
-export TRANSPARENT=0x00000000
+export BLACK={c["BLACK"]}
+export WHITE={c["WHITE"]}
+export BLUE={c["BLUE"]}
+export CYAN={c["CYAN"]}
+export PURPLE={c["PURPLE"]}
+export GREEN={c["GREEN"]}
+export RED={c["RED"]}
+export YELLOW={c["YELLOW"]}
+export ORANGE={c["ORANGE"]}
+export PINK={c["PINK"]}
+export GREY={c["GREY"]}
+export TRANSPARENT={c["TRANSPARENT"]}
 
 # Bar colors
-export BAR_COLOR={hexc(*scheme["bar_bg"], a=0xE6)}
-export ITEM_BG_COLOR={hexc(*scheme["item_bg"])}
+export BAR_COLOR={c["BAR_COLOR"]}
+export ITEM_BG_COLOR={c["ITEM_BG_COLOR"]}
 export ACCENT_COLOR=$BLUE
 export ACTIVE_COLOR=$BLUE
-export BLUE_VIVID={hexc(*scheme["border_accent"])}
+export BLUE_VIVID={c["BLUE_VIVID"]}
 """
     return ColorMaterial(content)
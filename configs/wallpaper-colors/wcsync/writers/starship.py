@@ -1,20 +1,11 @@
 """Starship prompt config writer."""
 
-import os
+from ..target_apps import target_app
+from ..target_writing import ColorMaterial, write_target_app
+from ..utils import hex6
 
-from ..target_apps import target_path
-from ..utils import atomic_write, hex6, log
 
-
-def _output_path():
-    return target_path("starship")
-
-
-def _fallback_path():
-    return target_path("starship", "fallback")
-
-
-def write(scheme, config=None):
+def render(scheme, app, config=None):
     accent = hex6(*scheme["accent"])
 
     content = f"""# Auto-generated from wallpaper — do not edit manually
@@ -53,15 +44,12 @@ renamed = ""
 deleted = ""
 """
     # Don't overwrite user's custom starship config
-    target = _output_path()
-    if os.path.isfile(target):
-        try:
-            with open(target, "r", encoding="utf-8") as f:
-                if "Auto-generated from wallpaper" not in f.readline():
-                    alt = _fallback_path()
-                    atomic_write(alt, content)
-                    log(f"Starship: user config detected, wrote to {alt}")
-                    return
-        except OSError:
-            pass
-    atomic_write(target, content)
+    return ColorMaterial(
+        content,
+        fallback_key="fallback",
+        owned_marker="Auto-generated from wallpaper",
+    )
+
+
+def write(scheme, config=None):
+    write_target_app(target_app("starship"), scheme, config)
@@ -4,37 +4,53 @@ from ..target_writing import ColorMaterial
 from ..utils import hex6
 
 
-def render(scheme, app, config=None):
+def tmux_options(scheme):
+    """Global option -> value, shared by the theme include and the live reload."""
     dark = hex6(*scheme["dark"])
     light = hex6(*scheme["light"])
     accent = hex6(*scheme["accent"])
     secondary = hex6(*scheme["secondary"])
-    red = hex6(*scheme["red"])
-    yellow = hex6(*scheme["yellow"])
-    orange = hex6(*scheme["orange"])
-    grey = hex6(*scheme["grey"])
+    return {
+        "status-style": f"fg={light},bg={dark}",
+        "message-style": f"fg={dark},bg={accent}",
+        "message-command-style": f"fg={dark},bg={secondary}",
+        "pane-border-style": f"fg={hex6(*scheme['grey'])}",
+        "pane-active-border-style": f"fg={accent}",
+        "mode-style": f"fg={dark},bg={hex6(*scheme['yellow'])}",
+        "clock-mode-colour": accent,
+        "window-status-style": f"fg={hex6(*scheme['grey'])},bg={dark}",
+        "window-status-current-style": f"bold,fg={light},bg={secondary}",
+        "window-status-activity-style": f"fg={hex6(*scheme['orange'])},bg={dark}",
+        "window-status-bell-style": f"bold,fg={dark},bg={hex6(*scheme['red'])}",
+        "status-left-style": f"fg={dark},bg={accent}",
+        "status-right-style": f"fg={dark},bg={secondary}",
+    }
+
+
+def render(scheme, app, config=None):
+    o = tmux_options(scheme)
 
     content = f"""# Auto-generated from wallpaper — do not edit manually
 # Regenerate: python3 ~/.config/wallpaper-colors/wallpaper_colors.py
 # Include from ~/.tmux.conf:
 #   source-file ~/.config/tmux/themes/wallpaper.conf
 
-set -g status-style "fg={light},bg={dark}"
-set -g message-style "fg={dark},bg={accent}"
-set -g message-command-style "fg={dark},bg={secondary}"
+set -g status-style "{o["status-style"]}"
+set -g message-style "{o["message-style"]}"
+set -g message-command-style "{o["message-command-style"]}"
 
-set -g pane-border-style "fg={grey}"
-set -g pane-active-border-style "fg={accent}"
+set -g pane-border-style "{o["pane-border-style"]}"
+set -g pane-active-border-style "{o["pane-active-border-style"]}"
 
-set -g mode-style "fg={dark},bg={yellow}"
-set -g clock-mode-colour "{accent}"
+set -g mode-style "{o["mode-style"]}"
+set -g clock-mode-colour "{o["clock-mode-colour"]}"
 
-set -g window-status-style "fg={grey},bg={dark}"
-set -g window-status-current-style "bold,fg={light},bg={secondary}"
-set -g window-status-activity-style "fg={orange},bg={dark}"
-set -g window-status-bell-style "bold,fg={dark},bg={red}"
+set -g window-status-style "{o["window-status-style"]}"
+set -g window-status-current-style "{o["window-status-current-style"]}"
+set -g window-status-activity-style "{o["window-status-activity-style"]}"
+set -g window-status-bell-style "{o["window-status-bell-style"]}"
 
-set -g status-left-style "fg={dark},bg={accent}"
-set -g status-right-style "fg={dark},bg={secondary}"
+set -g status-left-style "{o["status-left-style"]}"
+set -g status-right-style "{o["status-right-style"]}"
 """
     return ColorMaterial(content)
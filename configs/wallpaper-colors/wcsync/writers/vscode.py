@@ -95,7 +95,14 @@ def _update_settings(token_customizations):
             managed_rules.append(managed)
         tcc["textMateRules"] = preserved_rules + managed_rules
 
-    atomic_write(path, json.dumps(settings, indent=4) + "\n")
+    content = json.dumps(settings, indent=4) + "\n"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return  # identical: don't wake VS Code's settings watcher
+    except OSError:
+        pass
+    atomic_write(path, content)
 
 
 def write(scheme, config=None):
@@ -1,9 +1,8 @@
 """Yazi file manager flavor writer."""
 
-import os
-
-from ..target_apps import target_flag, target_name, target_path
-from ..utils import atomic_write, hex6, log
+from ..target_apps import target_app, target_flag, target_name
+from ..target_writing import ColorMaterial, write_target_app
+from ..utils import hex6
 
 YAZI_THEME_MARKER = "# Auto-generated from wallpaper"
 
@@ -12,22 +11,11 @@ def _flavor_name():
     return target_name("yazi", "flavor")
 
 
-def _output_path():
-    return target_path("yazi")
-
-
-def _theme_path():
-    return target_path("yazi", "theme")
-
-
 def _should_write_selector():
     return target_flag("yazi", "write_theme_selector")
 
 
-def _write_theme_selector():
-    if not _should_write_selector():
-        return
-
+def _render_theme_selector():
     flavor_name = _flavor_name()
     content = f"""{YAZI_THEME_MARKER} — do not edit manually
 # Regenerate: python3 ~/.config/wallpaper-colors/wallpaper_colors.py
@@ -36,24 +24,20 @@ def _write_theme_selector():
 dark = "{flavor_name}"
 light = "{flavor_name}"
 """
-    target = _theme_path()
+    # Preserve a user-written theme.toml; the selector goes to the fallback path.
+    return ColorMaterial(
+        content,
+        destination_key="theme",
+        fallback_key="theme_fallback",
+        owned_marker=YAZI_THEME_MARKER,
+    )
 
-    if os.path.isfile(target):
-        try:
-            with open(target, "r", encoding="utf-8") as f:
-                first_line = f.readline()
-                if YAZI_THEME_MARKER not in first_line:
-                    alt = target_path("yazi", "theme_fallback")
-                    atomic_write(alt, content)
-                    log(f"Yazi: user theme.toml detected, wrote selector to {alt}")
-                    return
-        except OSError:
-            pass
 
-    atomic_write(target, content)
+def write(scheme, config=None):
+    write_target_app(target_app("yazi"), scheme, config)
 
 
-def write(scheme, config=None):
+def render(scheme, app, config=None):
     bg = hex6(*scheme["dark"])
     fg = hex6(*scheme["light"])
     accent = hex6(*scheme["accent"])
@@ -210,5 +194,7 @@ rules = [
 ]
     # : }}}}
 """
-    atomic_write(_output_path(), content)
-    _write_theme_selector()
+    materials = [ColorMaterial(content)]
+    if _should_write_selector():
+        materials.append(_render_theme_selector())
+    return materials
@@ -175,6 +175,7 @@ deploy_configs() {
     mkdir -p "$CONFIG_DIR"
 
     cp "$REPO_DIR/configs/wallpaper-colors/wallpaper_colors.py" "$CONFIG_DIR/"
+    cp "$REPO_DIR/configs/wallpaper-colors/wallpaper_ctl.py" "$CONFIG_DIR/"
     cp -r "$REPO_DIR/configs/wallpaper-colors/wcsync" "$CONFIG_DIR/"
 
     for script in wallpaper_cycle.sh borders-cycle.sh theme_watcher.sh next-wallpaper.sh setup-targets.sh; do
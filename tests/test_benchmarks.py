@@ -0,0 +1,73 @@
+import pathlib
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Make the benchmark harness importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+BENCH_ROOT = REPO_ROOT / "benchmarks"
+sys.path.insert(0, str(BENCH_ROOT))
+
+import bench
+import corpus
+import extractors
+
+
+class CorpusTests(unittest.TestCase):
+    def test_render_is_deterministic_per_seed(self):
+        for kind in corpus.KINDS:
+            a = corpus.render(kind, (64, 36), 7)
+            b = corpus.render(kind, (64, 36), 7)
+            self.assertEqual(a.tobytes(), b.tobytes(), kind)
+            self.assertEqual(a.mode, "RGB")
+
+    def test_generate_reuses_existing_files(self):
+        with tempfile.TemporaryDirectory() as td:
+            with patch.dict(corpus.RESOLUTIONS, {"tiny": (48, 27)}, clear=True):
+                first = corpus.generate(td, kinds=["mono"])
+                mtime = pathlib.Path(first[0]["path"]).stat().st_mtime_ns
+                with patch.object(corpus, "render", side_effect=AssertionError("re-rendered")):
+                    second = corpus.generate(td, kinds=["mono"])
+                self.assertEqual(mtime, pathlib.Path(first[0]["path"]).stat().st_mtime_ns)
+
+        self.assertEqual([i["format"] for i in first], ["jpeg", "png"])
+        self.assertEqual(first, second)
+
+
+class BenchReportTests(unittest.TestCase):
+    def test_summarize_groups_by_stage_and_resolution(self):
+        jobs = [
+            {"stage": "decode", "resolution": "4k", "samples_ms": [10, 12], "peak_rss_mb": 50, "stage_rss_mb": 5},
+            {"stage": "decode", "resolution": "4k", "samples_ms": [11, 40], "peak_rss_mb": 70, "stage_rss_mb": 9},
+        ]
+        summary = bench.summarize(jobs)
+        self.assertEqual(
+            summary["decode/4k"],
+            {"median_ms": 11.5, "p95_ms": 40, "peak_rss_mb": 70, "stage_rss_mb": 9, "n": 4},
+        )
+
+    def test_compare_flags_only_regressions_beyond_threshold(self):
+        baseline = {"decode/4k": {"median_ms": 100.0, "p95_ms": 150.0, "peak_rss_mb": 60.0}}
+        current = {
+            "decode/4k": {"median_ms": 110.0, "p95_ms": 200.0, "peak_rss_mb": 40.0},
+            "decode/6k": {"median_ms": 999.0, "p95_ms": 999.0, "peak_rss_mb": 999.0},
+        }
+        regressions = bench.compare(current, baseline, threshold=0.15)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("decode/4k p95_ms", regressions[0])
+
+    def test_palette_distance_is_symmetric_and_population_weighted(self):
+        reference = [((0, 0, 0), 3), ((255, 0, 0), 1)]
+        shifted = [((0, 0, 10), 3), ((255, 0, 0), 1)]
+
+        self.assertEqual(extractors.palette_distance(reference, reference), 0)
+        self.assertAlmostEqual(extractors.palette_distance(reference, shifted), 7.5)
+        self.assertEqual(
+            extractors.palette_distance(reference, shifted),
+            extractors.palette_distance(shifted, reference),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
+import os
 import pathlib
+import tempfile
 import types
 import unittest
 from unittest.mock import MagicMock, patch
 
+from PIL import Image
+
 # Make wcsync importable from repo root.
 REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
 WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
@@ -14,7 +18,15 @@ sys.path.insert(0, str(WCSYNC_ROOT))
 if "Quartz" not in sys.modules:
     sys.modules["Quartz"] = types.SimpleNamespace()
 
-from wcsync.capture import capture_wallpaper, load_wallpaper
+from wcsync.capture import (
+    DECODE_MIN_SIZE,
+    capture_wallpaper,
+    get_wallpaper_paths,
+    load_wallpaper,
+    load_wallpaper_from_file,
+    reduce_for_extraction,
+    wallpaper_fingerprint,
+)
 from wcsync.config import Config
 
 
@@ -123,6 +135,88 @@ class CaptureTests(unittest.TestCase):
         self.assertEqual(wp_path, "/tmp/wall.jpg")
         capture_mock.assert_not_called()
 
+    def test_load_wallpaper_skips_desktoppr_when_path_given(self):
+        with (
+            patch("wcsync.capture.get_wallpaper_path") as path_mock,
+            patch("wcsync.capture.load_wallpaper_from_file", return_value="file-image"),
+        ):
+            img, wp_path = load_wallpaper(Config(), wp_path="/tmp/wall.jpg")
+
+        self.assertEqual((img, wp_path), ("file-image", "/tmp/wall.jpg"))
+        path_mock.assert_not_called()
+
+
+    def test_get_wallpaper_paths_reads_every_display_in_one_call(self):
+        output = types.SimpleNamespace(stdout="/tmp/a.jpg\n/tmp/b.png\n")
+        with patch("wcsync.capture.subprocess.run", return_value=output) as run_mock:
+            self.assertEqual(get_wallpaper_paths(), ["/tmp/a.jpg", "/tmp/b.png"])
+        run_mock.assert_called_once()
+
+        with (
+            patch("wcsync.capture.subprocess.run", side_effect=FileNotFoundError("desktoppr")),
+            patch("wcsync.capture.log"),
+        ):
+            self.assertEqual(get_wallpaper_paths(), [])
+
+
+class ScaledDecodeTests(unittest.TestCase):
+    def _write(self, td, name, size, **save_kwargs):
+        path = pathlib.Path(td) / name
+        Image.linear_gradient("L").resize(size).convert("RGB").save(path, **save_kwargs)
+        return str(path)
+
+    def test_jpeg_uses_draft_scaling_but_stays_above_working_size(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = self._write(td, "wall.jpg", (3200, 1800), quality=90)
+            img = load_wallpaper_from_file(path)
+
+        self.assertEqual(img.mode, "RGB")
+        self.assertGreaterEqual(img.width, DECODE_MIN_SIZE[0])
+        self.assertGreaterEqual(img.height, DECODE_MIN_SIZE[1])
+        self.assertLessEqual(img.width, 1600)
+
+    def test_png_is_reduced_after_load(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = self._write(td, "wall.png", (2400, 1600))
+            img = load_wallpaper_from_file(path)
+
+        self.assertEqual(img.size, (2400 // 4, 1600 // 4))
+        self.assertEqual(img.mode, "RGB")
+
+    def test_small_images_are_left_alone(self):
+        img = Image.new("P", (600, 500))
+        self.assertIs(reduce_for_extraction(img), img)
+
+
+class WallpaperFingerprintTests(unittest.TestCase):
+    def test_fingerprint_tracks_stat_metadata(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "wall.jpg"
+            path.write_bytes(b"abc")
+            first = wallpaper_fingerprint(str(path))
+            self.assertEqual(first, wallpaper_fingerprint(str(path)))
+
+            os.utime(path, ns=(1, 1))
+            self.assertNotEqual(first, wallpaper_fingerprint(str(path)))
+
+    def test_content_digest_changes_fingerprint_for_same_stat(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "wall.jpg"
+            path.write_bytes(b"abc")
+            os.utime(path, ns=(1, 1))
+            first = wallpaper_fingerprint(str(path), content_digest=True)
+            path.write_bytes(b"abd")
+            os.utime(path, ns=(1, 1))
+
+            self.assertNotEqual(first, wallpaper_fingerprint(str(path), content_digest=True))
+            self.assertNotEqual(first, wallpaper_fingerprint(str(path)))
+
+    def test_fingerprint_is_none_for_missing_or_non_file(self):
+        with tempfile.TemporaryDirectory() as td:
+            self.assertIsNone(wallpaper_fingerprint(td))
+            self.assertIsNone(wallpaper_fingerprint(os.path.join(td, "missing.jpg")))
+        self.assertIsNone(wallpaper_fingerprint(""))
+
 
 if __name__ == "__main__":
     unittest.main()
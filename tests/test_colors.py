@@ -12,16 +12,31 @@ import sys
 sys.path.insert(0, str(WCSYNC_ROOT))
 
 from wcsync.colors import (
+    app_scheme,
+    blend_palettes,
     build_scheme,
     darken,
+    EXTRACTORS,
+    bin_colors,
     extract_palette,
+    extract_weighted_palette,
+    hamming,
     harmonize,
     lighten,
     lum,
+    mean_color,
+    perceptual_hash,
+    oklab,
     pick_secondary,
+    region_palettes,
     sat,
+    scheme_delta,
+    scheme_for_region,
+    scheme_variant,
     vivify,
+    with_region_schemes,
 )
+from wcsync.config import EXTRACTORS as CONFIG_EXTRACTORS
 from wcsync.config import Config
 
 
@@ -29,12 +44,12 @@ class _FakeImage:
     def __init__(self, quantized):
         self._quantized = quantized
 
-    def quantize(self, colors, method):
+    def quantize(self, colors, method, **kwargs):
         self.last_quantize = (colors, method)
         return self._quantized
 
 
-class _QuantizedWithFlattenedData:
+class _QuantizedWithHistogram:
     def __init__(self, palette, pixels):
         self._palette = palette
         self._pixels = pixels
@@ -42,20 +57,11 @@ class _QuantizedWithFlattenedData:
     def getpalette(self):
         return self._palette
 
-    def get_flattened_data(self):
-        return self._pixels
-
-
-class _QuantizedWithoutFlattenedData:
-    def __init__(self, palette, pixels):
-        self._palette = palette
-        self._pixels = pixels
-
-    def getpalette(self):
-        return self._palette
-
-    def getdata(self):
-        return self._pixels
+    def histogram(self):
+        counts = [0] * 256
+        for index in self._pixels:
+            counts[index] += 1
+        return counts
 
 
 class _QuantizedWithoutPalette:
@@ -86,7 +92,7 @@ class ColorMathTests(unittest.TestCase):
 
 class PaletteExtractionTests(unittest.TestCase):
     def test_extract_palette_orders_colors_by_frequency(self):
-        quantized = _QuantizedWithFlattenedData(
+        quantized = _QuantizedWithHistogram(
             palette=[255, 0, 0, 0, 255, 0, 0, 0, 255],
             pixels=[1, 1, 1, 2, 2, 0],
         )
@@ -104,19 +110,177 @@ class PaletteExtractionTests(unittest.TestCase):
         )
         self.assertEqual(image.last_quantize, (3, Image.Quantize.MEDIANCUT))
 
-    def test_extract_palette_falls_back_to_getdata(self):
-        quantized = _QuantizedWithoutFlattenedData(
+    def test_fastoctree_extractor_uses_octree_quantizer(self):
+        quantized = _QuantizedWithHistogram(
             palette=[10, 20, 30, 200, 210, 220],
             pixels=[0, 1, 1, 1],
         )
-        palette = extract_palette(_FakeImage(quantized), n_colors=2)
-        self.assertEqual(palette, [(200, 210, 220), (10, 20, 30)])
+        image = _FakeImage(quantized)
+
+        weighted = extract_weighted_palette(image, n_colors=2, extractor="fastoctree")
+
+        self.assertEqual(weighted, [((200, 210, 220), 3), ((10, 20, 30), 1)])
+        self.assertEqual(image.last_quantize, (2, Image.Quantize.FASTOCTREE))
+
+    def test_every_configurable_extractor_returns_weighted_palette(self):
+        image = Image.new("RGB", (40, 20), (200, 30, 30))
+        image.paste((20, 40, 220), (0, 0, 10, 20))
+
+        self.assertEqual(set(EXTRACTORS), set(CONFIG_EXTRACTORS))
+        for name in EXTRACTORS:
+            with self.subTest(extractor=name):
+                weighted = extract_weighted_palette(image, n_colors=4, extractor=name)
+                counts = [count for _, count in weighted]
+                self.assertEqual(sum(counts), 800)
+                self.assertEqual(counts, sorted(counts, reverse=True))
+                self.assertEqual(weighted[0], ((200, 30, 30), 600))
 
     def test_extract_palette_returns_gray_when_palette_missing(self):
         palette = extract_palette(_FakeImage(_QuantizedWithoutPalette()), n_colors=4)
         self.assertEqual(palette, [(128, 128, 128)] * 4)
 
 
+class PerceptualHashTests(unittest.TestCase):
+    def test_dhash_bits_follow_horizontal_gradients(self):
+        ramp = Image.linear_gradient("L").rotate(90).convert("RGB")  # brightens left to right
+
+        self.assertEqual(perceptual_hash(ramp), "ffffffffffffffff")
+        self.assertEqual(perceptual_hash(ramp.transpose(Image.Transpose.FLIP_LEFT_RIGHT)), "0" * 16)
+        self.assertEqual(hamming("ff00", "0f01"), 5)
+
+    def test_mean_color_averages_whole_image(self):
+        image = Image.new("RGB", (4, 2), (0, 0, 0))
+        image.paste((200, 100, 40), (0, 0, 2, 2))
+        self.assertEqual(mean_color(image), (100, 50, 20))
+
+
+class SchemeDeltaTests(unittest.TestCase):
+    def test_oklab_reference_values(self):
+        white = oklab((255, 255, 255))
+        self.assertAlmostEqual(white[0], 1.0, places=3)
+        self.assertAlmostEqual(white[1], 0.0, places=3)
+        self.assertAlmostEqual(oklab((0, 0, 0))[0], 0.0)
+
+    def test_scheme_delta_is_largest_role_distance(self):
+        a = {"accent": (200, 40, 40), "dark": (10, 10, 10), "only_a": (0, 0, 0)}
+        near = {"accent": (201, 40, 40), "dark": (10, 10, 10)}
+        far = {"accent": (40, 40, 200), "dark": (10, 10, 10)}
+
+        self.assertEqual(scheme_delta(a, a), 0.0)
+        self.assertLess(scheme_delta(a, near), 0.02)
+        self.assertGreater(scheme_delta(a, far), 0.2)
+
+
+class RegionPaletteTests(unittest.TestCase):
+    def setUp(self):
+        # Blue wallpaper with an orange menu-bar strip and a pale centre block.
+        self.image = Image.new("RGB", (200, 200), (30, 60, 110))
+        self.image.paste((200, 140, 60), (0, 0, 200, 10))
+        self.image.paste((220, 220, 210), (60, 60, 140, 140))
+        self.weighted = extract_weighted_palette(self.image, n_colors=8, histogram_bits=5)
+        self.regions = Config().regions
+
+    def test_regions_reweight_the_whole_image_palette(self):
+        palettes = region_palettes(self.image, self.weighted, self.regions)
+
+        colors = {c for c, _ in self.weighted}
+        self.assertEqual(palettes["top"][0][0], (204, 140, 60))
+        self.assertNotIn((204, 140, 60), [c for c, _ in palettes["center"]])
+        self.assertEqual(palettes["edges"][0][0], (28, 60, 108))
+        for palette in palettes.values():
+            self.assertTrue({c for c, _ in palette} <= colors)
+
+    def test_zero_weight_region_keeps_whole_image_populations(self):
+        regions = {"top": {"boxes": [[0.0, 0.0, 1.0, 0.05]], "weight": 0.0}}
+
+        palette = region_palettes(self.image, self.weighted, regions)["top"]
+
+        self.assertEqual([c for c, _ in palette][:2], [c for c, _ in self.weighted][:2])
+
+    def test_bound_app_gets_its_region_roles(self):
+        base = {"accent": (1, 2, 3), "dark": (4, 5, 6)}
+        scheme = with_region_schemes(base, {"top": [((200, 140, 60), 10), ((30, 60, 110), 5)]})
+        config = Config(bindings={"sketchybar": "top"})
+
+        self.assertEqual(scheme_for_region(scheme), base)
+        self.assertEqual(app_scheme(scheme, "kitty", config), base)
+        bar = app_scheme(scheme, "sketchybar", config)
+        self.assertEqual(bar, build_scheme([(200, 140, 60), (30, 60, 110)]))
+        self.assertIs(scheme_for_region(base, "top"), base)
+
+
+class DisplaySchemeTests(unittest.TestCase):
+    def test_blend_weighs_each_display_equally(self):
+        large = [((200, 0, 0), 30000), ((0, 0, 200), 10000)]
+        small = [((0, 200, 0), 100)]
+
+        blended = blend_palettes([large, small], n_colors=2)
+
+        self.assertEqual([c for c, _ in blended], [(0, 200, 0), (200, 0, 0)])
+
+    def test_display_binding_takes_precedence_over_region(self):
+        scheme = {"accent": (1, 1, 1), "top/accent": (2, 2, 2), "display:2/accent": (3, 3, 3)}
+        config = Config(bindings={"kitty": "top", "borders": "top"}, display_bindings={"kitty": 2})
+
+        self.assertEqual(app_scheme(scheme, "kitty", config), {"accent": (3, 3, 3)})
+        self.assertEqual(app_scheme(scheme, "borders", config), {"accent": (2, 2, 2)})
+        self.assertEqual(app_scheme(scheme, "btop", config), {"accent": (1, 1, 1)})
+
+
+class AppearanceVariantTests(unittest.TestCase):
+    def setUp(self):
+        self.scheme = build_scheme([(30, 60, 110), (200, 140, 60), (220, 220, 210), (15, 20, 30)])
+
+    def test_dark_variant_is_the_built_scheme(self):
+        self.assertIs(scheme_variant(self.scheme, "dark"), self.scheme)
+
+    def test_light_variant_swaps_surfaces_and_keeps_hues(self):
+        light = scheme_variant(self.scheme, "light")
+
+        self.assertEqual(light.keys(), self.scheme.keys())
+        self.assertGreater(lum(*light["dark"]), 200)
+        self.assertLess(lum(*light["light"]), 40)
+        self.assertEqual(light["bar_bg"], light["dark"])
+        for role in ("accent", "red", "border_accent"):
+            with self.subTest(role=role):
+                hue = colorsys.rgb_to_hsv(*(c / 255 for c in self.scheme[role]))[0]
+                light_hue = colorsys.rgb_to_hsv(*(c / 255 for c in light[role]))[0]
+                self.assertAlmostEqual(hue, light_hue, delta=0.02)
+                self.assertLessEqual(max(light[role]), max(self.scheme[role]))
+
+    def test_light_variant_converts_region_roles(self):
+        scheme = with_region_schemes(self.scheme, {"top": [((200, 140, 60), 10), ((20, 20, 20), 5)]})
+
+        light = scheme_variant(scheme, "light")
+
+        self.assertEqual(light.keys(), scheme.keys())
+        self.assertEqual(scheme_for_region(light, "top"), scheme_variant(scheme_for_region(scheme, "top"), "light"))
+
+
+class HistogramPreAggregationTests(unittest.TestCase):
+    def test_bin_colors_snaps_channels_to_bin_centers(self):
+        image = Image.new("RGB", (3, 1))
+        image.putdata([(0, 7, 8), (255, 128, 129), (16, 17, 23)])
+
+        binned = bin_colors(image, bits=5)
+
+        pixels = [binned.getpixel((x, 0)) for x in range(3)]
+        self.assertEqual(pixels, [(4, 4, 12), (252, 132, 132), (20, 20, 20)])
+        self.assertEqual(bin_colors(image, bits=6).getpixel((0, 0)), (2, 6, 10))
+
+    def test_histogram_bits_keep_populations_and_dominant_color(self):
+        image = Image.new("RGB", (40, 20), (200, 30, 30))
+        image.paste((20, 40, 220), (0, 0, 10, 20))
+        # Near-identical shades fold into one bin.
+        image.paste((201, 31, 29), (30, 0, 40, 20))
+
+        for name in EXTRACTORS:
+            with self.subTest(extractor=name):
+                weighted = extract_weighted_palette(image, n_colors=4, extractor=name, histogram_bits=5)
+                self.assertEqual(sum(count for _, count in weighted), 800)
+                self.assertEqual(weighted[0], ((204, 28, 28), 600))
+
+
 class SchemeGenerationTests(unittest.TestCase):
     def test_build_scheme_with_accent_override_and_expected_keys(self):
         config = Config(accent_override="#336699")
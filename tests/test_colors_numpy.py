@@ -0,0 +1,118 @@
+import pathlib
+import random
+import subprocess
+import unittest
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+import sys
+
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+from wcsync import colors
+from wcsync.config import Config
+
+try:
+    import numpy as np
+
+    from wcsync import colors_numpy
+except ImportError:
+    np = None
+
+
+def _random_colors(rng, n):
+    return [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(n)]
+
+
+# Greys, primaries, and secondaries hit every colorsys branch.
+EDGE_COLORS = [(v, v, v) for v in (0, 1, 127, 128, 254, 255)] + [
+    (255, 0, 0),
+    (0, 255, 0),
+    (0, 0, 255),
+    (255, 255, 0),
+    (0, 255, 255),
+    (255, 0, 255),
+]
+
+
+def _tuples(array):
+    return [tuple(row) for row in array.tolist()]
+
+
+class BuildSchemesTests(unittest.TestCase):
+    def test_build_schemes_matches_build_scheme(self):
+        rng = random.Random(7)
+        palettes = [_random_colors(rng, rng.choice((1, 4, 8))) for _ in range(80)]
+        palettes.append([(10, 10, 10)] * 3)
+
+        for config in (Config(), Config(accent_override="#336699", harmonize_factor=0.6)):
+            with self.subTest(accent_override=config.accent_override):
+                self.assertEqual(
+                    colors.build_schemes(palettes, config),
+                    [colors.build_scheme(p, config) for p in palettes],
+                )
+
+
+class LazyImportTests(unittest.TestCase):
+    def test_importing_colors_does_not_import_numpy(self):
+        # A fresh interpreter: this process has NumPy loaded by the tests above.
+        code = "import sys; import wcsync.colors; print('numpy' in sys.modules)"
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=WCSYNC_ROOT, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+    def test_small_batches_do_not_import_numpy(self):
+        code = (
+            "import sys; from wcsync import colors; "
+            "colors.build_schemes([[(200, 40, 40)]] * (colors.BATCH_MIN - 1)); "
+            "print('numpy' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=WCSYNC_ROOT, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class NumpyBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.colors = _random_colors(random.Random(3), 2000) + EDGE_COLORS
+        self.array = np.array(self.colors)
+
+    def test_color_math_is_bit_identical_to_scalar(self):
+        c = self.colors
+        self.assertEqual(colors_numpy.lum(self.array).tolist(), [colors.lum(*x) for x in c])
+        self.assertEqual(colors_numpy.sat(self.array).tolist(), [colors.sat(*x) for x in c])
+        self.assertEqual(_tuples(colors_numpy.darken(self.array, 0.3)), [colors.darken(x, 0.3) for x in c])
+        self.assertEqual(_tuples(colors_numpy.lighten(self.array, 0.4)), [colors.lighten(x, 0.4) for x in c])
+        self.assertEqual(
+            _tuples(colors_numpy.vivify(self.array, 0.35, 0.65)), [colors.vivify(x, 0.35, 0.65) for x in c]
+        )
+        self.assertEqual(_tuples(colors_numpy.mute(self.array)), [colors.mute(x) for x in c])
+
+    def test_hue_wheel_is_bit_identical_to_scalar(self):
+        rng = random.Random(5)
+        hues = [rng.uniform(0, 360) for _ in range(2000)] + [0.0, 180.0, 359.99999999999994]
+        wheel = colors_numpy.harmonize(50, np.array(hues), 0.25)
+
+        self.assertEqual(wheel.tolist(), [colors.harmonize(50, h, 0.25) for h in hues])
+        self.assertEqual(
+            _tuples(colors_numpy.color_at_hue(wheel, 0.7, 0.8)),
+            [colors.color_at_hue(colors.harmonize(50, h, 0.25), 0.7, 0.8) for h in hues],
+        )
+
+    def test_batched_schemes_are_bit_identical(self):
+        rng = random.Random(11)
+        palettes = [_random_colors(rng, 8) for _ in range(500)] + [EDGE_COLORS[:8]]
+        config = Config(min_saturation=0.9, harmonize_factor=0.7)
+
+        self.assertEqual(
+            colors_numpy.build_schemes(palettes, config),
+            [colors.build_scheme(p, config) for p in palettes],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import pathlib
 import tempfile
 import unittest
+from unittest.mock import patch
 
 # Make wcsync importable from repo root.
 REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -18,6 +19,7 @@ class ConfigLoadTests(unittest.TestCase):
         self.assertEqual(cfg.display, 1)
         self.assertEqual(cfg.n_colors, 8)
         self.assertFalse(cfg.targets["vscode"])
+        self.assertFalse(cfg.fingerprint_content)
 
     def test_invalid_toml_falls_back_to_defaults(self):
         with tempfile.TemporaryDirectory() as td:
@@ -35,6 +37,15 @@ class ConfigLoadTests(unittest.TestCase):
 [general]
 display = 0
 n_colors = 0
+fingerprint_content = "yes"
+timings_log = 1
+extractor = "octree"
+histogram_bits = 4
+appearance = "dim"
+phash_threshold = 65
+progressive_threshold = "low"
+scheme_hysteresis = -0.5
+reload_timeout = 0
 
 [scheme]
 min_saturation = -1
@@ -48,6 +59,10 @@ vivify_val = 99
 opacity = "0xB3"
 inactive_opacity = "0x66"
 
+[cache]
+max_entries = -5
+max_age_days = "forever"
+
 [targets]
 sketchybar = false
 kitty = "yes"
@@ -57,6 +72,15 @@ kitty = "yes"
             cfg = Config.load(str(cfg_path))
             self.assertEqual(cfg.display, 1)
             self.assertEqual(cfg.n_colors, 8)
+            self.assertFalse(cfg.fingerprint_content)
+            self.assertFalse(cfg.timings_log)
+            self.assertEqual(cfg.extractor, "mediancut")
+            self.assertEqual(cfg.histogram_bits, 5)
+            self.assertEqual(cfg.appearance, "dark")
+            self.assertEqual(cfg.phash_threshold, -1)
+            self.assertEqual(cfg.progressive_threshold, 0.02)
+            self.assertEqual(cfg.scheme_hysteresis, 0.01)
+            self.assertEqual(cfg.reload_timeout, 5.0)
             self.assertEqual(cfg.min_saturation, 0.45)
             self.assertEqual(cfg.min_value, 0.55)
             self.assertEqual(cfg.harmonize_factor, 0.25)
@@ -65,6 +89,8 @@ kitty = "yes"
             self.assertEqual(cfg.border_vivify_val, 0.85)
             self.assertEqual(cfg.border_opacity, 0xB3)
             self.assertEqual(cfg.border_inactive_opacity, 0x66)
+            self.assertEqual(cfg.palette_cache_entries, 256)
+            self.assertEqual(cfg.palette_cache_max_age_days, 90)
             self.assertFalse(cfg.targets["sketchybar"])
             self.assertTrue(cfg.targets["kitty"])
 
@@ -81,6 +107,56 @@ accent_override = "a1B2c3"
             cfg = Config.load(str(cfg_path))
             self.assertEqual(cfg.accent_override, "#a1B2c3")
 
+    def test_regions_and_bindings(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = pathlib.Path(td) / "config.toml"
+            cfg_path.write_text(
+                """
+[regions.top]
+boxes = [[0, 0, 1, 0.04]]
+weight = 1
+
+[regions.dock]
+boxes = [[0.2, 0.92, 0.8, 1.0]]
+
+[regions.bad]
+boxes = [[0.5, 0, 0.2, 1]]
+
+[bindings]
+sketchybar = "top"
+borders = "dock"
+kitty = "bad"
+nope = "center"
+""".strip(),
+                encoding="utf-8",
+            )
+            with patch("wcsync.config.log"):
+                cfg = Config.load(str(cfg_path))
+            self.assertEqual(cfg.regions["top"], {"boxes": [[0.0, 0.0, 1.0, 0.04]], "weight": 1.0})
+            self.assertEqual(cfg.regions["dock"]["weight"], 0.75)
+            self.assertIn("center", cfg.regions)
+            self.assertNotIn("bad", cfg.regions)
+            self.assertEqual(cfg.bindings, {"sketchybar": "top", "borders": "dock"})
+            self.assertEqual(list(cfg.bound_regions()), ["dock", "top"])
+
+    def test_display_bindings(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = pathlib.Path(td) / "config.toml"
+            cfg_path.write_text(
+                """
+[displays]
+kitty = 2
+sketchybar = "blend"
+borders = 0
+tmux = true
+nope = 1
+""".strip(),
+                encoding="utf-8",
+            )
+            with patch("wcsync.config.log"):
+                cfg = Config.load(str(cfg_path))
+            self.assertEqual(cfg.display_bindings, {"kitty": 2, "sketchybar": "blend"})
+
 
 if __name__ == "__main__":
     unittest.main()
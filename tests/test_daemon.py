@@ -0,0 +1,165 @@
+import os
+import pathlib
+import tempfile
+import threading
+import types
+import unittest
+from unittest.mock import patch
+
+# Make wcsync/wallpaper_ctl importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+import sys
+
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+# Provide a lightweight Quartz stub for non-macOS test environments.
+if "Quartz" not in sys.modules:
+    sys.modules["Quartz"] = types.SimpleNamespace()
+
+import wallpaper_ctl
+from wcsync import control, daemon
+from wcsync.sync_run import SyncRunError, SyncRunOptions, SyncRunResult
+
+
+class SyncDaemonTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = pathlib.Path(self.tmp.name)
+        self.socket_path = str(root / "sync.sock")
+        self.config_path = str(root / "config.toml")
+
+    def make_daemon(self):
+        return daemon.SyncDaemon(
+            socket_path=self.socket_path,
+            store_dir=self.tmp.name,
+            config_path=self.config_path,
+        )
+
+    def test_sync_and_force_reuse_loaded_config(self):
+        d = self.make_daemon()
+        result = SyncRunResult(skipped=True, cache_key="k", wallpaper_path="/tmp/wall.jpg")
+
+        with patch("wcsync.daemon.run_sync", return_value=result) as run_mock:
+            sync_response = d.handle("sync\n")
+            force_response = d.handle("force")
+            progressive_response = d.handle("progressive")
+
+        self.assertTrue(sync_response["ok"])
+        self.assertTrue(progressive_response["ok"])
+        self.assertTrue(sync_response["skipped"])
+        self.assertTrue(force_response["ok"])
+        self.assertEqual(
+            [c.args[0] for c in run_mock.call_args_list],
+            [SyncRunOptions(force=False), SyncRunOptions(force=True), SyncRunOptions(progressive=True)],
+        )
+        self.assertTrue(all(c.kwargs["config"] is d.config for c in run_mock.call_args_list))
+        self.assertEqual(d.status()["runs"], 3)
+
+    def test_sync_commands_pass_the_wallpaper_path_through(self):
+        d = self.make_daemon()
+        result = SyncRunResult(skipped=False, wallpaper_path="/tmp/new wall.jpg")
+
+        with patch("wcsync.daemon.run_sync", return_value=result) as run_mock:
+            response = d.handle("progressive /tmp/new wall.jpg\n")
+            rejected = d.handle("status /tmp/new wall.jpg")
+
+        self.assertTrue(response["ok"])
+        self.assertEqual(
+            run_mock.call_args.args[0],
+            SyncRunOptions(progressive=True, wallpaper_path="/tmp/new wall.jpg"),
+        )
+        self.assertFalse(rejected["ok"])
+        run_mock.assert_called_once()
+
+    def test_sync_failure_is_reported_not_raised(self):
+        d = self.make_daemon()
+        with patch("wcsync.daemon.run_sync", side_effect=SyncRunError("writer failures: kitty")):
+            response = d.handle("sync")
+
+        self.assertFalse(response["ok"])
+        self.assertIn("kitty", response["error"])
+        self.assertEqual(d.status()["last_error"], "writer failures: kitty")
+
+    def test_reload_config_and_mtime_change_reparse(self):
+        pathlib.Path(self.config_path).write_text("[general]\nn_colors = 4\n", encoding="utf-8")
+        d = self.make_daemon()
+        self.assertEqual(d.config.n_colors, 4)
+
+        pathlib.Path(self.config_path).write_text("[general]\nn_colors = 6\n", encoding="utf-8")
+        os.utime(self.config_path, ns=(1, 1))
+        self.assertEqual(d._current_config().n_colors, 6)
+
+        pathlib.Path(self.config_path).write_text("[general]\nn_colors = 5\n", encoding="utf-8")
+        response = d.handle("reload-config")
+        self.assertTrue(response["ok"])
+        self.assertEqual(d.config.n_colors, 5)
+
+    def test_unknown_command_is_rejected(self):
+        response = self.make_daemon().handle("explode")
+        self.assertFalse(response["ok"])
+        self.assertIn("unknown command", response["error"])
+
+    def test_socket_round_trip(self):
+        d = self.make_daemon()
+        thread = threading.Thread(target=d.serve_forever, kwargs={"watch": False}, daemon=True)
+        with patch("wcsync.daemon.log"):
+            thread.start()
+            for _ in range(100):
+                if os.path.exists(self.socket_path):
+                    break
+                threading.Event().wait(0.01)
+            try:
+                response = control.send_command("status", socket_path=self.socket_path, timeout=5)
+            finally:
+                d.shutdown()
+                thread.join(timeout=5)
+
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["pid"], os.getpid())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+class WallpaperCtlTests(unittest.TestCase):
+    def test_sync_falls_back_to_one_shot_run_without_daemon(self):
+        with (
+            patch("wallpaper_ctl.send_command", side_effect=FileNotFoundError("no socket")),
+            patch("wallpaper_ctl.os.execv") as execv_mock,
+        ):
+            wallpaper_ctl.main(["force"])
+
+        args = execv_mock.call_args.args[1]
+        self.assertTrue(args[1].endswith("wallpaper_colors.py"))
+        self.assertEqual(args[2:], ["--force"])
+
+    def test_wallpaper_path_reaches_daemon_and_fallback(self):
+        with (
+            patch("wallpaper_ctl.send_command", return_value={"ok": True}) as send_mock,
+            patch("builtins.print"),
+        ):
+            self.assertEqual(wallpaper_ctl.main(["progressive", "/tmp/wall.jpg"]), 0)
+        send_mock.assert_called_once_with("progressive", wallpaper_path="/tmp/wall.jpg")
+
+        with (
+            patch("wallpaper_ctl.send_command", side_effect=FileNotFoundError("no socket")),
+            patch("wallpaper_ctl.os.execv") as execv_mock,
+        ):
+            wallpaper_ctl.main(["progressive", "/tmp/wall.jpg"])
+
+        self.assertEqual(execv_mock.call_args.args[1][2:], ["--progressive", "--wallpaper", "/tmp/wall.jpg"])
+
+    def test_status_without_daemon_fails(self):
+        with (
+            patch("wallpaper_ctl.send_command", side_effect=ConnectionRefusedError()),
+            patch("wallpaper_ctl.os.execv") as execv_mock,
+            patch("sys.stderr"),
+        ):
+            result = wallpaper_ctl.main(["status"])
+
+        self.assertEqual(result, 1)
+        execv_mock.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
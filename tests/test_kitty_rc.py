@@ -0,0 +1,145 @@
+import asyncio
+import json
+import pathlib
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+from wcsync import kitty_rc, reloaders
+from wcsync.colors import build_scheme
+from wcsync.config import Config
+from wcsync.socket_registry import SocketRegistry
+from wcsync.writers.kitty import kitty_colors
+
+
+class FakeKitty:
+    """A local socket server answering remote-control commands like Kitty."""
+
+    def __init__(self, path, delay=0.0, error=None, respond=True):
+        self.path = path
+        self.delay = delay
+        self.error = error
+        self.respond = respond
+        self.commands = []
+        self.handlers = []
+
+    async def handle(self, reader, writer):
+        self.handlers.append(asyncio.current_task())
+        try:
+            frame = await reader.readuntil(kitty_rc.SUFFIX)
+        except asyncio.IncompleteReadError:
+            writer.close()
+            return
+        self.commands.append(kitty_rc.decode_response(frame))
+        if self.respond:
+            await asyncio.sleep(self.delay)
+            reply = {"ok": False, "error": self.error} if self.error else {"ok": True}
+            writer.write(kitty_rc.PREFIX + json.dumps(reply).encode() + kitty_rc.SUFFIX)
+            await writer.drain()
+        await reader.read()  # until the client hangs up
+        writer.close()
+
+
+async def _with_servers(servers, body):
+    started = [await asyncio.start_unix_server(s.handle, path=s.path) for s in servers]
+    try:
+        return await body()
+    finally:
+        for server in started:
+            server.close()
+            await server.wait_closed()
+        await asyncio.gather(*(h for s in servers for h in s.handlers))
+
+
+class KittyRcTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.addCleanup(tmp.cleanup)
+        self.dir = pathlib.Path(tmp.name)
+
+    def test_encode_frames_json_command(self):
+        frame = kitty_rc.encode_command("set-colors", {"all": True})
+
+        self.assertTrue(frame.startswith(b"\x1bP@kitty-cmd{"))
+        self.assertTrue(frame.endswith(b"\x1b\\"))
+        self.assertEqual(
+            kitty_rc.decode_response(frame),
+            {"cmd": "set-colors", "version": [0, 26, 0], "no_response": False, "payload": {"all": True}},
+        )
+
+    def test_set_colors_sends_inline_colors(self):
+        server = FakeKitty(str(self.dir / "kitty-sock-1"))
+
+        asyncio.run(
+            _with_servers(
+                [server],
+                lambda: kitty_rc.set_colors(server.path, {"background": (1, 2, 3), "color1": (255, 0, 16)}),
+            )
+        )
+
+        (command,) = server.commands
+        self.assertEqual(command["cmd"], "set-colors")
+        payload = command["payload"]
+        self.assertEqual(payload["colors"], {"background": 0x010203, "color1": 0xFF0010})
+        self.assertTrue(payload["all"])
+        self.assertTrue(payload["configured"])
+
+    def test_error_response_raises(self):
+        server = FakeKitty(str(self.dir / "kitty-sock-1"), error="Remote control is disabled")
+
+        with self.assertRaisesRegex(kitty_rc.KittyError, "disabled"):
+            asyncio.run(_with_servers([server], lambda: kitty_rc.set_colors(server.path, {})))
+
+    def test_read_timeout(self):
+        server = FakeKitty(str(self.dir / "kitty-sock-1"), respond=False)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(
+                _with_servers([server], lambda: kitty_rc.set_colors(server.path, {}, read_timeout=0.1))
+            )
+
+
+class ReloadKittyTests(unittest.TestCase):
+    def test_reload_all_recolors_every_window_concurrently(self):
+        tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.addCleanup(tmp.cleanup)
+        servers = [FakeKitty(f"{tmp.name}/kitty-sock-{n}", delay=0.2) for n in range(10)]
+        crashed = subprocess.Popen([sys.executable, "-c", "pass"])
+        crashed.wait()
+        stale = f"{tmp.name}/kitty-sock-{crashed.pid}"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(stale)  # left behind, as by a crashed Kitty
+        scheme = build_scheme([(10, 20, 30), (200, 100, 50), (240, 240, 230)])
+        cfg = Config()
+        cfg.targets = {k: k == "kitty" for k in cfg.targets}
+
+        async def body():
+            # reload_all runs its own loop, so serve from this one in a thread.
+            with (
+                patch("wcsync.reloaders.KITTY_SOCKETS", f"{tmp.name}/kitty-sock-*"),
+                patch("wcsync.socket_registry.REGISTRY", SocketRegistry(f"{tmp.name}/dead.json")),
+            ):
+                return await asyncio.to_thread(reloaders.reload_all, scheme, cfg)
+
+        started = time.perf_counter()
+        (result,) = asyncio.run(_with_servers(servers, body))
+
+        self.assertLess(time.perf_counter() - started, 1.0)  # serial would be 2 s
+        self.assertEqual((result.app, result.returncode, result.commands), ("kitty", 0, 10))
+        self.assertFalse(pathlib.Path(stale).exists())
+        expected = kitty_rc.set_colors_payload(kitty_colors(scheme))["colors"]
+        for server in servers:
+            self.assertEqual([c["payload"]["colors"] for c in server.commands], [expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
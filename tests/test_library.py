@@ -0,0 +1,130 @@
+import os
+import pathlib
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+import sys
+
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+# Provide a lightweight Quartz stub for non-macOS test environments.
+if "Quartz" not in sys.modules:
+    sys.modules["Quartz"] = types.SimpleNamespace()
+
+from wcsync import library
+from wcsync.capture import load_wallpaper_from_file
+from wcsync.colors import build_scheme, image_hash
+from wcsync.config import Config
+from wcsync.palette_cache import PaletteCache, extraction_key
+
+
+class LibraryIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = pathlib.Path(self.tmp.name) / "wallpaper"
+        self.index_path = str(pathlib.Path(self.tmp.name) / "library_index.json")
+        self.cache_path = str(pathlib.Path(self.tmp.name) / "palette_cache.json")
+        cache_patch = patch("wcsync.palette_cache.CACHE_FILE", self.cache_path)
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+        for theme, color in (("dark", (20, 30, 60)), ("light", (230, 220, 190))):
+            (self.root / theme).mkdir(parents=True)
+            Image.new("RGB", (900, 500), color).save(self.root / theme / "a.png")
+        (self.root / "light" / "notes.txt").write_text("not an image", encoding="utf-8")
+
+    def build(self, config=None, **kwargs):
+        with patch("wcsync.library.log"):
+            return library.build_index(
+                root=str(self.root),
+                index_path=self.index_path,
+                config=config or Config(),
+                workers=1,
+                **kwargs,
+            )
+
+    def test_indexes_theme_folders_and_prewarms_palette_cache(self):
+        entries, analyzed = self.build()
+
+        self.assertEqual(analyzed, 2)
+        dark = entries[str(self.root / "dark" / "a.png")]
+        self.assertEqual((dark["width"], dark["height"]), (900, 500))
+        self.assertLess(dark["luminance"], 60)
+        # (20, 30, 60) at the center of its 5-bit histogram bin.
+        self.assertEqual(dark["palette"][0][:3], [20, 28, 60])
+
+        # The Sync Run computes the same hash, so it hits the pre-warmed cache.
+        img = load_wallpaper_from_file(str(self.root / "dark" / "a.png"))
+        self.assertEqual(dark["hash"], image_hash(img))
+        cached = PaletteCache(self.cache_path).get(extraction_key(dark["hash"], Config()))
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached[1]["dark"], tuple(dark["scheme"]["dark"]))
+
+    def test_only_changed_files_are_reanalyzed(self):
+        self.build()
+        changed = self.root / "light" / "a.png"
+        Image.new("RGB", (640, 640), (250, 250, 250)).save(changed)
+        os.utime(changed, ns=(1, 1))
+        (self.root / "dark" / "a.png").unlink()
+
+        with patch("wcsync.library.analyze_wallpaper", wraps=library.analyze_wallpaper) as analyze_mock:
+            entries, analyzed = self.build()
+
+        self.assertEqual(analyzed, 1)
+        analyze_mock.assert_called_once()
+        self.assertEqual(list(entries), [str(changed)])
+        self.assertEqual(library.load_index(self.index_path)["entries"][str(changed)]["width"], 640)
+
+    def test_scheme_only_change_rebuilds_schemes_without_reanalyzing(self):
+        self.build()
+        config = Config(accent_override="#336699")
+
+        with patch("wcsync.library.analyze_wallpaper") as analyze_mock:
+            entries, analyzed = self.build(config)
+
+        self.assertEqual(analyzed, 0)
+        analyze_mock.assert_not_called()
+        for meta in entries.values():
+            palette = [tuple(c[:3]) for c in meta["palette"]]
+            expected = build_scheme(palette, config)
+            self.assertEqual(meta["scheme"], {role: list(rgb) for role, rgb in expected.items()})
+        cached = PaletteCache(self.cache_path).get(extraction_key(meta["hash"], config))
+        self.assertEqual(cached[1], expected)
+
+    def test_bound_regions_are_indexed_and_survive_scheme_rebuilds(self):
+        config = Config(bindings={"sketchybar": "top"})
+        entries, _ = self.build(config)
+        dark = entries[str(self.root / "dark" / "a.png")]
+        self.assertEqual(list(dark["regions"]), ["top"])
+        self.assertIn("top/accent", dark["scheme"])
+
+        rescheme = Config(bindings={"sketchybar": "top"}, accent_override="#336699")
+        with patch("wcsync.library.analyze_wallpaper") as analyze_mock:
+            entries, _ = self.build(rescheme)
+
+        analyze_mock.assert_not_called()
+        dark = entries[str(self.root / "dark" / "a.png")]
+        self.assertEqual(dark["scheme"]["top/accent"], [51, 102, 153])
+
+    def test_process_pool_matches_in_process_results(self):
+        entries, _ = self.build()
+        os.unlink(self.index_path)
+        with patch("wcsync.library.log"):
+            pooled, analyzed = library.build_index(
+                root=str(self.root), index_path=self.index_path, config=Config(), workers=2
+            )
+
+        self.assertEqual(analyzed, 2)
+        self.assertEqual(pooled, entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
+import json
 import pathlib
+import tempfile
 import types
 import unittest
-from unittest.mock import MagicMock, call, mock_open, patch
+from unittest.mock import ANY, MagicMock, call, mock_open, patch
 
-from PIL import Image
+from PIL import Image, ImageDraw
 
 # Make wcsync/wallpaper_colors importable from repo root.
 REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -17,15 +19,69 @@ if "Quartz" not in sys.modules:
     sys.modules["Quartz"] = types.SimpleNamespace()
 
 import wallpaper_colors
+from wcsync.colors import image_hash, perceptual_hash, scheme_variant
 from wcsync.config import Config
-from wcsync import sync_run
+from wcsync import palette_cache, staging, sync_run
+from wcsync.palette_cache import PaletteCache, extraction_key
 from wcsync.sync_run import SyncRunError, SyncRunOptions
+from wcsync.target_writing import WriteAllResult
+
+WRITTEN = WriteAllResult(changed=["kitty", "sketchybar"])
+
+
+def isolate_caches(test, perceptual=False):
+    """Point cache/state files at a temp dir; stub the perceptual hash unless *perceptual*."""
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    patches = [
+        patch(target, str(pathlib.Path(tmp.name) / name))
+        for target, name in (
+            ("wcsync.palette_cache.CACHE_FILE", "palette_cache.json"),
+            ("wcsync.staging.STAGING_DIR", "staging"),
+            ("wcsync.sync_run.PHASH_FILE", ".last_phash"),
+            ("wcsync.sync_run.SCHEME_FILE", ".last_scheme.json"),
+        )
+    ]
+    if not perceptual:
+        # Most tests drive run_sync with MagicMock images.
+        patches.append(patch("wcsync.sync_run.perceptual_hash", return_value="0" * 16))
+        patches.append(patch("wcsync.sync_run.mean_color", return_value=(0, 0, 0)))
+    for state_patch in patches:
+        state_patch.start()
+        test.addCleanup(state_patch.stop)
+
+
+def sync_run_cache_path():
+    return palette_cache.CACHE_FILE
+
+
+class ConfigSignatureTests(unittest.TestCase):
+    def test_runtime_only_fields_keep_the_signature(self):
+        signature = sync_run.config_signature(Config())
+        runtime = Config(
+            fingerprint_content=True,
+            phash_threshold=4,
+            progressive_threshold=0.05,
+            scheme_hysteresis=0.0,
+            reload_timeout=1.0,
+            timings_log=True,
+            palette_cache_entries=8,
+            palette_cache_max_age_days=1,
+        )
+
+        self.assertEqual(sync_run.config_signature(runtime), signature)
+        self.assertNotEqual(sync_run.config_signature(Config(n_colors=6)), signature)
+        self.assertNotEqual(sync_run.config_signature(Config(border_opacity=0x10)), signature)
 
 
 class SyncRunTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+
     def test_run_sync_raises_when_wallpaper_load_fails(self):
         with (
             patch("wcsync.sync_run.Config.load", return_value=Config()),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=""),
             patch("wcsync.sync_run.load_wallpaper", return_value=(None, "")),
             patch("wcsync.sync_run.write_all") as write_all_mock,
         ):
@@ -39,6 +95,8 @@ class SyncRunTests(unittest.TestCase):
         img.size = (3840, 2160)
         with (
             patch("wcsync.sync_run.Config.load", return_value=Config()),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
             patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
             patch("wcsync.sync_run.image_hash", return_value="samehash"),
             patch("wcsync.sync_run.config_signature", return_value="sig"),
@@ -75,14 +133,16 @@ class SyncRunTests(unittest.TestCase):
 
         with (
             patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
             patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
             patch("wcsync.sync_run.image_hash", return_value="samehash"),
             patch("wcsync.sync_run.config_signature", return_value="new-sig"),
             patch("wcsync.sync_run.os.path.exists", return_value=True),
             patch("builtins.open", mock_open(read_data="samehash:old-sig")),
-            patch("wcsync.sync_run.extract_palette", return_value=[(1, 2, 3)]),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
             patch("wcsync.sync_run.build_scheme", return_value=scheme),
-            patch("wcsync.sync_run.write_all", return_value=[]) as write_all_mock,
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
             patch("wcsync.sync_run.reload_all") as reload_all_mock,
             patch("wcsync.sync_run.atomic_write") as atomic_write_mock,
             patch("wcsync.sync_run.subprocess.run"),
@@ -91,8 +151,12 @@ class SyncRunTests(unittest.TestCase):
 
         self.assertFalse(result.skipped)
         img.resize.assert_called_once_with((200, 200), Image.Resampling.LANCZOS)
-        write_all_mock.assert_called_once_with(scheme, cfg)
-        reload_all_mock.assert_called_once_with(scheme, cfg)
+        write_all_mock.assert_called_once_with(
+            scheme, cfg, staged=None, timer=ANY, apps=None, on_changed=ANY
+        )
+        reload_all_mock.assert_called_once_with(
+            scheme, cfg, apps=WRITTEN.changed, timer=ANY, pipeline=ANY
+        )
         atomic_write_mock.assert_any_call(sync_run.CACHE_FILE, "samehash:new-sig")
 
     def test_run_sync_force_runs_full_lifecycle(self):
@@ -112,12 +176,14 @@ class SyncRunTests(unittest.TestCase):
 
         with (
             patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
             patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
             patch("wcsync.sync_run.image_hash", return_value="newhash"),
             patch("wcsync.sync_run.config_signature", return_value="sig"),
-            patch("wcsync.sync_run.extract_palette", return_value=[(1, 2, 3)]) as extract_mock,
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]) as extract_mock,
             patch("wcsync.sync_run.build_scheme", return_value=scheme) as build_mock,
-            patch("wcsync.sync_run.write_all", return_value=[]) as write_all_mock,
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
             patch("wcsync.sync_run.reload_all") as reload_all_mock,
             patch("wcsync.sync_run.atomic_write") as atomic_write_mock,
             patch("wcsync.sync_run.subprocess.run") as run_mock,
@@ -127,10 +193,16 @@ class SyncRunTests(unittest.TestCase):
         self.assertFalse(result.skipped)
         img.resize.assert_called_once_with((200, 200), Image.Resampling.LANCZOS)
         run_mock.assert_called_once_with([sync_run.DESKTOPPR, "/tmp/wall.jpg"], capture_output=True)
-        extract_mock.assert_called_once_with(small, n_colors=cfg.n_colors)
+        extract_mock.assert_called_once_with(
+            small, n_colors=cfg.n_colors, extractor="mediancut", histogram_bits=5
+        )
         build_mock.assert_called_once_with([(1, 2, 3)], cfg)
-        write_all_mock.assert_called_once_with(scheme, cfg)
-        reload_all_mock.assert_called_once_with(scheme, cfg)
+        write_all_mock.assert_called_once_with(
+            scheme, cfg, staged=None, timer=ANY, apps=None, on_changed=ANY
+        )
+        reload_all_mock.assert_called_once_with(
+            scheme, cfg, apps=WRITTEN.changed, timer=ANY, pipeline=ANY
+        )
         atomic_write_mock.assert_has_calls(
             [
                 call(sync_run.CACHE_FILE, "newhash:sig"),
@@ -145,14 +217,21 @@ class SyncRunTests(unittest.TestCase):
         img.resize.return_value = MagicMock()
         cfg = Config()
 
+        def write_some(*_, on_changed, **__):
+            on_changed("sketchybar")
+            return WriteAllResult(failed=["kitty"], changed=["sketchybar"])
+
         with (
             patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
             patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
             patch("wcsync.sync_run.image_hash", return_value="newhash"),
             patch("wcsync.sync_run.config_signature", return_value="sig"),
-            patch("wcsync.sync_run.extract_palette", return_value=[(1, 2, 3)]),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
             patch("wcsync.sync_run.build_scheme", return_value={"border_accent": (13, 14, 15)}),
-            patch("wcsync.sync_run.write_all", return_value=["kitty"]),
+            patch("wcsync.sync_run.write_all", side_effect=write_some) as write_all_mock,
+            patch("wcsync.sync_run.ReloadPipeline") as pipeline_cls,
             patch("wcsync.sync_run.reload_all") as reload_all_mock,
             patch("wcsync.sync_run.atomic_write") as atomic_write_mock,
             patch("wcsync.sync_run.subprocess.run") as run_mock,
@@ -160,16 +239,678 @@ class SyncRunTests(unittest.TestCase):
             with self.assertRaises(SyncRunError):
                 sync_run.run_sync(SyncRunOptions(force=True))
 
+        # The app that was written still reloads; nothing is cached.
+        self.assertIs(write_all_mock.call_args.kwargs["on_changed"], pipeline_cls.return_value.start)
+        pipeline_cls.return_value.start.assert_called_once_with("sketchybar")
+        pipeline_cls.return_value.finish.assert_called_once_with()
         atomic_write_mock.assert_not_called()
         reload_all_mock.assert_not_called()
         run_mock.assert_called_once_with([sync_run.DESKTOPPR, "/tmp/wall.jpg"], capture_output=True)
 
 
+    def test_run_sync_skips_reload_when_no_material_changed(self):
+        img = MagicMock()
+        img.size = (1920, 1080)
+        img.resize.return_value = MagicMock()
+        cfg = Config()
+        scheme = {"accent": (1, 2, 3), "border_accent": (13, 14, 15), "border_inactive": (16, 17, 18)}
+
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
+            patch("wcsync.sync_run.image_hash", return_value="newhash"),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
+            patch("wcsync.sync_run.build_scheme", return_value=scheme),
+            patch("wcsync.sync_run.write_all", return_value=WriteAllResult()),
+            patch("wcsync.sync_run.reload_all") as reload_all_mock,
+            patch("wcsync.sync_run.atomic_write") as atomic_write_mock,
+            patch("wcsync.sync_run.subprocess.run"),
+        ):
+            result = sync_run.run_sync(SyncRunOptions(force=True))
+
+        self.assertFalse(result.skipped)
+        reload_all_mock.assert_not_called()
+        atomic_write_mock.assert_any_call(sync_run.CACHE_FILE, "newhash:sig")
+
+    def test_run_sync_reports_stage_timings(self):
+        img = MagicMock()
+        img.size = (1920, 1080)
+        img.resize.return_value = MagicMock()
+        cfg = Config(timings_log=True)
+        scheme = {"accent": (1, 2, 3), "border_accent": (13, 14, 15), "border_inactive": (16, 17, 18)}
+
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
+            patch("wcsync.sync_run.image_hash", return_value="newhash"),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
+            patch("wcsync.sync_run.build_scheme", return_value=scheme),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN),
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.atomic_write"),
+            patch("wcsync.sync_run.subprocess.run"),
+            patch("wcsync.sync_run.append_timings_log") as log_mock,
+            patch("builtins.print") as print_mock,
+        ):
+            result = sync_run.run_sync(SyncRunOptions(force=True, timings=True))
+
+        for stage in ("config", "wallpaper_path", "decode", "hash", "resize", "quantize", "scheme",
+                      "propagate", "write", "reload", "total"):
+            self.assertIn(stage, result.timings)
+        log_mock.assert_called_once_with(result.timings, False)
+        self.assertIn("Timings:", [c.args[0] for c in print_mock.call_args_list])
+
+    def test_palette_cache_hit_skips_resize_and_extraction(self):
+        img = MagicMock()
+        img.size = (1920, 1080)
+        cfg = Config()
+        scheme = {"accent": (1, 2, 3), "border_accent": (13, 14, 15), "border_inactive": (16, 17, 18)}
+        cache = PaletteCache(sync_run_cache_path(), max_entries=4)
+        cache.put(extraction_key("newhash", cfg), [((1, 2, 3), 10)], scheme)
+        cache.save()
+
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
+            patch("wcsync.sync_run.image_hash", return_value="newhash"),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run.extract_weighted_palette") as extract_mock,
+            patch("wcsync.sync_run.build_scheme") as build_mock,
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.atomic_write"),
+            patch("wcsync.sync_run.subprocess.run"),
+        ):
+            result = sync_run.run_sync(SyncRunOptions(force=True))
+
+        self.assertFalse(result.skipped)
+        img.resize.assert_not_called()
+        extract_mock.assert_not_called()
+        build_mock.assert_not_called()
+        write_all_mock.assert_called_once_with(
+            scheme, cfg, staged=None, timer=ANY, apps=None, on_changed=ANY
+        )
+
+
+class SyncRunProgressiveTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+        self.img = MagicMock()
+        self.img.size = (3840, 2160)
+        self.cfg = Config()
+        self.provisional = {"accent": (200, 40, 40), "border_accent": (230, 40, 40)}
+        self.critical = ["sketchybar", "borders", "kitty"]
+
+    def run_progressive(self, refined):
+        with (
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=""),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(self.img, "")),
+            patch("wcsync.sync_run.image_hash", return_value="newhash"),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
+            patch("wcsync.sync_run.build_scheme", side_effect=[self.provisional, refined]),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all") as reload_all_mock,
+            patch("wcsync.sync_run.atomic_write"),
+        ):
+            result = sync_run.run_sync(SyncRunOptions(progressive=True), config=self.cfg)
+        self.assertFalse(result.skipped)
+        self.assertIn("provisional", result.timings)
+        return write_all_mock, reload_all_mock
+
+    def test_provisional_reloads_overlap_the_refined_extraction(self):
+        refined = {"accent": (90, 120, 200), "border_accent": (60, 110, 240)}
+        schemes = iter([self.provisional, refined])
+        events = []
+
+        def build(*_):
+            scheme = next(schemes)
+            events.append(("extract", scheme))
+            return scheme
+
+        with (
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=""),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(self.img, "")),
+            patch("wcsync.sync_run.image_hash", return_value="newhash"),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
+            patch("wcsync.sync_run.build_scheme", side_effect=build),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN),
+            patch("wcsync.sync_run.reload_all", side_effect=lambda s, *_, **__: events.append(("reload", s))),
+            patch("wcsync.sync_run.atomic_write"),
+        ):
+            sync_run.run_sync(SyncRunOptions(progressive=True), config=self.cfg)
+
+        # Provisional reloads are awaited only after the refined scheme is built.
+        self.assertEqual(
+            events,
+            [
+                ("extract", self.provisional),
+                ("extract", refined),
+                ("reload", self.provisional),
+                ("reload", refined),
+            ],
+        )
+
+    def test_provisional_scheme_reaches_latency_critical_apps_first(self):
+        refined = {"accent": (90, 120, 200), "border_accent": (60, 110, 240)}
+
+        write_all_mock, reload_all_mock = self.run_progressive(refined)
+
+        self.img.resize.assert_any_call(sync_run.PROGRESSIVE_SIZE, Image.Resampling.BOX)
+        self.assertEqual(
+            write_all_mock.call_args_list,
+            [
+                call(self.provisional, self.cfg, apps=self.critical, on_changed=ANY),
+                call(refined, self.cfg, staged=None, timer=ANY, apps=None, on_changed=ANY),
+            ],
+        )
+        self.assertEqual(
+            reload_all_mock.call_args_list,
+            [
+                call(self.provisional, self.cfg, apps=WRITTEN.changed, pipeline=ANY),
+                call(refined, self.cfg, apps=WRITTEN.changed, timer=ANY, pipeline=ANY),
+            ],
+        )
+
+    def test_refined_scheme_within_threshold_skips_second_publish(self):
+        refined = {"accent": (201, 40, 40), "border_accent": (230, 41, 40)}
+
+        write_all_mock, _ = self.run_progressive(refined)
+
+        rest = [app for app in self.cfg.targets if self.cfg.targets[app] and app not in self.critical]
+        refined_call = write_all_mock.call_args_list[1]
+        self.assertEqual(sorted(refined_call.kwargs["apps"]), sorted(rest))
+
+
+class SyncRunHysteresisTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name in ("CACHE_FILE", "LAST_WP_FILE", "FINGERPRINT_FILE"):
+            state_patch = patch(f"wcsync.sync_run.{name}", str(pathlib.Path(tmp.name) / name))
+            state_patch.start()
+            self.addCleanup(state_patch.stop)
+        self.img = MagicMock()
+        self.img.size = (1920, 1080)
+        # phash_threshold=-1 so every new hash reaches the scheme stage.
+        self.cfg = Config(phash_threshold=-1)
+        self.published = {"accent": (90, 120, 200), "border_accent": (60, 110, 240)}
+        self.sync("first", self.published)
+
+    def sync(self, wallpaper_hash, scheme, options=None, config=None):
+        with (
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=""),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(self.img, "")),
+            patch("wcsync.sync_run.image_hash", return_value=wallpaper_hash),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
+            patch("wcsync.sync_run.build_scheme", return_value=scheme),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all") as reload_all_mock,
+        ):
+            result = sync_run.run_sync(options or SyncRunOptions(), config=config or self.cfg)
+        return result, write_all_mock, reload_all_mock
+
+    def test_near_identical_scheme_keeps_published_one(self):
+        result, write_all_mock, reload_all_mock = self.sync(
+            "second", {"accent": (91, 120, 200), "border_accent": (60, 111, 240)}
+        )
+
+        self.assertTrue(result.skipped)
+        write_all_mock.assert_not_called()
+        reload_all_mock.assert_not_called()
+        with open(sync_run.CACHE_FILE) as f:
+            self.assertEqual(f.read(), result.cache_key)
+        with open(sync_run.SCHEME_FILE) as f:
+            self.assertEqual(json.load(f)["scheme"]["accent"], [90, 120, 200])
+
+    def test_perceptible_change_publishes(self):
+        moved = {"accent": (200, 60, 40), "border_accent": (240, 70, 40)}
+
+        result, write_all_mock, _ = self.sync("second", moved)
+
+        self.assertFalse(result.skipped)
+        write_all_mock.assert_called_once()
+        with open(sync_run.SCHEME_FILE) as f:
+            self.assertEqual(json.load(f)["scheme"]["accent"], [200, 60, 40])
+
+    def test_force_and_zero_threshold_bypass_hysteresis(self):
+        self.assertFalse(self.sync("second", self.published, SyncRunOptions(force=True))[0].skipped)
+        config = Config(phash_threshold=-1, scheme_hysteresis=0.0)
+        self.sync("third", self.published, config=config)
+        self.assertFalse(self.sync("fourth", self.published, config=config)[0].skipped)
+
+    def test_config_change_publishes_close_scheme(self):
+        config = Config(phash_threshold=-1, n_colors=6)
+
+        self.assertFalse(self.sync("first", self.published, config=config)[0].skipped)
+
+    def test_progressive_run_within_hysteresis_publishes_nothing(self):
+        result, write_all_mock, _ = self.sync(
+            "second", self.published, SyncRunOptions(progressive=True)
+        )
+
+        self.assertTrue(result.skipped)
+        self.assertIn("provisional", result.timings)
+        write_all_mock.assert_not_called()
+
+
+class SyncRunRegionTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+
+    def test_bound_regions_extend_the_scheme_from_one_working_image(self):
+        img = Image.new("RGB", (400, 400), (30, 60, 110))
+        img.paste((200, 140, 60), (0, 0, 400, 20))
+        cfg = Config(bindings={"sketchybar": "top"})
+        with (
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=""),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, "")),
+            patch("wcsync.sync_run.os.path.exists", return_value=False),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.atomic_write"),
+            patch("wcsync.sync_run.region_palettes", wraps=sync_run.region_palettes) as regions_mock,
+        ):
+            result = sync_run.run_sync(config=cfg)
+
+        self.assertIn("regions", result.timings)
+        small, _, regions = regions_mock.call_args.args
+        self.assertEqual(small.size, (200, 200))
+        self.assertEqual(list(regions), ["top"])
+        scheme = write_all_mock.call_args.args[0]
+        self.assertIn("top/accent", scheme)
+        self.assertNotIn("center/accent", scheme)
+
+
+class SyncRunAppearanceTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name in ("CACHE_FILE", "LAST_WP_FILE", "FINGERPRINT_FILE"):
+            state_patch = patch(f"wcsync.sync_run.{name}", str(pathlib.Path(tmp.name) / name))
+            state_patch.start()
+            self.addCleanup(state_patch.stop)
+        self.wallpaper = str(pathlib.Path(tmp.name) / "wall.png")
+        Image.new("RGB", (800, 450), (40, 90, 160)).save(self.wallpaper)
+        self.cfg = Config(appearance="auto")
+
+    def sync(self, appearance):
+        with (
+            patch("wcsync.sync_run.system_appearance", return_value=appearance),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=self.wallpaper),
+            patch("wcsync.sync_run.load_wallpaper", wraps=sync_run.load_wallpaper) as load_mock,
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.subprocess.run"),
+            patch("wcsync.sync_run.log"),
+        ):
+            result = sync_run.run_sync(config=self.cfg)
+        return result, load_mock, write_all_mock
+
+    def test_appearance_flip_publishes_prerendered_variant(self):
+        result, load_mock, write_all_mock = self.sync("dark")
+        self.assertIn("flip", result.timings)
+        dark_scheme = write_all_mock.call_args.args[0]
+
+        result, load_mock, write_all_mock = self.sync("light")
+
+        self.assertFalse(result.skipped)
+        load_mock.assert_not_called()
+        light_scheme = write_all_mock.call_args.args[0]
+        self.assertIn("kitty", write_all_mock.call_args.kwargs["staged"])
+        self.assertEqual(light_scheme, scheme_variant(dark_scheme, "light"))
+        # And the way back is staged in turn.
+        self.assertFalse(self.sync("dark")[1].called)
+
+    def test_unchanged_appearance_still_skips(self):
+        self.sync("dark")
+        self.assertTrue(self.sync("dark")[0].skipped)
+
+    def test_explicit_appearance_does_not_stage_a_flip(self):
+        self.cfg = Config(appearance="light")
+        with patch("wcsync.sync_run.system_appearance") as appearance_mock:
+            result = self.sync("dark")[0]
+
+        appearance_mock.assert_not_called()
+        self.assertNotIn("flip", result.timings)
+
+
+class SyncRunMultiDisplayTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name in ("CACHE_FILE", "LAST_WP_FILE", "FINGERPRINT_FILE"):
+            state_patch = patch(f"wcsync.sync_run.{name}", str(pathlib.Path(tmp.name) / name))
+            state_patch.start()
+            self.addCleanup(state_patch.stop)
+        self.walls = [str(pathlib.Path(tmp.name) / f"wall{n}.png") for n in (1, 2)]
+        Image.new("RGB", (800, 450), (40, 90, 160)).save(self.walls[0])
+        Image.new("RGB", (800, 450), (190, 60, 30)).save(self.walls[1])
+        self.cfg = Config(display_bindings={"kitty": 2, "sketchybar": "blend"}, phash_threshold=-1)
+
+    def sync(self, walls=None):
+        with (
+            patch("wcsync.sync_run.get_wallpaper_paths", return_value=walls or self.walls) as paths_mock,
+            patch("wcsync.sync_run.get_wallpaper_path") as path_mock,
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.subprocess.run"),
+            patch("wcsync.sync_run.log"),
+        ):
+            result = sync_run.run_sync(config=self.cfg)
+        paths_mock.assert_called_once()
+        path_mock.assert_not_called()
+        return result, write_all_mock
+
+    def test_bound_displays_are_extracted_into_the_scheme(self):
+        result, write_all_mock = self.sync()
+
+        self.assertIn("displays", result.timings)
+        scheme = write_all_mock.call_args.args[0]
+        self.assertIn("display:2/accent", scheme)
+        self.assertIn("display:blend/accent", scheme)
+        self.assertNotEqual(scheme["display:2/accent"], scheme["accent"])
+
+    def test_unchanged_displays_skip_and_a_changed_display_resyncs(self):
+        self.sync()
+        self.assertTrue(self.sync()[0].skipped)
+
+        Image.new("RGB", (800, 450), (30, 160, 60)).save(self.walls[1])
+        result, write_all_mock = self.sync()
+
+        self.assertFalse(result.skipped)
+        write_all_mock.assert_called_once()
+
+
+    def test_unplugged_display_keeps_the_fingerprint_fast_path(self):
+        self.assertFalse(self.sync(self.walls[:1])[0].skipped)
+
+        with patch("wcsync.sync_run.load_wallpaper") as load_mock:
+            result, write_all_mock = self.sync(self.walls[:1])
+
+        self.assertTrue(result.skipped)
+        load_mock.assert_not_called()
+        write_all_mock.assert_not_called()
+
+    def test_unreadable_display_falls_back_without_capturing(self):
+        pathlib.Path(self.walls[1]).write_text("not an image")
+
+        with patch("wcsync.capture.capture_wallpaper") as capture_mock:
+            result, write_all_mock = self.sync()
+
+        self.assertFalse(result.skipped)
+        capture_mock.assert_not_called()
+        scheme = write_all_mock.call_args.args[0]
+        self.assertNotIn("display:2/accent", scheme)
+
+
+class SyncRunFingerprintTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+
+    def test_matching_fingerprint_skips_before_decode(self):
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=Config()),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value="fp"),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run._read_state", return_value="fp:sig"),
+            patch("wcsync.sync_run.load_wallpaper") as load_mock,
+            patch("wcsync.sync_run.write_all") as write_all_mock,
+        ):
+            result = sync_run.run_sync()
+
+        self.assertTrue(result.skipped)
+        self.assertEqual(result.wallpaper_path, "/tmp/wall.jpg")
+        load_mock.assert_not_called()
+        write_all_mock.assert_not_called()
+
+    def test_caller_wallpaper_path_beats_a_stale_desktoppr_answer(self):
+        def fingerprint(path, _content):
+            return f"fp-{path}"
+
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=Config()),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/old.jpg") as path_mock,
+            patch("wcsync.sync_run.wallpaper_fingerprint", side_effect=fingerprint),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run._read_state", return_value="fp-/tmp/old.jpg:sig"),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(None, "")) as load_mock,
+            patch("wcsync.sync_run.log"),
+        ):
+            with self.assertRaises(SyncRunError):
+                sync_run.run_sync(SyncRunOptions(wallpaper_path="/tmp/new.jpg"))
+
+        path_mock.assert_not_called()
+        self.assertEqual(load_mock.call_args.kwargs["wp_path"], "/tmp/new.jpg")
+
+    def test_force_ignores_fingerprint_and_records_it_after_sync(self):
+        img = MagicMock()
+        img.size = (1920, 1080)
+        img.resize.return_value = MagicMock()
+        cfg = Config()
+        scheme = {"accent": (1, 2, 3), "border_accent": (13, 14, 15), "border_inactive": (16, 17, 18)}
+
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value="fp") as fp_mock,
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run._read_state", return_value="fp:sig"),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")) as load_mock,
+            patch("wcsync.sync_run.image_hash", return_value="newhash"),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
+            patch("wcsync.sync_run.build_scheme", return_value=scheme),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN),
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.atomic_write") as atomic_write_mock,
+            patch("wcsync.sync_run.subprocess.run"),
+        ):
+            result = sync_run.run_sync(SyncRunOptions(force=True))
+
+        self.assertFalse(result.skipped)
+        fp_mock.assert_called_once_with("/tmp/wall.jpg", cfg.fingerprint_content)
+        load_mock.assert_called_once_with(cfg, wp_path="/tmp/wall.jpg")
+        atomic_write_mock.assert_any_call(sync_run.FINGERPRINT_FILE, "fp:sig")
+
+    def test_hash_hit_refreshes_stale_fingerprint(self):
+        img = MagicMock()
+        img.size = (1920, 1080)
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=Config()),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value="/tmp/wall.jpg"),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value="touched"),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run._read_state", return_value="old:sig"),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, "/tmp/wall.jpg")),
+            patch("wcsync.sync_run.image_hash", return_value="samehash"),
+            patch("wcsync.sync_run.os.path.exists", return_value=True),
+            patch("builtins.open", mock_open(read_data="samehash:sig")),
+            patch("wcsync.sync_run.write_all") as write_all_mock,
+            patch("wcsync.sync_run.atomic_write") as atomic_write_mock,
+        ):
+            result = sync_run.run_sync()
+
+        self.assertTrue(result.skipped)
+        write_all_mock.assert_not_called()
+        atomic_write_mock.assert_called_once_with(sync_run.FINGERPRINT_FILE, "touched:sig")
+
+
+class SyncRunStagingTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.wallpaper = str(pathlib.Path(self.tmp.name) / "next.png")
+        Image.new("RGB", (800, 450), (40, 90, 160)).save(self.wallpaper)
+
+    def test_prerendered_wallpaper_publishes_without_decode(self):
+        cfg = Config()
+        with (
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run.log"),
+        ):
+            key = sync_run.prerender(self.wallpaper, cfg)
+
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=self.wallpaper),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run._read_state", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper") as load_mock,
+            patch("wcsync.sync_run.extract_weighted_palette") as extract_mock,
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all") as reload_all_mock,
+            patch("wcsync.sync_run.atomic_write") as atomic_write_mock,
+            patch("wcsync.sync_run.subprocess.run"),
+        ):
+            result = sync_run.run_sync()
+
+        self.assertFalse(result.skipped)
+        load_mock.assert_not_called()
+        extract_mock.assert_not_called()
+        staged = write_all_mock.call_args.kwargs["staged"]
+        self.assertIn("kitty", staged)
+        self.assertIn("background", staged["kitty"][0].content)
+        reload_all_mock.assert_called_once()
+        atomic_write_mock.assert_any_call(sync_run.FINGERPRINT_FILE, key)
+        self.assertFalse(staging.has_staged(key))
+
+    def test_force_ignores_staged_material(self):
+        cfg = Config()
+        img = MagicMock()
+        img.size = (800, 450)
+        with (
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run.log"),
+        ):
+            sync_run.prerender(self.wallpaper, cfg)
+
+        with (
+            patch("wcsync.sync_run.Config.load", return_value=cfg),
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=self.wallpaper),
+            patch("wcsync.sync_run.config_signature", return_value="sig"),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, self.wallpaper)) as load_mock,
+            patch("wcsync.sync_run.image_hash", return_value="newhash"),
+            patch("wcsync.sync_run.extract_weighted_palette", return_value=[((1, 2, 3), 10)]),
+            patch("wcsync.sync_run.build_scheme", return_value={"accent": (1, 2, 3), "border_accent": (4, 5, 6)}),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.atomic_write"),
+            patch("wcsync.sync_run.subprocess.run"),
+        ):
+            sync_run.run_sync(SyncRunOptions(force=True))
+
+        load_mock.assert_called_once()
+        self.assertIsNone(write_all_mock.call_args.kwargs["staged"])
+
+
+class SyncRunPerceptualHashTests(unittest.TestCase):
+    def setUp(self):
+        isolate_caches(self, perceptual=True)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = pathlib.Path(tmp.name)
+        for name in ("CACHE_FILE", "LAST_WP_FILE", "FINGERPRINT_FILE"):
+            state_patch = patch(f"wcsync.sync_run.{name}", str(self.tmp / name))
+            state_patch.start()
+            self.addCleanup(state_patch.stop)
+        # A captured (non-file) wallpaper: soft two-tone layout with grain.
+        self.capture = Image.new("RGB", (480, 270), (30, 60, 110))
+        self.capture.paste((200, 140, 60), (0, 0, 200, 270))
+        self.capture = Image.blend(self.capture, Image.effect_noise((480, 270), 40).convert("RGB"), 0.1)
+        # Layout changes keep the palette; hysteresis would hold those schemes.
+        self.config = Config(phash_threshold=4, scheme_hysteresis=0.0)
+
+    def sync(self, img, config=None):
+        with (
+            patch("wcsync.sync_run.get_wallpaper_path", return_value=""),
+            patch("wcsync.sync_run.wallpaper_fingerprint", return_value=None),
+            patch("wcsync.sync_run.load_wallpaper", return_value=(img, "")),
+            patch("wcsync.sync_run.write_all", return_value=WRITTEN) as write_all_mock,
+            patch("wcsync.sync_run.reload_all"),
+            patch("wcsync.sync_run.log"),
+        ):
+            result = sync_run.run_sync(SyncRunOptions(), config=config or self.config)
+        return result, write_all_mock
+
+    def recompressed(self, img):
+        path = self.tmp / "recompressed.jpg"
+        img.save(path, "JPEG", quality=60)
+        return Image.open(path).convert("RGB")
+
+    def test_recompressed_capture_counts_as_unchanged(self):
+        self.assertFalse(self.sync(self.capture)[0].skipped)
+        dithered = self.recompressed(self.capture)
+        self.assertNotEqual(image_hash(dithered), image_hash(self.capture))
+
+        result, write_all_mock = self.sync(dithered)
+
+        self.assertTrue(result.skipped)
+        write_all_mock.assert_not_called()
+
+    def test_hue_shifted_variant_is_not_a_near_duplicate(self):
+        self.sync(self.capture)
+        r, g, b = self.capture.split()
+        shifted = Image.merge("RGB", (b, g, r))
+        self.assertEqual(perceptual_hash(shifted), perceptual_hash(self.capture))
+
+        self.assertFalse(self.sync(shifted)[0].skipped)
+
+    def test_different_layout_resyncs(self):
+        self.sync(self.capture)
+        self.assertFalse(self.sync(self.capture.transpose(Image.Transpose.FLIP_LEFT_RIGHT))[0].skipped)
+
+    def test_recolored_subject_resyncs_with_default_config(self):
+        def subject(fill):
+            img = Image.new("RGB", (1600, 900), (20, 22, 28))
+            ImageDraw.Draw(img).ellipse((680, 330, 920, 570), fill=fill)
+            return img
+
+        red, blue = subject((228, 41, 41)), subject((41, 82, 237))
+        # Same luminance structure, nearly the same mean: a dHash match.
+        self.assertEqual(perceptual_hash(red), perceptual_hash(blue))
+        self.sync(red, Config())
+
+        result, write_all_mock = self.sync(blue, Config())
+
+        self.assertFalse(result.skipped)
+        accent = write_all_mock.call_args.args[0]["accent"]
+        self.assertGreater(accent[2], accent[0])
+
+    def test_negative_threshold_disables_tolerant_match(self):
+        config = Config(phash_threshold=-1, scheme_hysteresis=0.0)
+        self.sync(self.capture, config)
+        self.assertFalse(self.sync(self.recompressed(self.capture), config)[0].skipped)
+
+
 class WallpaperColorsCliTests(unittest.TestCase):
     def test_options_from_argv_maps_flags(self):
         self.assertEqual(
-            wallpaper_colors.options_from_argv(["--verbose", "-f"]),
-            SyncRunOptions(verbose=True, force=True),
+            wallpaper_colors.options_from_argv(["--verbose", "-f", "--timings", "--progressive"]),
+            SyncRunOptions(verbose=True, force=True, timings=True, progressive=True),
+        )
+        self.assertEqual(
+            wallpaper_colors.options_from_argv(["--appearance", "light"]),
+            SyncRunOptions(appearance="light"),
+        )
+        self.assertIsNone(wallpaper_colors.options_from_argv(["--appearance", "dim"]).appearance)
+        self.assertEqual(
+            wallpaper_colors.options_from_argv(["--progressive", "--wallpaper", "/tmp/w.jpg"]),
+            SyncRunOptions(progressive=True, wallpaper_path="/tmp/w.jpg"),
         )
 
     def test_main_returns_zero_when_sync_run_succeeds(self):
@@ -182,6 +923,30 @@ class WallpaperColorsCliTests(unittest.TestCase):
         self.assertEqual(result, 0)
         run_mock.assert_called_once_with(SyncRunOptions())
 
+    def test_main_serve_starts_daemon_instead_of_sync_run(self):
+        with (
+            patch.object(wallpaper_colors.sys, "argv", ["wallpaper_colors.py", "serve"]),
+            patch("wcsync.daemon.serve", return_value=0) as serve_mock,
+            patch("wallpaper_colors.run_sync") as run_mock,
+        ):
+            result = wallpaper_colors.main()
+
+        self.assertEqual(result, 0)
+        serve_mock.assert_called_once_with()
+        run_mock.assert_not_called()
+
+    def test_main_index_runs_library_indexer(self):
+        with (
+            patch.object(wallpaper_colors.sys, "argv", ["wallpaper_colors.py", "index", "--workers", "2"]),
+            patch("wcsync.library.index_main", return_value=0) as index_mock,
+            patch("wallpaper_colors.run_sync") as run_mock,
+        ):
+            result = wallpaper_colors.main()
+
+        self.assertEqual(result, 0)
+        index_mock.assert_called_once_with(["--workers", "2"])
+        run_mock.assert_not_called()
+
     def test_main_returns_one_when_sync_run_fails(self):
         with (
             patch.object(wallpaper_colors.sys, "argv", ["wallpaper_colors.py"]),
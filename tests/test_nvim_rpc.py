@@ -0,0 +1,180 @@
+import asyncio
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+from wcsync import nvim_rpc, reloaders
+from wcsync.config import Config
+from wcsync.nvim_rpc import packb, unpackb
+
+
+class StandInNvim:
+    """A local msgpack-RPC server answering requests the way Neovim does."""
+
+    def __init__(self, path, delay=0.0, error=None, respond=True):
+        self.path = path
+        self.delay = delay
+        self.error = error
+        self.respond = respond
+        self.requests = []
+        self.handlers = []
+
+    async def handle(self, reader, writer):
+        self.handlers.append(asyncio.current_task())
+        buffer = bytearray()
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            buffer += chunk
+            try:
+                message, offset = unpackb(buffer)
+            except nvim_rpc._Incomplete:
+                continue
+            del buffer[:offset]
+            self.requests.append(message)
+            if not self.respond:
+                continue
+            await asyncio.sleep(self.delay)
+            _, msgid, _, _ = message
+            # Unsolicited notification first, then the response split in two writes.
+            writer.write(packb([2, "nvim_buf_lines_event", [[1, b"\x01"], 0]]))
+            response = packb([1, msgid, self.error, None if self.error else 42])
+            writer.write(response[:3])
+            await writer.drain()
+            writer.write(response[3:])
+            await writer.drain()
+        writer.close()
+
+
+async def _with_servers(servers, body):
+    started = [await asyncio.start_unix_server(s.handle, path=s.path) for s in servers]
+    try:
+        return await body()
+    finally:
+        for server in started:
+            server.close()
+            await server.wait_closed()
+        await asyncio.gather(*(h for s in servers for h in s.handlers))
+
+
+class MsgpackTests(unittest.TestCase):
+    def test_round_trip(self):
+        values = [
+            None,
+            True,
+            False,
+            0,
+            127,
+            -1,
+            -32,
+            -33,
+            300,
+            2**40,
+            -(2**40),
+            1.5,
+            "",
+            "x" * 40,
+            "é" * 200,
+            b"\x00\xff",
+            list(range(20)),
+            {"a": [1, {"b": None}]},
+            {str(i): i for i in range(20)},
+        ]
+        for value in values:
+            decoded, offset = unpackb(packb(value))
+            self.assertEqual(decoded, value)
+            self.assertEqual(offset, len(packb(value)))
+
+    def test_decodes_neovim_ext_handles(self):
+        self.assertEqual(unpackb(b"\xd4\x00\x05"), ((0, b"\x05"), 3))
+
+    def test_incomplete_input_raises(self):
+        data = packb(["nvim_exec_lua", "x" * 100])
+        with self.assertRaises(nvim_rpc._Incomplete):
+            unpackb(data[:-1])
+
+
+class RequestTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.addCleanup(tmp.cleanup)
+        self.dir = pathlib.Path(tmp.name)
+
+    def test_exec_lua_sends_request_and_skips_notifications(self):
+        server = StandInNvim(str(self.dir / "nvim.1.0"))
+
+        result = asyncio.run(
+            _with_servers([server], lambda: nvim_rpc.exec_lua(server.path, "return 1"))
+        )
+
+        self.assertEqual(result, 42)
+        self.assertEqual(server.requests, [[0, 1, "nvim_exec_lua", ["return 1", []]]])
+
+    def test_error_response_raises(self):
+        server = StandInNvim(str(self.dir / "nvim.1.0"), error=[1, "E5108: boom"])
+
+        with self.assertRaisesRegex(nvim_rpc.RpcError, "boom"):
+            asyncio.run(_with_servers([server], lambda: nvim_rpc.exec_lua(server.path, "x")))
+
+    def test_read_timeout(self):
+        server = StandInNvim(str(self.dir / "nvim.1.0"), respond=False)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(
+                _with_servers(
+                    [server], lambda: nvim_rpc.exec_lua(server.path, "x", read_timeout=0.1)
+                )
+            )
+
+    def test_missing_socket_raises_oserror(self):
+        with self.assertRaises(OSError):
+            asyncio.run(nvim_rpc.exec_lua(str(self.dir / "gone"), "x"))
+
+    def test_many_instances_cost_about_one_round_trip(self):
+        servers = [StandInNvim(str(self.dir / f"nvim.{n}.0"), delay=0.2) for n in range(12)]
+
+        async def fan_out():
+            return await asyncio.gather(*(nvim_rpc.exec_lua(s.path, "x") for s in servers))
+
+        started = time.perf_counter()
+        results = asyncio.run(_with_servers(servers, fan_out))
+
+        self.assertEqual(results, [42] * 12)
+        self.assertLess(time.perf_counter() - started, 1.2)  # serial would be 2.4 s
+
+
+class ReloadNvimTests(unittest.TestCase):
+    def test_reload_all_applies_colors_in_every_instance(self):
+        tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.addCleanup(tmp.cleanup)
+        servers = [StandInNvim(f"{tmp.name}/nvim.{n}.0") for n in range(3)]
+        # A socket that vanished after the registry probed it counts as done.
+        sockets = [s.path for s in servers] + [f"{tmp.name}/nvim.gone.0"]
+        cfg = Config()
+        cfg.targets = {k: k == "neovim" for k in cfg.targets}
+
+        async def body():
+            # reload_all runs its own loop, so serve from this one in a thread.
+            with patch("wcsync.reloaders.live_sockets", return_value=sockets):
+                return await asyncio.to_thread(reloaders.reload_all, {}, cfg)
+
+        (result,) = asyncio.run(_with_servers(servers, body))
+
+        self.assertEqual((result.app, result.returncode, result.commands), ("neovim", 0, 4))
+        for server in servers:
+            self.assertEqual(
+                server.requests, [[0, 1, "nvim_exec_lua", [reloaders.NVIM_APPLY_LUA, []]]]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import pathlib
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+import sys
+
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+from wcsync.config import Config
+from wcsync.palette_cache import CACHE_VERSION, PaletteCache, extraction_key
+
+SCHEME = {"accent": (200, 40, 40), "dark": (10, 10, 12)}
+WEIGHTED = [((200, 40, 40), 30), ((10, 10, 12), 12)]
+
+
+class PaletteCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = str(pathlib.Path(self.tmp.name) / "palette_cache.json")
+
+    def test_round_trip_through_disk(self):
+        cache = PaletteCache(self.path)
+        cache.put("k", WEIGHTED, SCHEME)
+        cache.save()
+
+        reloaded = PaletteCache(self.path)
+        self.assertEqual(reloaded.get("k"), (WEIGHTED, SCHEME))
+        self.assertIsNone(reloaded.get("missing"))
+
+    def test_load_reads_the_index_once(self):
+        cache = PaletteCache(self.path)
+        cache.put("k", WEIGHTED, SCHEME)
+        cache.save()
+
+        reloaded = PaletteCache(self.path)
+        with patch.object(reloaded, "_read", wraps=reloaded._read) as read:
+            self.assertIn("k", reloaded.load())
+            reloaded.get("k")
+            reloaded.put("other", WEIGHTED, SCHEME)
+        read.assert_called_once()
+
+    def test_key_tracks_extraction_config_only(self):
+        cfg = Config()
+        key = extraction_key("hash", cfg)
+        self.assertEqual(key, extraction_key("hash", replace(cfg, border_opacity=0x10)))
+        self.assertNotEqual(key, extraction_key("hash", replace(cfg, n_colors=4)))
+        self.assertNotEqual(key, extraction_key("other", cfg))
+
+    def test_evicts_least_recently_used_and_expired(self):
+        cache = PaletteCache(self.path, max_entries=2, max_age_days=1)
+        for key in ("old", "a", "b", "c"):
+            cache.put(key, WEIGHTED, SCHEME)
+        entries = cache.load()
+        entries["old"]["used"] = 0
+        entries["a"]["used"] = 100_000
+        entries["b"]["used"] = 100_002
+        entries["c"]["used"] = 100_001
+
+        cache.evict(now=100_003)
+        self.assertEqual(sorted(entries), ["b", "c"])
+
+    def test_zero_entries_disables_cache(self):
+        cache = PaletteCache(self.path, max_entries=0)
+        cache.put("k", WEIGHTED, SCHEME)
+        cache.save()
+        self.assertIsNone(cache.get("k"))
+        self.assertFalse(pathlib.Path(self.path).exists())
+
+    def test_corrupt_or_stale_version_starts_empty(self):
+        pathlib.Path(self.path).write_text("{not json", encoding="utf-8")
+        with patch("wcsync.palette_cache.log"):
+            self.assertEqual(len(PaletteCache(self.path)), 0)
+
+        pathlib.Path(self.path).write_text(
+            json.dumps({"version": CACHE_VERSION + 1, "entries": {"k": {}}}), encoding="utf-8"
+        )
+        self.assertEqual(len(PaletteCache(self.path)), 0)
+
+
+    def test_corrupt_entries_are_dropped_before_eviction(self):
+        good = {"palette": [[200, 40, 40, 30]], "scheme": {"accent": [200, 40, 40]}, "used": 1.0}
+        entries = {"good": good, "list": [1, 2], "text": "x", "bad_used": {"used": "yesterday"}}
+        pathlib.Path(self.path).write_text(
+            json.dumps({"version": CACHE_VERSION, "entries": entries}), encoding="utf-8"
+        )
+
+        cache = PaletteCache(self.path, max_entries=2, max_age_days=0)
+        cache.put("new", WEIGHTED, SCHEME)
+        cache.save()
+
+        saved = json.loads(pathlib.Path(self.path).read_text(encoding="utf-8"))["entries"]
+        self.assertEqual(sorted(saved), ["good", "new"])
+
+    def test_concurrent_saves_merge_instead_of_overwriting(self):
+        daemon, prerender = PaletteCache(self.path), PaletteCache(self.path)
+        len(daemon), len(prerender)  # both loaded the same (empty) file
+        daemon.put("a", WEIGHTED, SCHEME)
+        prerender.put("b", WEIGHTED, SCHEME)
+
+        daemon.save()
+        prerender.save()
+
+        self.assertEqual(PaletteCache(self.path).get("a"), (WEIGHTED, SCHEME))
+        self.assertEqual(PaletteCache(self.path).get("b"), (WEIGHTED, SCHEME))
+
+
+if __name__ == "__main__":
+    unittest.main()
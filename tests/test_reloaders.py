@@ -1,8 +1,11 @@
+import json
 import pathlib
 import os
-import subprocess
+import socket
+import tempfile
+import time
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 # Make wcsync importable from repo root.
 REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -11,165 +14,464 @@ import sys
 
 sys.path.insert(0, str(WCSYNC_ROOT))
 
-from wcsync import reloaders
+from wcsync import kitty_rc, reloaders
+from wcsync.colors import build_scheme
 from wcsync.config import Config
+from wcsync.timings import StageTimer
+from wcsync.writers.sketchybar import sketchybar_colors
+from wcsync.writers.tmux import tmux_options
+
+
+def _python(code):
+    return reloaders.ReloadCommand((sys.executable, "-c", code))
 
 
 class ReloadersTests(unittest.TestCase):
     def test_reload_borders_sets_active_and_inactive_colors(self):
-        proc = MagicMock()
         cfg = Config(border_opacity=0xB3, border_inactive_opacity=0x66)
         scheme = {"border_accent": (7, 8, 9), "border_inactive": (20, 30, 40), "grey": (50, 60, 70)}
 
-        with (
-            patch("wcsync.reloaders._find_bin", return_value="/usr/bin/borders"),
-            patch("wcsync.reloaders.subprocess.Popen", return_value=proc) as popen_mock,
-        ):
-            result = reloaders.reload_borders(scheme, cfg)
+        with patch("wcsync.reloaders._find_bin", return_value="/usr/bin/borders"):
+            command = reloaders.reload_borders(scheme, cfg)
 
-        self.assertEqual(result, proc)
-        popen_mock.assert_called_once_with(
-            [
+        self.assertEqual(
+            command.argv,
+            (
                 "/usr/bin/borders",
                 "width=3.0",
                 "active_color=0xb3070809",
                 "inactive_color=0x66141e28",
-            ],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+            ),
         )
 
-    def test_reload_tmux_skips_when_no_session(self):
+    def test_reload_kitty_sends_scheme_colors_to_every_socket(self):
+        scheme = build_scheme([(10, 20, 30), (200, 100, 50), (240, 240, 230)])
         with (
-            patch("wcsync.reloaders._find_bin", return_value="/usr/bin/tmux"),
             patch(
-                "wcsync.reloaders.subprocess.run",
-                return_value=subprocess.CompletedProcess(args=[], returncode=1),
-            ),
-            patch("wcsync.reloaders.subprocess.Popen") as popen_mock,
+                "wcsync.reloaders.live_sockets", return_value=["/tmp/kitty-sock-a", "/tmp/kitty-sock-b"]
+            ) as live_mock,
+            patch("wcsync.reloaders._find_bin") as find_bin_mock,
         ):
-            procs = reloaders.reload_tmux()
+            commands = reloaders.reload_kitty(scheme)
 
-        self.assertEqual(procs, [])
-        popen_mock.assert_not_called()
+        find_bin_mock.assert_not_called()
+        live_mock.assert_called_once_with("/tmp/kitty-sock-*")
+        self.assertEqual(len(commands), 2)
+        self.assertEqual(commands[0].argv, ())
+        _, request, sock, colors = commands[0].call.args
+        self.assertIs(request, kitty_rc.set_colors)
+        self.assertEqual(sock, "/tmp/kitty-sock-a")
+        self.assertEqual(colors["background"], scheme["dark"])
+        self.assertEqual(colors["cursor"], scheme["accent"])
 
-    def test_reload_tmux_sources_theme_when_session_exists(self):
-        fake_proc = MagicMock()
+    def test_reload_nvim_uses_discovered_sockets(self):
         with (
-            patch("wcsync.reloaders._find_bin", return_value="/usr/bin/tmux"),
+            patch.dict(os.environ, {"USER": "alice"}, clear=False),
+            patch("wcsync.reloaders.tempfile.gettempdir", return_value="/tmp"),
             patch(
-                "wcsync.reloaders.subprocess.run",
-                return_value=subprocess.CompletedProcess(args=[], returncode=0),
-            ),
-            patch("wcsync.reloaders.target_path", return_value="/tmp/wallpaper.conf"),
-            patch("wcsync.reloaders.subprocess.Popen", return_value=fake_proc) as popen_mock,
+                "wcsync.reloaders.live_sockets", return_value=["/tmp/nvim.alice/x/nvim.123.0"]
+            ) as live_mock,
+            patch("wcsync.reloaders._find_bin") as find_bin_mock,
         ):
-            procs = reloaders.reload_tmux()
+            commands = reloaders.reload_nvim()
 
-        self.assertEqual(procs, [fake_proc])
-        popen_mock.assert_called_once_with(
-            ["/usr/bin/tmux", "source-file", "/tmp/wallpaper.conf"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+        # Reloaded over RPC in-process: no nvim child per instance.
+        find_bin_mock.assert_not_called()
+        live_mock.assert_called_once_with("/tmp/nvim.alice/*/nvim.*.0", prune_parent=True)
+        self.assertEqual(len(commands), 1)
+        self.assertEqual(commands[0].argv, ())
+        self.assertEqual(
+            commands[0].call.args[2:], ("/tmp/nvim.alice/x/nvim.123.0", reloaders.NVIM_APPLY_LUA)
         )
 
-    def test_reload_kitty_uses_writer_output_path(self):
-        p1 = MagicMock()
-        p2 = MagicMock()
+
+class ReloadAllTests(unittest.TestCase):
+    def only(self, *names, **overrides):
+        cfg = Config(**overrides)
+        cfg.targets = {k: k in names for k in cfg.targets}
+        return cfg
+
+    def test_reload_all_respects_targets(self):
+        cfg = self.only("sketchybar", "kitty")
+
         with (
-            patch("wcsync.reloaders.glob.glob", return_value=["/tmp/kitty-sock-a", "/tmp/kitty-sock-b"]),
-            patch("wcsync.reloaders._find_bin", return_value="/usr/bin/kitten"),
-            patch("wcsync.reloaders.target_path", return_value="/tmp/wallpaper.conf"),
-            patch("wcsync.reloaders.subprocess.Popen", side_effect=[p1, p2]) as popen_mock,
+            patch("wcsync.reloaders.reload_sketchybar", return_value=_python("pass")) as sketch_mock,
+            patch("wcsync.reloaders.reload_kitty", return_value=[_python("pass")]) as kitty_mock,
+            patch("wcsync.reloaders.reload_nvim") as nvim_mock,
+            patch("wcsync.reloaders.reload_tmux") as tmux_mock,
+            patch("wcsync.reloaders.reload_borders") as borders_mock,
         ):
-            procs = reloaders.reload_kitty()
+            results = reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
 
-        self.assertEqual(procs, [p1, p2])
-        self.assertEqual(popen_mock.call_count, 2)
-        first_cmd = popen_mock.call_args_list[0].args[0]
-        self.assertEqual(first_cmd[0], "/usr/bin/kitten")
-        self.assertEqual(first_cmd[-1], "/tmp/wallpaper.conf")
+        sketch_mock.assert_called_once()
+        kitty_mock.assert_called_once()
+        nvim_mock.assert_not_called()
+        tmux_mock.assert_not_called()
+        borders_mock.assert_not_called()
+        self.assertEqual(sorted(r.app for r in results), ["kitty", "sketchybar"])
+        self.assertTrue(all(r.returncode == 0 and not r.timed_out for r in results))
 
-    def test_reload_nvim_uses_discovered_sockets(self):
-        proc = MagicMock()
+    def test_reload_all_passes_scheme_to_borders(self):
+        cfg = self.only("borders")
+
+        with patch("wcsync.reloaders.reload_borders", return_value=_python("pass")) as borders_mock:
+            reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
+
+        borders_mock.assert_called_once_with({"border_accent": (1, 2, 3)}, cfg)
+
+    def test_reload_all_waits_concurrently(self):
+        cfg = self.only("sketchybar", "kitty", "neovim")
+        nap = _python("import time; time.sleep(0.4)")
+
+        started = time.perf_counter()
         with (
-            patch.dict(os.environ, {"USER": "alice"}, clear=False),
-            patch("wcsync.reloaders.tempfile.gettempdir", return_value="/tmp"),
-            patch("wcsync.reloaders.glob.glob", return_value=["/tmp/nvim.alice/x/nvim.123.0"]),
-            patch("wcsync.reloaders._find_bin", return_value="/usr/bin/nvim"),
-            patch("wcsync.reloaders.subprocess.Popen", return_value=proc) as popen_mock,
+            patch("wcsync.reloaders.reload_sketchybar", return_value=nap),
+            patch("wcsync.reloaders.reload_kitty", return_value=[nap, nap]),
+            patch("wcsync.reloaders.reload_nvim", return_value=[nap]),
         ):
-            procs = reloaders.reload_nvim()
+            results = reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
+        elapsed = time.perf_counter() - started
 
-        self.assertEqual(procs, [proc])
-        cmd = popen_mock.call_args.args[0]
-        self.assertEqual(cmd[0], "/usr/bin/nvim")
-        self.assertEqual(cmd[1:3], ["--server", "/tmp/nvim.alice/x/nvim.123.0"])
+        self.assertEqual(len(results), 3)
+        self.assertLess(elapsed, 1.2)  # serial waiting would take at least 1.6 s
 
-    def test_reload_all_respects_targets_and_kills_timeout(self):
-        cfg = Config()
-        cfg.targets = {k: False for k in cfg.targets}
-        cfg.targets.update({"sketchybar": True, "kitty": True})
+    def test_reload_all_stops_reloads_past_the_deadline(self):
+        cfg = self.only("sketchybar", "kitty", reload_timeout=0.3)
+        timer = StageTimer()
+
+        started = time.perf_counter()
+        with (
+            patch("wcsync.reloaders.reload_sketchybar", return_value=_python("pass")),
+            patch("wcsync.reloaders.reload_kitty", return_value=[_python("import time; time.sleep(30)")]),
+            patch("wcsync.reloaders.log") as log_mock,
+        ):
+            results = {r.app: r for r in reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg, timer=timer)}
 
-        fast_proc = MagicMock()
-        fast_proc.args = ["sketchybar"]
-        slow_proc = MagicMock()
-        slow_proc.args = ["kitten"]
-        slow_proc.wait.side_effect = subprocess.TimeoutExpired(cmd="kitten", timeout=5)
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertTrue(results["kitty"].timed_out)
+        self.assertNotEqual(results["kitty"].returncode, 0)
+        self.assertFalse(results["sketchybar"].timed_out)
+        self.assertEqual(results["sketchybar"].returncode, 0)
+        self.assertIn("reload.kitty", timer.as_dict())
+        self.assertTrue(any("exceeded" in c.args[0] for c in log_mock.call_args_list if c.args))
+
+    def test_reload_all_reports_exit_status(self):
+        cfg = self.only("sketchybar")
 
         with (
-            patch("wcsync.reloaders.reload_sketchybar", return_value=fast_proc) as sketch_mock,
-            patch("wcsync.reloaders.reload_kitty", return_value=[slow_proc]) as kitty_mock,
+            patch("wcsync.reloaders.reload_sketchybar", return_value=_python("raise SystemExit(3)")),
+            patch("wcsync.reloaders.log") as log_mock,
+        ):
+            (result,) = reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
+
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(result.commands, 1)
+        self.assertTrue(any("status 3" in c.args[0] for c in log_mock.call_args_list if c.args))
+
+    def test_reload_all_limits_to_changed_apps(self):
+        cfg = Config()
+
+        with (
+            patch("wcsync.reloaders.reload_sketchybar") as sketch_mock,
+            patch("wcsync.reloaders.reload_kitty", return_value=[_python("pass")]) as kitty_mock,
             patch("wcsync.reloaders.reload_nvim") as nvim_mock,
             patch("wcsync.reloaders.reload_tmux") as tmux_mock,
             patch("wcsync.reloaders.reload_borders") as borders_mock,
-            patch("wcsync.reloaders.log") as log_mock,
         ):
-            reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
+            reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg, apps=["kitty", "wezterm"])
 
-        sketch_mock.assert_called_once()
         kitty_mock.assert_called_once()
-        nvim_mock.assert_not_called()
-        tmux_mock.assert_not_called()
-        borders_mock.assert_not_called()
-        fast_proc.wait.assert_called_once_with(timeout=5)
-        slow_proc.kill.assert_called_once()
-        self.assertTrue(any("timed out" in c.args[0] for c in log_mock.call_args_list if c.args))
+        for mock in (sketch_mock, nvim_mock, tmux_mock, borders_mock):
+            mock.assert_not_called()
+
+    def test_reload_all_logs_and_skips_missing_binary(self):
+        cfg = self.only("sketchybar", "borders")
+
+        with (
+            patch("wcsync.reloaders.reload_sketchybar", side_effect=FileNotFoundError("missing")),
+            patch(
+                "wcsync.reloaders.reload_borders",
+                return_value=reloaders.ReloadCommand(("/nonexistent/borders",)),
+            ),
+            patch("wcsync.reloaders.log") as log_mock,
+        ):
+            results = reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
 
-    def test_reload_all_triggers_neovim_and_borders(self):
+        messages = [c.args[0] for c in log_mock.call_args_list if c.args]
+        self.assertTrue(any("Skipping sketchybar reload" in m for m in messages))
+        self.assertTrue(any("Skipping borders reload" in m for m in messages))
+        self.assertEqual([(r.app, r.returncode) for r in results], [("borders", None)])
+
+
+class ReloadPipelineTests(unittest.TestCase):
+    def only(self, *names):
         cfg = Config()
-        cfg.targets = {k: False for k in cfg.targets}
-        cfg.targets.update({"neovim": True, "borders": True})
+        cfg.targets = {k: k in names for k in cfg.targets}
+        return cfg
+
+    def test_started_app_reloads_before_the_rest_are_written(self):
+        cfg = self.only("sketchybar", "kitty")
+        timer = StageTimer()
+        with tempfile.TemporaryDirectory() as tmp:
+            marker = os.path.join(tmp, "kitty")
+            touch = _python(f"open({marker!r}, 'w')")
+            with (
+                patch("wcsync.reloaders.reload_kitty", return_value=[touch]) as kitty_mock,
+                patch("wcsync.reloaders.reload_sketchybar", return_value=_python("pass")),
+            ):
+                pipeline = reloaders.ReloadPipeline({"border_accent": (1, 2, 3)}, cfg, timer)
+                pipeline.start("kitty")
+                deadline = time.perf_counter() + 5
+                while not os.path.exists(marker) and time.perf_counter() < deadline:
+                    time.sleep(0.01)
+                self.assertTrue(os.path.exists(marker))  # before sketchybar is even started
+
+                results = reloaders.reload_all(
+                    {"border_accent": (1, 2, 3)}, cfg, apps=["kitty", "sketchybar"], pipeline=pipeline
+                )
 
-        nvim_proc = MagicMock()
-        nvim_proc.args = ["nvim"]
-        borders_proc = MagicMock()
-        borders_proc.args = ["borders"]
+        kitty_mock.assert_called_once()
+        self.assertEqual([(r.app, r.returncode) for r in results], [("kitty", 0), ("sketchybar", 0)])
+        self.assertIn("reload.kitty", timer.as_dict())
+        self.assertIsNone(pipeline._thread)
+
+    def test_reload_timeout_caps_the_whole_phase(self):
+        cfg = self.only("sketchybar", "kitty")
+        cfg.reload_timeout = 0.3
 
+        started = time.perf_counter()
         with (
-            patch("wcsync.reloaders.reload_nvim", return_value=[nvim_proc]) as nvim_mock,
-            patch("wcsync.reloaders.reload_borders", return_value=borders_proc) as borders_mock,
+            patch("wcsync.reloaders.reload_kitty", return_value=[_python("import time; time.sleep(30)")]),
+            patch("wcsync.reloaders.reload_sketchybar", return_value=_python("pass")) as sketch_mock,
+            patch("wcsync.reloaders.log"),
         ):
-            reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
+            pipeline = reloaders.ReloadPipeline({"border_accent": (1, 2, 3)}, cfg)
+            pipeline.start("kitty")
+            time.sleep(0.4)  # a slow writer: the phase is over before sketchybar is written
+            pipeline.start("sketchybar")
+            results = {r.app: r for r in pipeline.finish()}
 
-        nvim_mock.assert_called_once()
-        borders_mock.assert_called_once_with({"border_accent": (1, 2, 3)}, cfg)
-        nvim_proc.wait.assert_called_once_with(timeout=5)
-        borders_proc.wait.assert_called_once_with(timeout=5)
+        self.assertLess(time.perf_counter() - started, 2)
+        self.assertTrue(results["kitty"].timed_out)
+        self.assertTrue(results["sketchybar"].timed_out)
+        self.assertEqual(results["sketchybar"].commands, 0)
+        sketch_mock.assert_called_once()
+
+    def test_app_without_reload_commands_starts_no_loop(self):
+        pipeline = reloaders.ReloadPipeline({}, self.only("wezterm"))
+        pipeline.start("wezterm")
+        pipeline.start("unknown")
+
+        self.assertIsNone(pipeline._thread)
+        self.assertEqual([(r.app, r.returncode) for r in pipeline.finish()], [("wezterm", None)])
+
+
+FAKE_SKETCHYBAR = """#!{python}
+import json, sys
+with open({log!r}, "a") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+if sys.argv[1:] == ["--query", "bar"]:
+    print(json.dumps({{"position": "top", "items": {items!r}}}))
+"""
 
-    def test_reload_all_logs_and_skips_missing_binary(self):
-        cfg = Config()
-        cfg.targets = {k: False for k in cfg.targets}
-        cfg.targets["sketchybar"] = True
 
+class SketchyBarRecolorTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = pathlib.Path(tmp.name)
+        self.map_path = self.dir / "recolor.json"
+        self.map_path.write_text((REPO_ROOT / "configs" / "sketchybar" / "recolor.json").read_text())
+        self.log = self.dir / "calls.jsonl"
+        for target, value in (
+            ("wcsync.reloaders.SKETCHYBAR_STATE_FILE", str(self.dir / "applied.json")),
+            ("wcsync.reloaders.target_path", lambda app, key="output": str(self.map_path)),
+        ):
+            p = patch(target, value)
+            p.start()
+            self.addCleanup(p.stop)
+        self.scheme = build_scheme([(10, 20, 30), (200, 100, 50), (240, 240, 230)])
+        self.cfg = Config()
+        self.cfg.targets = {k: k == "sketchybar" for k in self.cfg.targets}
+
+    def fake_bar(self, items):
+        script = self.dir / "sketchybar"
+        script.write_text(FAKE_SKETCHYBAR.format(python=sys.executable, log=str(self.log), items=items))
+        script.chmod(0o755)
+        return str(script)
+
+    def recolor(self, scheme, items=("space.1", "space.2", "separator", "front_app", "clock")):
+        with patch("wcsync.reloaders._find_bin", return_value=self.fake_bar(list(items))):
+            (result,) = reloaders.reload_all(scheme, self.cfg)
+        calls = [json.loads(line) for line in self.log.read_text().splitlines()]
+        self.log.unlink()
+        return result, calls
+
+    def test_falls_back_to_reload_without_a_recolor_map(self):
+        self.map_path.unlink()
+        with patch("wcsync.reloaders._find_bin", return_value="/usr/bin/sketchybar"):
+            command = reloaders.reload_sketchybar(self.scheme)
+
+        self.assertEqual(command.argv, ("/usr/bin/sketchybar", "--reload"))
+
+    def test_unknown_color_variable_falls_back_to_reload(self):
+        self.map_path.write_text(json.dumps({"bar": {"color": "MAUVE"}}))
         with (
-            patch("wcsync.reloaders.reload_sketchybar", side_effect=FileNotFoundError("missing")),
-            patch("wcsync.reloaders.log") as log_mock,
+            patch("wcsync.reloaders._find_bin", return_value="/usr/bin/sketchybar"),
+            patch("wcsync.reloaders.log"),
         ):
-            reloaders.reload_all({"border_accent": (1, 2, 3)}, cfg)
+            command = reloaders.reload_sketchybar(self.scheme)
+
+        self.assertEqual(command.argv, ("/usr/bin/sketchybar", "--reload"))
+
+    def test_batches_only_changed_colors_into_one_invocation(self):
+        result, calls = self.recolor(self.scheme)
+
+        self.assertEqual(result.returncode, 0)
+        query, batch = calls
+        self.assertEqual(query, ["--query", "bar"])
+        colors = sketchybar_colors(self.scheme)
+        self.assertIn(f"color={colors['TRANSPARENT']}", batch)
+        clock = batch.index("clock")
+        self.assertEqual(batch[clock - 1], "--set")
+        self.assertIn(f"background.color={colors['BAR_COLOR']}", batch[clock:])
+        self.assertEqual(batch[-2:], ["--trigger", "space_change"])
+
+        # Same accent, different dark: only the properties bound to BAR_COLOR move.
+        darker = dict(self.scheme, bar_bg=(1, 2, 3))
+        result, (query, batch) = self.recolor(darker)
+
+        self.assertNotIn("--bar", batch)
+        new_bar = sketchybar_colors(darker)["BAR_COLOR"]
+        self.assertEqual(
+            {arg.split("=", 1)[0] for arg in batch if "=" in arg}, {"background.color"}
+        )
+        self.assertIn(f"background.color={new_bar}", batch)
+        self.assertEqual(batch[-2:], ["--trigger", "space_change"])
+
+    def test_unchanged_colors_need_no_batch(self):
+        self.recolor(self.scheme)
+        _, calls = self.recolor(self.scheme)
+
+        self.assertEqual(calls, [["--query", "bar"]])
+
+    def test_uncovered_item_falls_back_to_reload(self):
+        with patch("wcsync.reloaders.log") as log_mock:
+            result, calls = self.recolor(self.scheme, items=("clock", "weather"))
+
+        self.assertEqual(calls, [["--query", "bar"], ["--reload"]])
+        self.assertEqual(result.returncode, 0)
+        self.assertTrue(any("--reload" in c.args[0] for c in log_mock.call_args_list if c.args))
+
+    def test_recolor_args(self):
+        recolor_map = {"bar": {"color": "BLACK"}, "items": {"a": {"icon.color": "RED"}}, "events": {}}
+        colors = {"BLACK": "0xff000000", "RED": "0xffff0000"}
+
+        self.assertEqual(
+            reloaders.recolor_args(recolor_map, colors, {"BLACK": "0xff000000"}),
+            ["--set", "a", "icon.color=0xffff0000"],
+        )
+
+
+FAKE_TMUX = """#!{python}
+import json, sys
+with open({log!r}, "a") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+sys.exit({code} if sys.argv[1] == "set" else 0)
+"""
+
+
+class TmuxReloadTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.addCleanup(tmp.cleanup)
+        self.dir = pathlib.Path(tmp.name)
+        self.log = self.dir / "calls.jsonl"
+        env = patch.dict(os.environ, {"TMUX_TMPDIR": tmp.name})
+        env.start()
+        self.addCleanup(env.stop)
+        for target, value in (
+            ("wcsync.reloaders.TMUX_STATE_FILE", str(self.dir / "applied.json")),
+            ("wcsync.reloaders.target_path", lambda app, key="output": "/tmp/wallpaper.conf"),
+        ):
+            p = patch(target, value)
+            p.start()
+            self.addCleanup(p.stop)
+        self.scheme = build_scheme([(10, 20, 30), (200, 100, 50), (240, 240, 230)])
+        self.cfg = Config()
+        self.cfg.targets = {k: k == "tmux" for k in self.cfg.targets}
+
+    def start_server(self):
+        sock_dir = self.dir / f"tmux-{os.getuid()}"
+        sock_dir.mkdir(exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+        server.bind(str(sock_dir / "default"))
+        server.listen()
+        return server
+
+    def reload(self, scheme, code=0):
+        script = self.dir / "tmux"
+        script.write_text(FAKE_TMUX.format(python=sys.executable, log=str(self.log), code=code))
+        script.chmod(0o755)
+        with patch("wcsync.reloaders._find_bin", return_value=str(script)):
+            results = reloaders.reload_all(scheme, self.cfg)
+        calls = [json.loads(line) for line in self.log.read_text().splitlines()] if self.log.exists() else []
+        if self.log.exists():
+            self.log.unlink()
+        return results, calls
+
+    def test_no_server_spawns_nothing(self):
+        with patch("wcsync.reloaders.subprocess.run") as run_mock:
+            self.assertEqual(reloaders.reload_tmux(self.scheme), [])
+        run_mock.assert_not_called()
+
+        # A socket left behind by a dead server does not count either.
+        self.start_server().close()
+        self.assertEqual(reloaders.reload_tmux(self.scheme), [])
+
+    def test_sources_theme_without_a_scheme(self):
+        self.start_server()
+        with patch("wcsync.reloaders._find_bin", return_value="/usr/bin/tmux"):
+            commands = reloaders.reload_tmux()
+
+        self.assertEqual(
+            [c.argv for c in commands], [("/usr/bin/tmux", "source-file", "/tmp/wallpaper.conf")]
+        )
+
+    def test_changed_options_are_set_in_one_chained_invocation(self):
+        self.start_server()
+
+        (result,), calls = self.reload(self.scheme)
+
+        self.assertEqual(result.returncode, 0)
+        (chain,) = calls
+        options = tmux_options(self.scheme)
+        self.assertEqual(chain.count(";"), len(options) - 1)
+        self.assertEqual(chain[:4], ["set", "-g", "status-style", options["status-style"]])
+
+        # Only the option whose color moved is set next time, and nothing
+        # runs when no option changed.
+        yellower = dict(self.scheme, yellow=(250, 240, 0))
+        _, calls = self.reload(yellower)
+        self.assertEqual(calls, [["set", "-g", "mode-style", tmux_options(yellower)["mode-style"]]])
+        self.assertEqual(self.reload(yellower)[1], [])
+
+    def test_failed_chain_falls_back_to_source_file(self):
+        self.start_server()
+
+        with patch("wcsync.reloaders.log"):
+            (result,), calls = self.reload(self.scheme, code=1)
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(calls[-1], ["source-file", "/tmp/wallpaper.conf"])
+
+    def test_tmux_set_args(self):
+        options = {"a": "1", "b": "2", "c": "3"}
 
-        self.assertTrue(
-            any("Skipping sketchybar reload" in c.args[0] for c in log_mock.call_args_list if c.args)
+        self.assertEqual(
+            reloaders.tmux_set_args(options, {"b": "2"}),
+            ["set", "-g", "a", "1", ";", "set", "-g", "c", "3"],
         )
 
 
@@ -0,0 +1,113 @@
+import json
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+from wcsync import socket_registry
+from wcsync.socket_registry import SocketRegistry
+
+
+class SocketRegistryTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.addCleanup(tmp.cleanup)
+        self.dir = pathlib.Path(tmp.name)
+        self.state = self.dir / "dead.json"
+
+    def listening(self, name):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(sock.close)
+        sock.bind(str(self.dir / name))
+        sock.listen()
+        return str(self.dir / name)
+
+    def dead_pid(self):
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        proc.wait()
+        return proc.pid
+
+    def stale(self, name):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(str(self.dir / name))
+        return str(self.dir / name)
+
+    def test_live_returns_listening_sockets_and_prunes_our_stale_ones(self):
+        live = self.listening("sock-1")
+        stale = self.stale(f"sock-{self.dead_pid()}")
+        (self.dir / "sock-c").write_text("not a socket")
+
+        registry = SocketRegistry(str(self.state))
+
+        self.assertEqual(registry.live(str(self.dir / "sock-*")), [live])
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(self.state.exists())  # nothing left to remember
+
+    def test_refusing_socket_of_a_running_process_is_kept(self):
+        # Refusals also come from a full backlog or a not-yet-listening socket.
+        refusing = self.stale(f"kitty-sock-{os.getpid()}")
+        registry = SocketRegistry(str(self.state))
+
+        self.assertEqual(registry.live(str(self.dir / "kitty-sock-*")), [])
+        self.assertTrue(os.path.exists(refusing))
+        self.assertFalse(self.state.exists())  # probed again next run
+
+    def test_dead_socket_without_a_pid_is_remembered_not_removed(self):
+        stale = self.stale("sock-a")
+
+        self.assertEqual(SocketRegistry(str(self.state)).live(str(self.dir / "sock-*")), [])
+
+        self.assertTrue(os.path.exists(stale))
+        self.assertIn(stale, json.loads(self.state.read_text()))
+
+    def test_prune_parent_removes_empty_instance_directory(self):
+        (self.dir / "inst").mkdir()
+        self.stale(f"inst/nvim.{self.dead_pid()}.0")
+
+        SocketRegistry(str(self.state)).live(str(self.dir / "*/nvim.*.0"), prune_parent=True)
+
+        self.assertFalse((self.dir / "inst").exists())
+
+    def test_foreign_dead_socket_is_remembered_until_replaced(self):
+        stale = self.stale(f"sock-{self.dead_pid()}")
+        pattern = str(self.dir / "sock-*")
+
+        with patch("wcsync.socket_registry.os.getuid", return_value=os.getuid() + 1):
+            self.assertEqual(SocketRegistry(str(self.state)).live(pattern), [])
+        self.assertTrue(os.path.exists(stale))
+        self.assertIn(stale, json.loads(self.state.read_text()))
+
+        # A fresh registry (next run) skips it without probing.
+        registry = SocketRegistry(str(self.state))
+        with patch("wcsync.socket_registry.probe") as probe_mock:
+            self.assertEqual(registry.live(pattern), [])
+        probe_mock.assert_not_called()
+
+        # A new instance at the same path is probed again.
+        os.unlink(stale)
+        live = self.listening(os.path.basename(stale))
+        self.assertEqual(registry.live(pattern), [live])
+        self.assertEqual(json.loads(self.state.read_text()), {})
+
+    def test_owner_alive(self):
+        self.assertTrue(socket_registry.owner_alive(f"/tmp/kitty-sock-{os.getpid()}"))
+        self.assertFalse(socket_registry.owner_alive(f"/tmp/nvim.x/y/nvim.{self.dead_pid()}.0"))
+        self.assertIsNone(socket_registry.owner_alive("/tmp/kitty-sock"))
+
+    def test_probe(self):
+        self.assertTrue(socket_registry.probe(self.listening("sock-a")))
+        self.assertFalse(socket_registry.probe(self.stale("sock-b")))
+        self.assertFalse(socket_registry.probe(str(self.dir / "missing")))
+
+
+if __name__ == "__main__":
+    unittest.main()
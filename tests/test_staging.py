@@ -0,0 +1,52 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+import sys
+
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+from wcsync import staging
+from wcsync.target_writing import ColorMaterial
+
+SCHEME = {"accent": (1, 2, 3), "dark": (4, 5, 6)}
+MATERIALS = {
+    "kitty": [ColorMaterial("background #040506\n")],
+    "starship": [ColorMaterial("# Auto-generated\n", fallback_key="fallback", owned_marker="Auto-generated")],
+}
+
+
+class StagingTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = self.tmp.name
+
+    def test_round_trip_and_discard(self):
+        staging.stage("fp:sig", "/tmp/next.jpg", "hash:sig", SCHEME, MATERIALS, staging_dir=self.dir)
+
+        self.assertTrue(staging.has_staged("fp:sig", staging_dir=self.dir))
+        self.assertEqual(
+            staging.load_staged("fp:sig", staging_dir=self.dir),
+            ("hash:sig", SCHEME, MATERIALS),
+        )
+        self.assertIsNone(staging.load_staged("other:sig", staging_dir=self.dir))
+
+        staging.discard("fp:sig", staging_dir=self.dir)
+        self.assertFalse(staging.has_staged("fp:sig", staging_dir=self.dir))
+
+    def test_stage_prunes_oldest_bundles(self):
+        for i in range(staging.MAX_STAGED + 2):
+            path = staging.stage(f"k{i}", "", None, SCHEME, {}, staging_dir=self.dir)
+            os.utime(path, ns=(i, i))
+
+        remaining = [k for k in (f"k{i}" for i in range(staging.MAX_STAGED + 2)) if staging.has_staged(k, self.dir)]
+        self.assertEqual(remaining, [f"k{i}" for i in range(2, staging.MAX_STAGED + 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+# Make wcsync importable from repo root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+WCSYNC_ROOT = REPO_ROOT / "configs" / "wallpaper-colors"
+import sys
+
+sys.path.insert(0, str(WCSYNC_ROOT))
+
+from wcsync.timings import StageTimer, append_timings_log, format_timings
+
+
+class StageTimerTests(unittest.TestCase):
+    def test_stages_accumulate_in_order_with_total(self):
+        timer = StageTimer()
+        timer.add("decode", 0.010)
+        with timer.stage("hash"):
+            pass
+        timer.add("decode", 0.005)
+
+        timings = timer.as_dict()
+        self.assertEqual(list(timings), ["decode", "hash", "total"])
+        self.assertAlmostEqual(timings["decode"], 15.0)
+        self.assertIn("decode", format_timings(timings))
+
+    def test_timings_log_appends_one_json_line_per_run(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "logs" / "timings.jsonl"
+            append_timings_log({"total": 1.5}, False, path=str(path))
+            append_timings_log({"total": 0.2}, True, path=str(path))
+
+            lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([line["skipped"] for line in lines], [False, True])
+        self.assertEqual(lines[0]["timings"], {"total": 1.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
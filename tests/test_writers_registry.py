@@ -1,5 +1,6 @@
 import pathlib
 import tempfile
+import threading
 import types
 import unittest
 from unittest.mock import patch
@@ -45,10 +46,45 @@ class TargetWritingTests(unittest.TestCase):
             patch.object(target_writing, "enabled_target_apps", return_value=[app_a]),
             patch.object(target_writing, "write_target_app", side_effect=fake_write),
         ):
-            failed = target_writing.write_all({"accent": (1, 2, 3)}, cfg)
+            result = target_writing.write_all({"accent": (1, 2, 3)}, cfg)
 
         self.assertEqual(called, ["a"])
-        self.assertEqual(failed, [])
+        self.assertEqual(result.failed, [])
+        self.assertEqual(result.changed, ["a"])
+
+    def test_write_all_limits_to_requested_apps(self):
+        called = []
+        apps = [_TargetApp("a"), _TargetApp("b"), _TargetApp("c")]
+
+        def fake_write(app, *_):
+            called.append(app.name)
+            return [f"/tmp/{app.name}"]
+
+        with (
+            patch.object(target_writing, "enabled_target_apps", return_value=apps),
+            patch.object(target_writing, "write_target_app", side_effect=fake_write),
+        ):
+            result = target_writing.write_all({"accent": (1, 2, 3)}, Config(), apps=["c", "a"])
+
+        self.assertEqual(sorted(called), ["a", "c"])
+        self.assertEqual(sorted(result.changed), ["a", "c"])
+
+    def test_write_all_renders_bound_apps_from_their_region(self):
+        seen = {}
+        apps = [_TargetApp("a"), _TargetApp("b")]
+        scheme = {"accent": (1, 2, 3), "top/accent": (9, 9, 9)}
+
+        def fake_write(app, app_scheme, *_):
+            seen[app.name] = app_scheme
+            return [f"/tmp/{app.name}"]
+
+        with (
+            patch.object(target_writing, "enabled_target_apps", return_value=apps),
+            patch.object(target_writing, "write_target_app", side_effect=fake_write),
+        ):
+            target_writing.write_all(scheme, Config(bindings={"b": "top"}))
+
+        self.assertEqual(seen, {"a": {"accent": (1, 2, 3)}, "b": {"accent": (9, 9, 9)}})
 
     def test_write_all_continues_when_writer_fails(self):
         called = []
@@ -68,14 +104,40 @@ class TargetWritingTests(unittest.TestCase):
             patch.object(target_writing, "write_target_app", side_effect=fake_write),
             patch("wcsync.target_writing.log") as log_mock,
         ):
-            failed = target_writing.write_all({"accent": (1, 2, 3)}, cfg)
+            result = target_writing.write_all({"accent": (1, 2, 3)}, cfg)
 
         self.assertEqual(called, ["ok"])
-        self.assertEqual(failed, ["bad"])
+        self.assertEqual(result.failed, ["bad"])
+        self.assertEqual(result.changed, ["ok"])
         self.assertTrue(
             any("Writer bad failed" in call.args[0] for call in log_mock.call_args_list if call.args)
         )
 
+    def test_write_all_reports_changed_apps_while_slower_writers_run(self):
+        apps = [_TargetApp("fast"), _TargetApp("slow"), _TargetApp("same")]
+        reported = threading.Event()
+        seen = []
+
+        def fake_write(app, *_):
+            if app.name == "slow":
+                # Only finishes once "fast" has been reported.
+                seen.append(("slow waited", reported.wait(5)))
+            return [] if app.name == "same" else [f"/tmp/{app.name}"]
+
+        def on_changed(name):
+            seen.append(name)
+            if name == "fast":
+                reported.set()
+
+        with (
+            patch.object(target_writing, "enabled_target_apps", return_value=apps),
+            patch.object(target_writing, "write_target_app", side_effect=fake_write),
+        ):
+            result = target_writing.write_all({"accent": (1, 2, 3)}, Config(), on_changed=on_changed)
+
+        self.assertEqual(seen, ["fast", ("slow waited", True), "slow"])
+        self.assertEqual(sorted(result.changed), ["fast", "slow"])
+
     def test_write_target_app_uses_fallback_for_user_owned_file(self):
         with tempfile.TemporaryDirectory() as td:
             root = pathlib.Path(td)
@@ -98,5 +160,68 @@ class TargetWritingTests(unittest.TestCase):
             self.assertIn("Auto-generated", fallback.read_text(encoding="utf-8"))
 
 
+    def test_write_target_app_publishes_staged_material_without_rendering(self):
+        with tempfile.TemporaryDirectory() as td:
+            output = pathlib.Path(td) / "colors.conf"
+            app = _PathApp({"output": output})
+            staged = [target_writing.ColorMaterial("staged\n")]
+
+            with patch.object(target_writing, "_adapter_module") as adapter_mock:
+                written = target_writing.write_target_app(app, {}, None, staged)
+
+            adapter_mock.assert_not_called()
+            self.assertEqual(written, [str(output)])
+            self.assertEqual(output.read_text(encoding="utf-8"), "staged\n")
+
+
+class PublishManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = pathlib.Path(self.tmp.name)
+        self.manifest_path = str(root / "manifest.json")
+        self.output = root / "colors.conf"
+        self.app = _PathApp({"output": self.output})
+
+    def publish(self, content):
+        manifest = target_writing.PublishManifest(self.manifest_path)
+        written = target_writing.publish_materials(
+            self.app, [target_writing.ColorMaterial(content)], manifest
+        )
+        manifest.save()
+        return written
+
+    def test_identical_content_is_not_rewritten(self):
+        self.assertEqual(self.publish("a\n"), [str(self.output)])
+        with patch.object(target_writing, "atomic_write") as write_mock:
+            self.assertEqual(self.publish("a\n"), [])
+        write_mock.assert_not_called()
+        self.assertEqual(self.publish("b\n"), [str(self.output)])
+        self.assertEqual(self.output.read_text(encoding="utf-8"), "b\n")
+
+    def test_external_edit_or_delete_forces_rewrite(self):
+        self.publish("a\n")
+        self.output.write_text("user edit\n", encoding="utf-8")
+        self.assertEqual(self.publish("a\n"), [str(self.output)])
+
+        self.output.unlink()
+        self.assertEqual(self.publish("a\n"), [str(self.output)])
+        self.assertEqual(self.output.read_text(encoding="utf-8"), "a\n")
+
+    def test_write_all_reports_only_changed_apps(self):
+        cfg = Config(targets={"demo": True})
+        adapter = types.SimpleNamespace(render=lambda *_: target_writing.ColorMaterial("a\n"))
+        with (
+            patch.object(target_writing, "enabled_target_apps", return_value=[self.app]),
+            patch.object(target_writing, "_adapter_module", return_value=adapter),
+            patch("wcsync.target_writing.log"),
+        ):
+            first = target_writing.write_all({}, cfg, manifest=target_writing.PublishManifest(self.manifest_path))
+            second = target_writing.write_all({}, cfg, manifest=target_writing.PublishManifest(self.manifest_path))
+
+        self.assertEqual(first.changed, ["demo"])
+        self.assertEqual(second.changed, [])
+        self.assertEqual(second.failed, [])
+
 if __name__ == "__main__":
     unittest.main()